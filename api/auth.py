@@ -10,7 +10,7 @@ from typing import Any
 from fastapi import APIRouter, HTTPException, Depends, status
 from beanie import PydanticObjectId
 
-from core.security import verify_password, create_access_token
+from core.security import verify_password_async, create_access_token
 from schemas.auth import LoginRequest, TokenResponse, CurrentUserResponse
 from models.user import User
 from models.student import Student
@@ -53,7 +53,7 @@ async def login_user(login_data: LoginRequest) -> Any:
         )
     
     # Verificar contraseña
-    if not verify_password(login_data.password, user.password):
+    if not await verify_password_async(login_data.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas",
@@ -122,7 +122,7 @@ async def login_student(login_data: LoginRequest) -> Any:
         )
     
     # Verificar contraseña
-    if not verify_password(login_data.password, student.password):
+    if not await verify_password_async(login_data.password, student.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas",
@@ -1,9 +1,15 @@
 from typing import List, Any, Union
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from models.course import Course
 from models.user import User
 from models.student import Student
-from schemas.course import CourseCreate, CourseResponse, CourseUpdate, CourseEnrolledStudent
+from schemas.course import (
+    CourseCreate,
+    CourseResponse,
+    CourseUpdate,
+    CourseEnrolledStudent,
+    CourseEnrolledStudentListAdapter
+)
 from services import course_service
 from beanie import PydanticObjectId
 
@@ -123,15 +129,16 @@ async def delete_course(
     current_user: User = Depends(require_superadmin) # <-- SOLO SUPERADMIN BORRA
 ) -> Any:
     """Eliminar curso"""
-    course = await course_service.get_course(id=id)
+    course = await course_service.delete_course(id=id)
     if not course:
         raise HTTPException(status_code=404, detail="Curso no encontrado")
-    course = await course_service.delete_course(id=id)
     return course
 
 @router.get(
     "/{id}/students",
-    response_model=List[CourseEnrolledStudent],
+    # La serialización la hace el adapter cacheado; el modelo queda solo para OpenAPI
+    response_model=None,
+    responses={200: {"model": List[CourseEnrolledStudent]}},
     summary="Ver Inscritos del Curso"
 )
 async def get_course_students(
@@ -145,7 +152,10 @@ async def get_course_students(
         raise HTTPException(status_code=404, detail="Curso no encontrado")
         
     report = await course_service.get_course_students(course_id=id)
-    return report
+    return Response(
+        content=CourseEnrolledStudentListAdapter.dump_json(report),
+        media_type="application/json"
+    )
 
 # ========================================================================
 # NUEVO ENDPOINT (ISSUE R): Obtener Módulos por Docente
@@ -106,10 +106,9 @@ async def delete_discount(
     current_user: User = Depends(require_superadmin) # <-- SOLO SUPERADMIN BORRA
 ) -> Any:
     """Eliminar descuento"""
-    discount = await discount_service.get_discount(id=id)
+    discount = await discount_service.delete_discount(id=id)
     if not discount:
         raise HTTPException(status_code=404, detail="Descuento no encontrado")
-    discount = await discount_service.delete_discount(id=id)
     return discount
 
 @router.post("/{id}/students/{student_id}", response_model=DiscountResponse)
@@ -17,19 +17,23 @@ Permisos (Según Jerarquía UAGRM):
 """
 
 from typing import List, Any, Optional, Union
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Header, Path
+from fastapi.responses import StreamingResponse
 from models.enrollment import Enrollment
 from models.student import Student
 from models.course import Course
 from models.user import User
 from models.enums import EstadoInscripcion, EstadoRequisito
 from core.cloudinary_utils import upload_image, upload_pdf
+from core.responses import NDJSON_MEDIA_TYPE, stream_json_array, stream_ndjson
 from schemas.requisito import RequisitoResponse, RequisitoRechazarRequest, RequisitoListResponse
 from schemas.enrollment import (
+    EnrollmentBulkCreate,
     EnrollmentCreate,
     EnrollmentResponse,
     EnrollmentUpdate,
     EnrollmentWithDetails,
+    EnrollmentResponseAdapter,
     ModuloNotaUpdate
 )
 from services import enrollment_service, payment_service
@@ -61,15 +65,43 @@ async def create_enrollment(
             enrollment_in=enrollment_in,
             admin_username=current_user.username
         )
-        enriched_enrollment = await enrollment_service.enrich_enrollment_dates(enrollment)
+        enriched_enrollment = enrollment_service.enrich_enrollment_dates(enrollment)
         return enriched_enrollment
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post(
+    "/bulk",
+    response_model=List[EnrollmentResponse],
+    status_code=201,
+    summary="Crear Inscripciones en Lote"
+)
+async def create_enrollments_bulk(
+    *,
+    enrollments_in: EnrollmentBulkCreate,
+    current_user: User = Depends(require_cpd)
+) -> Any:
+    """
+    Crear varias inscripciones en una sola operación.
+    
+    El lote se valida completo antes de escribir: si algún estudiante/curso no
+    existe o ya hay una inscripción activa, no se crea ninguna. Admite hasta
+    MAX_INSCRIPCIONES_LOTE inscripciones por petición (422 si se excede).
+    """
+    try:
+        enrollments = await enrollment_service.create_enrollments_bulk(
+            enrollments_in=enrollments_in,
+            admin_username=current_user.username
+        )
+        return [enrollment_service.enrich_enrollment_dates(e) for e in enrollments]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get(
     "/",
-    response_model=PaginatedResponse[EnrollmentResponse],
+    response_model=PaginatedResponse[EnrollmentWithDetails],
     summary="Listar Inscripciones"
 )
 async def list_enrollments(
@@ -82,10 +114,18 @@ async def list_enrollments(
     estudiante_id: Optional[PydanticObjectId] = Query(None, description="Filtrar por Estudiante ID"),
     current_user: Union[User, Student] = Depends(get_current_user)
 ) -> Any:
-    """Listar inscripciones con paginación y filtros avanzados"""
+    """
+    Listar inscripciones con paginación y filtros avanzados
+    
+    Cada fila trae todos los campos de EnrollmentResponse y, además, los datos
+    del estudiante y del curso (estudiante_nombre, estudiante_email,
+    curso_nombre, curso_codigo, monto_cuota, porcentaje_pagado). Son campos
+    opcionales: en la vista del estudiante llegan vacíos.
+    """
     if isinstance(current_user, User):
-        # Todo el STAFF (Mae, Cobranza, Cpd, Admin) puede leer la tabla
-        enrollments, total_count = await enrollment_service.get_all_enrollments(
+        # Todo el STAFF (Mae, Cobranza, Cpd, Admin) puede leer la tabla.
+        # El servicio ya devuelve la página enriquecida con estudiante y curso.
+        enriched_enrollments, total_count = await enrollment_service.get_all_enrollments(
             page=page, per_page=per_page, q=q, estado=estado,
             curso_id=curso_id, estudiante_id=estudiante_id
         )
@@ -98,7 +138,10 @@ async def list_enrollments(
         total_count = len(all_enrollments)
         start = (page - 1) * per_page
         end = start + per_page
-        enrollments = all_enrollments[start:end]
+        enriched_enrollments = [
+            enrollment_service.enrich_enrollment_dates(enrollment)
+            for enrollment in all_enrollments[start:end]
+        ]
     else:
         raise HTTPException(status_code=403, detail="No autorizado")
 
@@ -106,11 +149,6 @@ async def list_enrollments(
     has_next = page < total_pages
     has_prev = page > 1
     
-    enriched_enrollments = []
-    for enrollment in enrollments:
-        enriched = await enrollment_service.enrich_enrollment_dates(enrollment)
-        enriched_enrollments.append(enriched)
-    
     return {
         "data": enriched_enrollments,
         "meta": PaginationMeta(
@@ -139,7 +177,7 @@ async def get_enrollment(
         if enrollment.estudiante_id != current_user.id:
             raise HTTPException(status_code=403, detail="No tienes permiso")
             
-    enriched_enrollment = await enrollment_service.enrich_enrollment_dates(enrollment)
+    enriched_enrollment = enrollment_service.enrich_enrollment_dates(enrollment)
     return enriched_enrollment
 
 
@@ -198,21 +236,9 @@ async def delete_enrollment(
             detail="Solo SUPERADMIN puede eliminar inscripciones"
         )
     
-    enrollment = await Enrollment.get(id)
+    enrollment = await enrollment_service.delete_enrollment(id)
     if not enrollment:
         raise HTTPException(status_code=404, detail="Inscripción no encontrada")
-    
-    student = await Student.get(enrollment.estudiante_id)
-    if student and enrollment.curso_id in student.lista_cursos_ids:
-        student.lista_cursos_ids.remove(enrollment.curso_id)
-        await student.save()
-
-    course = await Course.get(enrollment.curso_id)
-    if course and enrollment.estudiante_id in course.inscritos:
-        course.inscritos.remove(enrollment.estudiante_id)
-        await course.save()
-        
-    await enrollment.delete()
     return enrollment
 
 
@@ -231,18 +257,44 @@ async def get_enrollments_by_student(
     return enrollments
 
 
-@router.get("/course/{course_id}", response_model=List[EnrollmentResponse])
+@router.get(
+    "/course/{course_id}",
+    # Se emite en streaming con el adapter; los modelos quedan solo para OpenAPI
+    response_model=None,
+    responses={200: {
+        "model": List[EnrollmentResponse],
+        "content": {
+            NDJSON_MEDIA_TYPE: {"schema": {"$ref": "#/components/schemas/EnrollmentResponse"}}
+        },
+        "description": f"Arreglo JSON de inscripciones; con 'Accept: {NDJSON_MEDIA_TYPE}', una por línea"
+    }}
+)
 async def get_enrollments_by_course(
     *,
     course_id: PydanticObjectId,
+    accept: Optional[str] = Header(None),
     current_user: Union[User, Student] = Depends(get_current_user) # <-- PERMISO ABIERTO PARA QUE DOCENTES INGRESEN
 ) -> Any:
-    """Obtener todas las inscripciones de un curso (Planilla)"""
+    """
+    Obtener todas las inscripciones de un curso (Planilla)
+    
+    Se envía a medida que se lee del cursor. Por defecto es un arreglo JSON;
+    con `Accept: application/x-ndjson` se envía una inscripción por línea
+    (NDJSON), de modo que un corte a mitad del flujo solo pierde las últimas.
+    """
     if isinstance(current_user, Student):
         raise HTTPException(status_code=403, detail="Los estudiantes no tienen acceso a planillas de cursos.")
-        
-    enrollments = await enrollment_service.get_enrollments_by_course(course_id)
-    return enrollments
+    
+    enrollments = enrollment_service.iter_enrollments_by_course(course_id)
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(
+            stream_ndjson(enrollments, EnrollmentResponseAdapter),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+    return StreamingResponse(
+        stream_json_array(enrollments, EnrollmentResponseAdapter),
+        media_type="application/json"
+    )
 
 
 @router.get(
@@ -263,7 +315,7 @@ async def get_next_payment_info(
         if enrollment.estudiante_id != current_user.id:
             raise HTTPException(403, "No es tu enrollment")
             
-    next_payment = await payment_service.get_next_pending_payment(id)
+    next_payment = await payment_service.get_next_pending_payment(id, enrollment=enrollment)
     if not next_payment:
         return None
         
@@ -310,7 +362,7 @@ async def update_modulo_nota(
             nota=nota_update.nota,
             evaluador_username=username
         )
-        return await enrollment_service.enrich_enrollment_dates(updated_enrollment)
+        return enrollment_service.enrich_enrollment_dates(updated_enrollment)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -376,6 +428,7 @@ async def subir_requisito(
         
         enrollment.requisitos[index].subir_documento(documento_url)
         await enrollment.save()
+        enrollment_service.invalidate_enrollment_cache(id)
         return enrollment.requisitos[index]
     except Exception as e:
         raise HTTPException(500, f"Error: {str(e)}")
@@ -400,6 +453,7 @@ async def aprobar_requisito(
     
     enrollment.requisitos[index].aprobar(current_user.username)
     await enrollment.save()
+    enrollment_service.invalidate_enrollment_cache(id)
     return enrollment.requisitos[index]
 
 
@@ -423,4 +477,5 @@ async def rechazar_requisito(
     
     enrollment.requisitos[index].rechazar(current_user.username, rechazo.motivo)
     await enrollment.save()
+    enrollment_service.invalidate_enrollment_cache(id)
     return enrollment.requisitos[index]
@@ -12,15 +12,13 @@ Permisos:
 - GET /payments/{id}: STAFF / STUDENT (si es suyo)
 - PUT /payments/{id}/aprobar: COBRANZAS, CPD, ADMIN, SUPERADMIN (según concepto)
 - PUT /payments/{id}/rechazar: COBRANZAS, CPD, ADMIN, SUPERADMIN (según concepto)
+- PATCH /payments/{id}: Aprobar/Rechazar en un solo endpoint (mismos permisos)
 - GET /payments/enrollment/{enrollment_id}: STAFF / STUDENT (si es suya)
 - GET /payments/pendientes: COBRANZAS, CPD, ADMIN, SUPERADMIN (según concepto)
 """
 
 from typing import List, Any, Optional
-import asyncio
-import re
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
-from models.course import Course
 from models.payment import Payment
 from models.student import Student
 from models.user import User
@@ -30,11 +28,13 @@ from schemas.payment import (
     PaymentResponse,
     PaymentApproval,
     PaymentRejection,
-    PaymentWithDetails
+    PaymentWithDetails,
+    PaymentMutation,
+    ApproveAction
 )
-from services import payment_service
+from services import enrollment_service, payment_service
+from core.timezone_utils import to_bolivia_time
 from beanie import PydanticObjectId
-from beanie.operators import In
 
 # Dependencias de seguridad
 from api.dependencies import require_cobranza, require_staff, get_current_user
@@ -42,7 +42,6 @@ from api.dependencies import require_cobranza, require_staff, get_current_user
 router = APIRouter()
 
 from schemas.common import PaginatedResponse, PaginationMeta
-import math
 
 
 @router.post(
@@ -122,6 +121,7 @@ async def create_payment(
 @router.get(
     "/",
     response_model=PaginatedResponse[PaymentResponse],
+    response_model_exclude_none=True,
     summary="Listar Pagos"
 )
 async def list_payments(
@@ -132,96 +132,48 @@ async def list_payments(
     estado: Optional[EstadoPago] = Query(None, description="Filtrar por estado"),
     curso_id: Optional[PydanticObjectId] = Query(None, description="Filtrar por Curso ID"),
     estudiante_id: Optional[PydanticObjectId] = Query(None, description="Filtrar por Estudiante ID"),
+    after_id: Optional[PydanticObjectId] = Query(
+        None, description="Cursor (meta.nextCursor de la página anterior); si se envía, 'page' se ignora"
+    ),
     current_user: User | Student = Depends(get_current_user)
 ) -> Any:
     """
     Listar pagos con paginación y filtros optimizados en lote (Bulk)
+    
+    Además de `page`, admite paginación por cursor con `after_id` (páginas
+    profundas sin $skip ni conteo).
     """
     if isinstance(current_user, User):
-        filters_dict = {}
-        
-        if q:
-            escaped_q = re.escape(q.strip())
-            regex_filter = {"$regex": escaped_q, "$options": "i"}
-
-            matching_students = await Student.find({
-                "$or": [
-                    {"nombre": regex_filter},
-                    {"email": regex_filter},
-                    {"registro": regex_filter}
-                ]
-            }).to_list()
-
-            matching_courses = await Course.find({
-                "$or": [
-                    {"nombre_programa": regex_filter},
-                    {"codigo": regex_filter}
-                ]
-            }).to_list()
-
-            student_ids = [student.id for student in matching_students if student.id]
-            course_ids = [course.id for course in matching_courses if course.id]
-
-            filters_dict["$or"] = [
-                {"numero_transaccion": regex_filter},
-                {"remitente": regex_filter},
-                {"banco": regex_filter},
-                {"estudiante_id": {"$in": student_ids}},
-                {"curso_id": {"$in": course_ids}}
-            ]
-            
-        if estado:
-            filters_dict["estado_pago"] = estado
-        if curso_id:
-            filters_dict["curso_id"] = curso_id
-        if estudiante_id:
-            filters_dict["estudiante_id"] = estudiante_id
-            
-        if current_user.rol == "cpd":
-            filters_dict["concepto"] = {"$regex": r"^matr[ií]cula$", "$options": "i"}
-        elif current_user.rol == "cobranza":
-            filters_dict["concepto"] = {"$not": {"$regex": r"^matr[ií]cula$", "$options": "i"}}
-            
-        query = Payment.find(filters_dict)
-        total_count = await query.count()
-        payments = await query.sort("-fecha_subida").skip((page - 1) * per_page).limit(per_page).to_list()
-    
-    elif isinstance(current_user, Student):
-        all_payments = await payment_service.get_payments_by_student(
-            student_id=current_user.id
+        filtros = dict(
+            q=q, estado=estado, curso_id=curso_id, estudiante_id=estudiante_id,
+            rol=current_user.rol
         )
-        if estado:
-            all_payments = [p for p in all_payments if p.estado_pago == estado]
-        total_count = len(all_payments)
-        start = (page - 1) * per_page
-        end = start + per_page
-        payments = all_payments[start:end]
+    elif isinstance(current_user, Student):
+        # Un estudiante solo ve sus pagos (sin búsqueda ni filtros de staff)
+        filtros = dict(estado=estado, estudiante_id=current_user.id)
     else:
         raise HTTPException(status_code=403, detail="No autorizado")
     
-    total_pages = math.ceil(total_count / per_page) if total_count > 0 else 0
-    has_next = page < total_pages
-    has_prev = page > 1
+    try:
+        pagina = await payment_service.get_all_payments(
+            page, per_page, after_id=after_id, **filtros
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Optimizador: Enriquecimiento en LOTE ( Bulk Load )
-    enriched_payments = await payment_service.enrich_payments_with_details_bulk(payments)
+    enriched_payments = await payment_service.enrich_payments_with_details_bulk(pagina.items)
     
     return {
         "data": enriched_payments,
-        "meta": PaginationMeta(
-            page=page,
-            limit=per_page,
-            totalItems=total_count,
-            totalPages=total_pages,
-            hasNextPage=has_next,
-            hasPrevPage=has_prev
-        )
+        "meta": PaginationMeta(**pagina.meta(page, per_page))
     }
 
 
 @router.get(
     "/{id}",
     response_model=PaymentResponse,
+    response_model_exclude_none=True,
     summary="Ver Pago"
 )
 async def get_payment(
@@ -259,6 +211,27 @@ async def get_payment(
     return await payment_service.enrich_payment_with_details(payment)
 
 
+def _verificar_permiso_pago(current_user: User, payment: Payment, verbo: str) -> None:
+    """Valida rol y concepto (CPD solo Matrícula, Cobranza todo excepto Matrícula)"""
+    if current_user.rol not in ["superadmin", "admin", "cpd", "cobranza"]:
+        raise HTTPException(status_code=403, detail=f"Su rol no tiene permisos para {verbo} pagos")
+    
+    concepto_lower = (payment.concepto or "").lower().strip()
+    is_matricula = "matricula" in concepto_lower or "matrícula" in concepto_lower
+    
+    if current_user.rol == "cpd" and not is_matricula:
+        raise HTTPException(
+            status_code=403,
+            detail=f"El rol CPD solo puede {verbo} pagos con concepto de Matrícula."
+        )
+        
+    if current_user.rol == "cobranza" and is_matricula:
+        raise HTTPException(
+            status_code=403,
+            detail=f"El rol Cobranza no puede {verbo} pagos con concepto de Matrícula."
+        )
+
+
 @router.put(
     "/{id}/aprobar",
     response_model=PaymentResponse,
@@ -270,27 +243,11 @@ async def aprobar_pago(
     current_user: User = Depends(require_staff)
 ) -> Any:
     """Aprobar un pago"""
-    if current_user.rol not in ["superadmin", "admin", "cpd", "cobranza"]:
-        raise HTTPException(status_code=403, detail="Su rol no tiene permisos para aprobar pagos")
-        
     payment = await payment_service.get_payment(id)
     if not payment:
         raise HTTPException(status_code=404, detail="Pago no encontrado")
         
-    concepto_lower = (payment.concepto or "").lower().strip()
-    is_matricula = "matricula" in concepto_lower or "matrícula" in concepto_lower
-    
-    if current_user.rol == "cpd" and not is_matricula:
-        raise HTTPException(
-            status_code=403,
-            detail="El rol CPD solo puede aprobar pagos con concepto de Matrícula."
-        )
-        
-    if current_user.rol == "cobranza" and is_matricula:
-        raise HTTPException(
-            status_code=403,
-            detail="El rol Cobranza no puede aprobar pagos con concepto de Matrícula."
-        )
+    _verificar_permiso_pago(current_user, payment, "aprobar")
         
     try:
         payment = await payment_service.aprobar_pago(
@@ -314,27 +271,11 @@ async def rechazar_pago(
     current_user: User = Depends(require_staff)
 ) -> Any:
     """Rechazar un pago con motivo"""
-    if current_user.rol not in ["superadmin", "admin", "cpd", "cobranza"]:
-        raise HTTPException(status_code=403, detail="Su rol no tiene permisos para rechazar pagos")
-        
     payment = await payment_service.get_payment(id)
     if not payment:
         raise HTTPException(status_code=404, detail="Pago no encontrado")
         
-    concepto_lower = (payment.concepto or "").lower().strip()
-    is_matricula = "matricula" in concepto_lower or "matrícula" in concepto_lower
-    
-    if current_user.rol == "cpd" and not is_matricula:
-        raise HTTPException(
-            status_code=403,
-            detail="El rol CPD solo puede rechazar pagos con concepto de Matrícula."
-        )
-        
-    if current_user.rol == "cobranza" and is_matricula:
-        raise HTTPException(
-            status_code=403,
-            detail="El rol Cobranza no puede rechazar pagos con concepto de Matrícula."
-        )
+    _verificar_permiso_pago(current_user, payment, "rechazar")
         
     try:
         payment = await payment_service.rechazar_pago(
@@ -347,7 +288,46 @@ async def rechazar_pago(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/enrollment/{enrollment_id}", response_model=List[PaymentResponse])
+@router.patch(
+    "/{id}",
+    response_model=PaymentResponse,
+    summary="Aprobar o Rechazar Pago"
+)
+async def mutar_pago(
+    *,
+    id: PydanticObjectId,
+    mutation: PaymentMutation,
+    current_user: User = Depends(require_staff)
+) -> Any:
+    """
+    Aprobar (`{"action": "approve"}`) o rechazar (`{"action": "reject", "motivo": "..."}`)
+    un pago en un solo endpoint
+    """
+    payment = await payment_service.get_payment(id)
+    if not payment:
+        raise HTTPException(status_code=404, detail="Pago no encontrado")
+    
+    is_approve = isinstance(mutation, ApproveAction)
+    _verificar_permiso_pago(current_user, payment, "aprobar" if is_approve else "rechazar")
+    
+    try:
+        if is_approve:
+            payment = await payment_service.aprobar_pago(
+                payment_id=id,
+                admin_username=current_user.username
+            )
+        else:
+            payment = await payment_service.rechazar_pago(
+                payment_id=id,
+                admin_username=current_user.username,
+                motivo=mutation.motivo
+            )
+        return await payment_service.enrich_payment_with_details(payment)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/enrollment/{enrollment_id}", response_model=List[PaymentResponse], response_model_exclude_none=True)
 async def get_payments_by_enrollment(
     *,
     enrollment_id: PydanticObjectId,
@@ -355,7 +335,6 @@ async def get_payments_by_enrollment(
 ) -> Any:
     """Obtener todos los pagos de una inscripción"""
     if isinstance(current_user, Student):
-        from services import enrollment_service
         enrollment = await enrollment_service.get_enrollment(enrollment_id)
         if not enrollment:
             raise HTTPException(status_code=404, detail="Inscripción no encontrada")
@@ -391,7 +370,6 @@ async def get_resumen_pagos(
 ) -> Any:
     """Obtener resumen de pagos de una inscripción"""
     if isinstance(current_user, Student):
-        from services import enrollment_service
         enrollment = await enrollment_service.get_enrollment(enrollment_id)
         if not enrollment:
             raise HTTPException(status_code=404, detail="Inscripción no encontrada")
@@ -408,32 +386,27 @@ async def get_resumen_pagos(
     return resumen
 
 
-@router.get("/pendientes/list", response_model=List[PaymentResponse])
+@router.get("/pendientes/list", response_model=List[PaymentResponse], response_model_exclude_none=True)
 async def get_payments_pendientes(
     *,
-    current_user: User = Depends(require_staff)
+    current_user: User = Depends(require_staff),
+    page: int = Query(1, ge=1, description="Número de página"),
+    per_page: Optional[int] = Query(
+        None, ge=1, le=500,
+        description="Elementos por página (sin valor: todos los pendientes)"
+    )
 ) -> Any:
-    """Obtener todos los pagos pendientes de aprobación"""
+    """
+    Obtener los pagos pendientes de aprobación (más recientes primero)
+    
+    Filtro por rol, página y proyección se resuelven en MongoDB: solo se leen
+    y enriquecen los pagos de la página pedida.
+    """
     if current_user.rol not in ["superadmin", "admin", "cpd", "cobranza"]:
         raise HTTPException(status_code=403, detail="No autorizado para listar pagos pendientes")
-        
-    payments = await payment_service.get_payments_pendientes()
     
-    filtered_payments = []
-    for p in payments:
-        concepto_lower = (p.concepto or "").lower().strip()
-        is_matricula = "matricula" in concepto_lower or "matrícula" in concepto_lower
-        
-        if current_user.rol == "cpd":
-            if is_matricula:
-                filtered_payments.append(p)
-        elif current_user.rol == "cobranza":
-            if not is_matricula:
-                filtered_payments.append(p)
-        else:
-            filtered_payments.append(p)
-            
-    return await payment_service.enrich_payments_with_details_bulk(filtered_payments)
+    payments = await payment_service.get_payments_pendientes(current_user.rol, page, per_page)
+    return await payment_service.enrich_payments_with_details_bulk(payments)
 
 
 @router.get(
@@ -454,7 +427,6 @@ async def generar_reporte_excel_pagos(
     from openpyxl import Workbook
     from openpyxl.styles import Font, Alignment, PatternFill
     from io import BytesIO
-    from models.enrollment import Enrollment
     
     if current_user.rol not in ["superadmin", "admin", "cpd", "cobranza", "mae"]:
         raise HTTPException(status_code=403, detail="No autorizado para generar reportes")
@@ -485,16 +457,7 @@ async def generar_reporte_excel_pagos(
     payments = await Payment.find(criteria).sort("-fecha_subida").to_list()
     
     # --- PREFETCH BULK DE ALTO RENDIMIENTO (1 SOLA CONSULTA DE RED) ---
-    student_ids = list({p.estudiante_id for p in payments if p.estudiante_id})
-    enrollment_ids = list({p.inscripcion_id for p in payments if p.inscripcion_id})
-    
-    students_task = Student.find(In(Student.id, student_ids)).to_list()
-    enrollments_task = Enrollment.find(In(Enrollment.id, enrollment_ids)).to_list()
-    
-    students, enrollments = await asyncio.gather(students_task, enrollments_task)
-    
-    students_map = {s.id: s for s in students}
-    enrollments_map = {e.id: e for e in enrollments}
+    students_map, enrollments_map = await payment_service.fetch_payment_lookup_maps(payments)
     # ------------------------------------------------------------------
     
     wb = Workbook()
@@ -523,7 +486,6 @@ async def generar_reporte_excel_pagos(
         if enrollment:
             total_cuotas = enrollment.cantidad_cuotas
         
-        from core.timezone_utils import to_bolivia_time
         fecha_bolivia = to_bolivia_time(payment.fecha_subida)
 
         row = [
@@ -3,8 +3,9 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Q
 from pydantic import BaseModel
 from models.student import Student
 from models.user import User
-from models.enums import TipoEstudiante
-from schemas.student import StudentCreate, StudentResponse, StudentUpdateSelf, StudentUpdateAdmin, ChangePassword
+from models.enums import TipoEstudiante, UserRole
+from core.security import verify_password_async, get_password_hash_async
+from schemas.student import StudentCreate, StudentResponse, StudentListResponse, StudentUpdateSelf, StudentUpdateAdmin, ChangePassword
 from services import student_service
 from beanie import PydanticObjectId
 
@@ -14,11 +15,11 @@ from api.dependencies import require_superadmin, require_cpd, require_staff, get
 router = APIRouter()
 
 from schemas.common import PaginatedResponse, PaginationMeta
-import math
 
 @router.get(
     "/",
-    response_model=PaginatedResponse[StudentResponse],
+    response_model=PaginatedResponse[StudentListResponse],
+    response_model_exclude_none=True,
     summary="Listar Estudiantes"
 )
 async def read_students(
@@ -28,20 +29,23 @@ async def read_students(
     activo: Optional[bool] = Query(None, description="Filtrar por estado activo/inactivo"),
     estado_titulo: Optional[str] = Query(None, description="Filtrar por estado del título"),
     curso_id: Optional[PydanticObjectId] = Query(None, description="Filtrar por curso inscrito"),
+    after_id: Optional[PydanticObjectId] = Query(
+        None, description="Cursor (meta.nextCursor de la página anterior); si se envía, 'page' se ignora"
+    ),
     current_user: User = Depends(require_staff) # <-- TODOS LOS ADMINISTRATIVOS (MAE, COBRANZA, CPD) PUEDEN LEER LA TABLA
 ) -> Any:
-    """Listar estudiantes con paginación y filtros avanzados"""
-    students, total_count = await student_service.get_students(
-        page=page, per_page=per_page, q=q, activo=activo, estado_titulo=estado_titulo, curso_id=curso_id
-    )
+    """Listar estudiantes con paginación (por página o por cursor) y filtros avanzados"""
+    try:
+        pagina = await student_service.get_students(
+            page=page, per_page=per_page, q=q, activo=activo, estado_titulo=estado_titulo,
+            curso_id=curso_id, after_id=after_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    total_pages = math.ceil(total_count / per_page) if total_count > 0 else 0
     return {
-        "data": students,
-        "meta": PaginationMeta(
-            page=page, limit=per_page, totalItems=total_count, totalPages=total_pages,
-            hasNextPage=(page < total_pages), hasPrevPage=(page > 1)
-        )
+        "data": pagina.items,
+        "meta": PaginationMeta(**pagina.meta(page, per_page))
     }
 
 @router.post(
@@ -65,6 +69,7 @@ async def create_student(
 @router.get(
     "/{id}",
     response_model=StudentResponse,
+    response_model_exclude_none=True,
     summary="Ver Estudiante"
 )
 async def read_student(
@@ -110,14 +115,13 @@ async def change_password(
     password_data: ChangePassword,
     current_user: Student = Depends(get_current_user)
 ) -> Any:
-    from core.security import verify_password, get_password_hash
-    if not verify_password(password_data.current_password, current_user.password):
+    if not await verify_password_async(password_data.current_password, current_user.password):
         raise HTTPException(status_code=400, detail="La contraseña actual es incorrecta")
 
     if password_data.current_password == password_data.new_password:
         raise HTTPException(status_code=400, detail="La nueva contraseña debe ser diferente a la actual")
     
-    current_user.password = get_password_hash(password_data.new_password)
+    current_user.password = await get_password_hash_async(password_data.new_password)
     await current_user.save()
     return current_user
 
@@ -179,30 +183,14 @@ async def delete_student(
     current_user: User = Depends(require_superadmin) # <-- SOLO EL SUPERADMIN PUEDE BORRAR
 ) -> Any:
     """Eliminar estudiante (Retención de Auditoría Operativa)"""
-    from models.enums import UserRole
     if current_user.rol != UserRole.SUPERADMIN:
         raise HTTPException(status_code=403, detail="Solo SUPERADMIN puede eliminar estudiantes")
     
-    student = await student_service.get_student(id=id)
+    # Cascada (pagos pendientes, inscripciones, referencias en cursos) con
+    # operaciones masivas en paralelo y, después, el borrado del estudiante
+    student = await student_service.delete_student(id=id)
     if not student:
         raise HTTPException(status_code=404, detail="Estudiante no encontrado")
-    
-    from models.enrollment import Enrollment
-    try:
-        from models.payment import Payment
-    except ImportError:
-        Payment = None
-
-    enrollments = await Enrollment.find(Enrollment.estudiante_id == id).to_list()
-    enrollment_ids = [e.id for e in enrollments]
-
-    if enrollment_ids and Payment:
-        # SOLO PURGAMOS LOS PENDIENTES
-        await Payment.find({"enrollment_id": {"$in": enrollment_ids}, "estado_pago": "pendiente"}).delete()
-        await Payment.find({"estudiante_id": id, "estado_pago": "pendiente"}).delete()
-
-    await Enrollment.find(Enrollment.estudiante_id == id).delete()
-    student = await student_service.delete_student(id=id)
     return student
 
 
@@ -349,23 +337,9 @@ class BulkDeleteRequest(BaseModel):
 
 @router.post("/bulk-delete", summary="Eliminar Estudiantes en Lote (Cascada)")
 async def bulk_delete_students(*, payload: BulkDeleteRequest, current_user: User = Depends(require_superadmin)) -> Any:
-    from models.enums import UserRole
-    from models.enrollment import Enrollment
-    try: from models.payment import Payment
-    except ImportError: Payment = None
-        
     if current_user.rol != UserRole.SUPERADMIN: raise HTTPException(403, "Solo SUPERADMIN")
     if not payload.ids: raise HTTPException(400, "Debe proporcionar IDs")
         
-    enrollments = await Enrollment.find({"estudiante_id": {"$in": payload.ids}}).to_list()
-    enrollment_ids = [e.id for e in enrollments]
-    
-    if Payment:
-        # SOLO PURGAMOS LOS PENDIENTES
-        if enrollment_ids: await Payment.find({"enrollment_id": {"$in": enrollment_ids}, "estado_pago": "pendiente"}).delete()
-        await Payment.find({"estudiante_id": {"$in": payload.ids}, "estado_pago": "pendiente"}).delete()
-        
-    await Enrollment.find({"estudiante_id": {"$in": payload.ids}}).delete()
-    await Student.find({"_id": {"$in": payload.ids}}).delete()
+    deleted_count = await student_service.delete_students(payload.ids)
     
-    return {"message": f"Se eliminaron {len(payload.ids)} estudiantes.", "deleted_count": len(payload.ids)}
+    return {"message": f"Se eliminaron {deleted_count} estudiantes.", "deleted_count": deleted_count}
@@ -1,7 +1,7 @@
 from typing import List, Any, Optional
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
 from models.user import User
-from schemas.user import UserCreate, UserResponse, UserUpdate
+from schemas.user import UserCreate, UserResponse, UserUpdate, UserResponseListAdapter
 from services import user_service
 from beanie import PydanticObjectId
 
@@ -9,13 +9,12 @@ from beanie import PydanticObjectId
 from api.dependencies import require_superadmin, require_cpd, get_current_user
 
 # Para el cambio de contraseña (Bug 5)
-from core.security import verify_password, get_password_hash
+from core.security import verify_password_async, get_password_hash_async
 from pydantic import BaseModel, Field
 
 router = APIRouter()
 
 from schemas.common import PaginatedResponse, PaginationMeta
-import math
 
 
 class UserChangePassword(BaseModel):
@@ -26,7 +25,9 @@ class UserChangePassword(BaseModel):
 
 @router.get(
     "/teachers",
-    response_model=List[UserResponse],
+    # La serialización la hace el adapter cacheado; el modelo queda solo para OpenAPI
+    response_model=None,
+    responses={200: {"model": List[UserResponse]}},
     summary="Listar Docentes Activos"
 )
 async def get_teachers(
@@ -38,7 +39,11 @@ async def get_teachers(
     **Requiere:** CPD, Admin o SuperAdmin
     """
     users = await user_service.get_active_users()
-    return users
+    teachers = UserResponseListAdapter.validate_python(users, from_attributes=True)
+    return Response(
+        content=UserResponseListAdapter.dump_json(teachers, by_alias=True),
+        media_type="application/json"
+    )
 
 
 @router.get(
@@ -49,6 +54,9 @@ async def get_teachers(
 async def read_users(
     page: int = Query(1, ge=1, description="Número de página"),
     per_page: int = Query(10, ge=1, le=100, description="Elementos por página"),
+    after_id: Optional[PydanticObjectId] = Query(
+        None, description="Cursor (meta.nextCursor de la página anterior); si se envía, 'page' se ignora"
+    ),
     current_user: User = Depends(require_superadmin) # <-- CORRECCIÓN: Solo SuperAdmin
 ) -> Any:
     """
@@ -56,23 +64,16 @@ async def read_users(
     
     **Requiere:** SOLO SuperAdmin
     """
-    users, total_count = await user_service.get_users(page=page, per_page=per_page)
-    
-    # Calcular metadatos
-    total_pages = math.ceil(total_count / per_page) if total_count > 0 else 0
-    has_next = page < total_pages
-    has_prev = page > 1
+    try:
+        pagina = await user_service.get_users(
+            page=page, per_page=per_page, after_id=after_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
-        "data": users,
-        "meta": PaginationMeta(
-            page=page,
-            limit=per_page,
-            totalItems=total_count,
-            totalPages=total_pages,
-            hasNextPage=has_next,
-            hasPrevPage=has_prev
-        )
+        "data": pagina.items,
+        "meta": PaginationMeta(**pagina.meta(page, per_page))
     }
 
 @router.post(
@@ -91,12 +92,10 @@ async def create_user(
     
     **Requiere:** SOLO SuperAdmin
     """
-    existing_user = await user_service.get_user_by_username(user_in.username)
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username ya existe")
-    
-    existing_email = await user_service.get_user_by_email(user_in.email)
-    if existing_email:
+    existing = await user_service.get_user_by_identity(user_in.username, user_in.email)
+    if existing:
+        if existing.username == user_in.username:
+            raise HTTPException(status_code=400, detail="Username ya existe")
         raise HTTPException(status_code=400, detail="Email ya existe")
     
     user = await user_service.create_user(user_in=user_in)
@@ -161,18 +160,17 @@ async def delete_user(
     id: PydanticObjectId,
     current_user: User = Depends(require_superadmin)
 ) -> Any:
-    user = await user_service.get_user(id=id)
-    if not user:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
-        
     # BUG 7 FIX: Protección extrema contra el borrado físico de la propia cuenta
-    if current_user.id == user.id:
+    # (se compara por ID: no hace falta cargar el usuario antes de borrarlo)
+    if current_user.id == id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Operación prohibida: Un superadministrador no puede eliminar su propia cuenta en sesión."
         )
         
     user = await user_service.delete_user(id=id)
+    if not user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return user
 
 
@@ -192,7 +190,7 @@ async def change_my_password(
         raise HTTPException(status_code=403, detail="Ruta solo para personal administrativo")
         
     # Verificar contraseña actual
-    if not verify_password(data.current_password, current_user.password):
+    if not await verify_password_async(data.current_password, current_user.password):
         raise HTTPException(status_code=400, detail="La contraseña actual es incorrecta")
         
     if data.new_password != data.confirm_password:
@@ -204,7 +202,7 @@ async def change_my_password(
     if data.current_password == data.new_password:
         raise HTTPException(status_code=400, detail="La nueva contraseña debe ser diferente a la actual")
         
-    current_user.password = get_password_hash(data.new_password)
+    current_user.password = await get_password_hash_async(data.new_password)
     await current_user.save()
     
     return {"message": "Contraseña actualizada correctamente"}
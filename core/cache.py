@@ -0,0 +1,80 @@
+"""
+Caché TTL en Memoria
+====================
+
+Caché de lectura por clave para documentos que se consultan repetidamente
+dentro de un mismo flujo (aprobar -> consultar -> re-renderizar).
+
+- TTL corta: la caché es por proceso, así que la TTL acota cuánto tarda en
+  verse una escritura hecha desde otro worker
+- Tamaño máximo: al llenarse se descarta la entrada más antigua
+- Copias: se guarda una copia y cada lectura devuelve otra, de modo que
+  ninguna petición ve (ni guarda) los cambios en curso de otra
+- No se cachean ausencias: el documento puede crearse enseguida
+
+Uso:
+----
+from core.cache import TTLCache
+
+_enrollment_cache: TTLCache[Enrollment] = TTLCache(ttl=5.0, maxsize=1024)
+
+enrollment = await _enrollment_cache.get_or_load(id, lambda: Enrollment.get(id))
+_enrollment_cache.invalidate(id)   # tras escribir la inscripción
+"""
+
+import time
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class TTLCache(Generic[ModelT]):
+    """Caché TTL acotada de modelos Pydantic que entrega copias"""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entradas: Dict[Hashable, Tuple[float, ModelT]] = {}
+
+    def get(self, key: Hashable) -> Optional[ModelT]:
+        """Copia del valor vigente, o None si no está o ya venció"""
+        entrada = self._entradas.get(key)
+        if entrada is None:
+            return None
+        if time.monotonic() - entrada[0] >= self.ttl:
+            self._entradas.pop(key, None)
+            return None
+        return entrada[1].model_copy(deep=True)
+
+    def set(self, key: Hashable, value: ModelT) -> None:
+        """Guardar una copia del valor"""
+        if key not in self._entradas and len(self._entradas) >= self.maxsize:
+            # Se descarta la entrada más antigua (orden de inserción del dict)
+            self._entradas.pop(next(iter(self._entradas)))
+        self._entradas[key] = (time.monotonic(), value.model_copy(deep=True))
+
+    def invalidate(self, key: Hashable) -> None:
+        """Descartar la entrada (tras escribir el documento)"""
+        self._entradas.pop(key, None)
+
+    def clear(self) -> None:
+        """Vaciar la caché"""
+        self._entradas.clear()
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Optional[ModelT]]]
+    ) -> Optional[ModelT]:
+        """Leer de la caché o, si no está, cargar con `loader` y guardar"""
+        valor = self.get(key)
+        if valor is not None:
+            return valor
+        valor = await loader()
+        if valor is None:
+            self.invalidate(key)
+            return None
+        self.set(key, valor)
+        return valor
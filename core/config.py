@@ -23,6 +23,12 @@ class Settings(BaseSettings):
     MONGODB_URL: str = Field(..., env="MONGODB_URL")
     DATABASE_NAME: str = Field("kyc_db", env="DATABASE_NAME")
     
+    # Pool de conexiones de Motor (ver core/database.py)
+    MONGO_MAX_POOL_SIZE: int = Field(50, env="MONGO_MAX_POOL_SIZE")
+    MONGO_MIN_POOL_SIZE: int = Field(10, env="MONGO_MIN_POOL_SIZE")
+    MONGO_MAX_IDLE_TIME_MS: int = Field(300000, env="MONGO_MAX_IDLE_TIME_MS")
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = Field(5000, env="MONGO_WAIT_QUEUE_TIMEOUT_MS")
+    
     # Security
     SECRET_KEY: str = Field(..., env="SECRET_KEY")
     ALGORITHM: str =  Field(..., env="ALGORITHM")
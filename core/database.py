@@ -3,18 +3,30 @@ Conexión a Base de Datos
 ========================
 
 Manejo de la conexión asíncrona a MongoDB usando Motor y Beanie ODM.
+
+Requiere MongoDB 6.0 o superior: el índice único parcial
+`numero_transaccion_vigente_unique` de payments usa $in en su
+partialFilterExpression, que las versiones anteriores rechazan.
+
+Los índices únicos de payments (INDICES_UNICOS_PAGOS) se construyen aparte,
+después de Beanie: si hay pagos duplicados que lo impiden, el índice se omite
+y se informa, sin modificar pagos ni saldos. Esos duplicados son registros
+contables y se resuelven con revisión humana (scripts/resolver_pagos_duplicados.py).
 """
 
+from typing import List, Optional
+
 import motor.motor_asyncio
 from beanie import init_beanie
 from .config import settings
 
 # Importar todos los modelos para registrarlos en Beanie
 from models.user import User
-from models.student import Student
+from models.student import Student, STUDENT_TEXT_WEIGHTS
 from models.course import Course
 from models.enrollment import Enrollment
-from models.payment import Payment
+from models.payment import Payment, INDICE_CUOTA_APROBADA, INDICE_TRANSACCION_VIGENTE
+from models.enums import EstadoPago
 from models.payment_config import PaymentConfig
 from models.discount import Discount
 from models.classroom import Classroom, ClassroomStudent
@@ -23,6 +35,122 @@ from models.assignment import Assignment
 from models.submission import Submission
 
 
+# Versión mínima del servidor (ver docstring del módulo)
+MONGODB_MIN_VERSION = (6, 0)
+
+# Índices únicos parciales de payments que los duplicados existentes pueden
+# impedir construir: (índice, clave que agrupa los duplicados, estados que cubre)
+INDICES_UNICOS_PAGOS = [
+    (
+        INDICE_CUOTA_APROBADA,
+        {"inscripcion_id": "$inscripcion_id", "concepto": "$concepto", "numero_cuota": "$numero_cuota"},
+        [EstadoPago.APROBADO.value]
+    ),
+    (
+        INDICE_TRANSACCION_VIGENTE,
+        "$numero_transaccion",
+        [EstadoPago.PENDIENTE.value, EstadoPago.APROBADO.value]
+    ),
+]
+
+# Cliente compartido del proceso (se crea en init_db)
+client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
+
+
+def get_client() -> motor.motor_asyncio.AsyncIOMotorClient:
+    """Devuelve el cliente de Motor inicializado en init_db"""
+    if client is None:
+        raise RuntimeError("La base de datos no fue inicializada (init_db)")
+    return client
+
+
+def get_pool_status() -> dict:
+    """Resumen del pool y de la topología, para diagnóstico"""
+    mongo = get_client()
+    opciones = mongo.options.pool_options
+    return {
+        "max_pool_size": opciones.max_pool_size,
+        "min_pool_size": opciones.min_pool_size,
+        "max_idle_time_seconds": opciones.max_idle_time_seconds,
+        "wait_queue_timeout": opciones.wait_queue_timeout,
+        "topology": mongo.topology_description.topology_type_name,
+        "servers": [
+            {
+                "address": f"{host}:{port}",
+                "type": server.server_type_name,
+                "round_trip_time_ms": (
+                    round(server.round_trip_time * 1000, 2)
+                    if server.round_trip_time is not None else None
+                ),
+            }
+            for (host, port), server in mongo.topology_description.server_descriptions().items()
+        ],
+    }
+
+
+async def buscar_pagos_duplicados(db, clave, estados: List[str]) -> List[dict]:
+    """
+    Grupos de pagos en `estados` que comparten `clave` (solo los de más de un pago)
+
+    Dentro de cada grupo los pagos van primero los aprobados y luego por
+    fecha de subida (el primero es el que conviene conservar por defecto).
+    """
+    return await db["payments"].aggregate([
+        {"$match": {"estado_pago": {"$in": estados}}},
+        {"$addFields": {
+            "_prioridad": {"$cond": [{"$eq": ["$estado_pago", EstadoPago.APROBADO.value]}, 0, 1]}
+        }},
+        {"$sort": {"_prioridad": 1, "fecha_subida": 1, "_id": 1}},
+        {
+            "$group": {
+                "_id": clave,
+                "pagos": {"$push": {
+                    "_id": "$_id",
+                    "estado_pago": "$estado_pago",
+                    "inscripcion_id": "$inscripcion_id",
+                    "estudiante_id": "$estudiante_id",
+                    "concepto": "$concepto",
+                    "numero_cuota": "$numero_cuota",
+                    "numero_transaccion": "$numero_transaccion",
+                    "cantidad_pago": "$cantidad_pago",
+                    "fecha_subida": "$fecha_subida"
+                }},
+                "count": {"$sum": 1}
+            }
+        },
+        {
+            "$match": {
+                "count": {"$gt": 1}
+            }
+        }
+    ]).to_list(length=None)
+
+
+async def crear_indices_unicos_pagos(db) -> List[str]:
+    """
+    Construye los índices de INDICES_UNICOS_PAGOS que los datos permiten
+
+    Un índice con pagos duplicados no se construye ni se corrigen los pagos:
+    se informa para que se resuelvan con scripts/resolver_pagos_duplicados.py.
+    Devuelve los nombres de los índices omitidos.
+    """
+    omitidos = []
+    for indice, clave, estados in INDICES_UNICOS_PAGOS:
+        nombre = indice.document["name"]
+        duplicados = await buscar_pagos_duplicados(db, clave, estados)
+        if duplicados:
+            omitidos.append(nombre)
+            pagos = sum(len(item["pagos"]) for item in duplicados)
+            print(
+                f"[ERROR] Índice único '{nombre}' NO construido: {len(duplicados)} grupos "
+                f"({pagos} pagos) lo impiden. Mientras tanto la base no bloquea nuevos "
+                f"duplicados. Revisar y resolver con: python scripts/resolver_pagos_duplicados.py"
+            )
+            continue
+        await db["payments"].create_indexes([indice])
+    return omitidos
+
+
 async def _sanitize_legacy_database(db):
     """
     Sanea de forma asíncrona la base de datos de registros duplicados y conflictos
@@ -141,6 +269,17 @@ async def _sanitize_legacy_database(db):
             # Falla silenciosamente si la colección aún no tiene índices o no existe en esta BD
             pass
 
+    # 6. Índice de texto de students: MongoDB admite uno solo por colección y no
+    # permite redefinirlo con el mismo nombre; si cambiaron sus campos/pesos se
+    # elimina para que Beanie lo re-cree con la definición actual
+    try:
+        text_index = (await student_col.index_information()).get("students_text_search")
+        if text_index and text_index.get("weights") != STUDENT_TEXT_WEIGHTS:
+            await student_col.drop_index("students_text_search")
+            print("[STARTUP-CLEANUP] Índice de texto de 'students' redefinido.")
+    except Exception:
+        pass
+
 
 async def init_db():
     """
@@ -148,18 +287,29 @@ async def init_db():
 
     Esta función debe ser llamada al inicio de la aplicación (startup event).
     """
+    global client
+    
     # Crear cliente de Motor con pool optimizado para concurrencia
-    # Evita el handshaking TCP costoso por cada petición de la API
+    # Evita el handshaking TCP costoso por cada petición de la API.
+    # Un único cliente por proceso: los asyncio.gather de los servicios
+    # comparten este pool en lugar de serializarse esperando conexión.
     client = motor.motor_asyncio.AsyncIOMotorClient(
         settings.MONGODB_URL,
-        maxPoolSize=50,       # Máximo de conexiones concurrentes activas
-        minPoolSize=10,       # Mantener un mínimo de 10 conexiones pre-abiertas en caliente
-        maxIdleTimeMS=10000,  # Cerrar conexiones inactivas tras 10 segundos
-        waitQueueTimeoutMS=5000  # Evita bloqueos indefinidos si el pool se satura
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,       # Máximo de conexiones concurrentes activas
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,       # Conexiones pre-abiertas en caliente
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,  # Evita cerrar/reabrir conexiones entre ráfagas
+        waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS  # Evita bloqueos indefinidos si el pool se satura
     )
 
     db = client[settings.DATABASE_NAME]
 
+    version = (await client.server_info()).get("versionArray", [])[:2]
+    if version and tuple(version) < MONGODB_MIN_VERSION:
+        print(
+            f"[WARN] MongoDB {'.'.join(map(str, version))} detectado: se requiere "
+            f"{'.'.join(map(str, MONGODB_MIN_VERSION))} o superior (índices parciales con $in)."
+        )
+
     # Ejecutar saneamiento de duplicados e índices históricos antes de inicializar Beanie
     await _sanitize_legacy_database(db)
 
@@ -181,6 +331,7 @@ async def init_db():
             Submission,
         ]
     )
+    await crear_indices_unicos_pagos(db)
     print(f"[OK] Conectado a MongoDB ({settings.DATABASE_NAME}) y Beanie inicializado con Connection Pool optimizado.")
     
     
\ No newline at end of file
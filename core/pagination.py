@@ -0,0 +1,105 @@
+"""
+Paginación por Página y por Cursor (keyset)
+===========================================
+
+Piezas comunes de los listados que admiten `page` y `after_id`.
+
+En modo cursor, `after_id` es el último elemento de la página anterior y la
+página sale de un rango del índice (campo de orden, _id), sin $skip:
+- no se cuenta el total (contar todas las coincidencias anularía la ventaja
+  del keyset en páginas profundas)
+- se piden per_page + 1 filas: la fila extra solo indica si hay página siguiente
+- hasPrevPage se consulta (¿hay coincidencias en o antes del cursor?)
+
+Uso:
+----
+from core.pagination import Pagina, resolver_cursor, filtro_siguientes
+
+valor = await resolver_cursor(Student.get_motor_collection(), after_id, "created_at")
+filas = await Student.find(filtro, filtro_siguientes("created_at", valor, after_id)).limit(per_page + 1).to_list()
+pagina = Pagina.por_cursor(filas, per_page, has_prev=True)
+meta = PaginationMeta(**pagina.meta(page, per_page))
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Generic, List, Optional, TypeVar
+
+from beanie import PydanticObjectId
+
+T = TypeVar("T")
+
+
+async def resolver_cursor(collection, after_id: PydanticObjectId, campo: str) -> Any:
+    """Valor del campo de orden en el elemento del cursor (ValueError si no existe)"""
+    ref = await collection.find_one({"_id": after_id}, {campo: 1})
+    if not ref:
+        raise ValueError("Cursor de paginación inválido")
+    return ref.get(campo)
+
+
+def filtro_siguientes(campo: str, valor: Any, after_id: PydanticObjectId) -> dict:
+    """Elementos posteriores al cursor en orden (campo, _id) descendente"""
+    return {"$or": [
+        {campo: {"$lt": valor}},
+        {campo: valor, "_id": {"$lt": after_id}}
+    ]}
+
+
+def filtro_anteriores(campo: str, valor: Any, after_id: PydanticObjectId) -> dict:
+    """El cursor y los elementos previos a él en orden (campo, _id) descendente"""
+    return {"$or": [
+        {campo: {"$gt": valor}},
+        {campo: valor, "_id": {"$gte": after_id}}
+    ]}
+
+
+@dataclass
+class Pagina(Generic[T]):
+    """Una página de resultados con lo necesario para armar PaginationMeta"""
+    items: List[T]
+    total: Optional[int]
+    has_next: bool
+    has_prev: bool
+    next_cursor: Optional[str]
+
+    @classmethod
+    def por_numero(cls, items: List[T], total: int, page: int, per_page: int) -> "Pagina[T]":
+        """Página numerada (con total); el cursor solo se ofrece si hay siguiente"""
+        has_next = page * per_page < total
+        return cls(
+            items=items,
+            total=total,
+            has_next=has_next,
+            has_prev=page > 1,
+            next_cursor=str(items[-1].id) if has_next and items else None
+        )
+
+    @classmethod
+    def por_cursor(cls, filas: List[T], per_page: int, has_prev: bool) -> "Pagina[T]":
+        """Página por cursor a partir de hasta per_page + 1 filas (sin total)"""
+        has_next = len(filas) > per_page
+        items = filas[:per_page]
+        return cls(
+            items=items,
+            total=None,
+            has_next=has_next,
+            has_prev=has_prev,
+            next_cursor=str(items[-1].id) if has_next else None
+        )
+
+    def meta(self, page: int, per_page: int) -> dict:
+        """Campos de schemas.common.PaginationMeta"""
+        if self.total is None:
+            total_pages = None
+        else:
+            total_pages = math.ceil(self.total / per_page) if self.total > 0 else 0
+        return {
+            "page": page,
+            "limit": per_page,
+            "totalItems": self.total,
+            "totalPages": total_pages,
+            "hasNextPage": self.has_next,
+            "hasPrevPage": self.has_prev,
+            "nextCursor": self.next_cursor
+        }
@@ -0,0 +1,77 @@
+"""
+Respuestas JSON con orjson
+==========================
+
+Clase de respuesta por defecto de la API. Serializa con orjson, que es
+considerablemente más rápido que el módulo json estándar para payloads
+con muchos datetime y float (pagos, inscripciones, reportes).
+
+Uso:
+----
+from core.responses import ORJSONResponse
+
+app = FastAPI(default_response_class=ORJSONResponse)
+"""
+
+from typing import Any, AsyncIterable, AsyncIterator
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+# Tipo de contenido de los flujos de una línea JSON por elemento
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def orjson_default(obj: Any) -> Any:
+    """Serializa los tipos que orjson no soporta de forma nativa (ObjectId)"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse serializada con orjson, con soporte para ObjectId de MongoDB
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+async def stream_json_array(items: AsyncIterable[Any], adapter: TypeAdapter) -> AsyncIterator[bytes]:
+    """
+    Emite un arreglo JSON elemento por elemento (para StreamingResponse)
+
+    Cada elemento se valida/serializa con `adapter` (from_attributes, por alias)
+    a medida que llega del cursor: la memoria queda acotada a un documento y
+    el primer byte sale sin esperar a materializar toda la lista.
+    """
+    yield b"["
+    primero = True
+    async for item in items:
+        if not primero:
+            yield b","
+        primero = False
+        yield adapter.dump_json(adapter.validate_python(item, from_attributes=True), by_alias=True)
+    yield b"]"
+
+
+async def stream_ndjson(items: AsyncIterable[Any], adapter: TypeAdapter) -> AsyncIterator[bytes]:
+    """
+    Emite una línea JSON por elemento (NDJSON, para StreamingResponse)
+
+    Cada elemento se valida/serializa con `adapter` (from_attributes, por alias)
+    a medida que llega del cursor: la memoria queda acotada a un documento y
+    el primer byte sale sin esperar a materializar toda la lista. Cada línea
+    es un JSON válido por sí sola, así que un corte a mitad del flujo no deja
+    al cliente con un documento mal formado: solo faltan las últimas líneas.
+    """
+    async for item in items:
+        yield adapter.dump_json(adapter.validate_python(item, from_attributes=True), by_alias=True)
+        yield b"\n"
@@ -0,0 +1,63 @@
+"""
+Filtros de Búsqueda Libre
+=========================
+
+Arma el filtro de MongoDB para el parámetro `q` de los listados.
+
+El índice de texto ($text) solo encuentra palabras completas: "Gonz" no
+trae a "González". Por eso cada búsqueda combina, en un mismo $or:
+- $text sobre el índice de texto de la colección (palabras completas, en
+  cualquier posición del campo)
+- un prefijo anclado (^...) por campo, que usa el índice simple del campo
+
+Queda fuera la coincidencia en medio de una palabra ("nzál" no encuentra
+"González"): ni el índice de texto ni un prefijo anclado la resuelven, y un
+regex sin anclar obliga a recorrer la colección completa.
+
+MongoDB solo acepta $text dentro de un $or si todas las ramas pueden usar un
+índice: cada campo pasado como prefijo debe estar indexado.
+
+Uso:
+----
+from core.search import filtro_busqueda
+
+filtro = filtro_busqueda(q, prefijos={"nombre_programa": True, "codigo": False})
+cursos = await Course.find(filtro).to_list()
+"""
+
+import re
+from typing import Dict
+
+# Al menos un carácter "de palabra": si no lo hay, $text no tiene términos que buscar
+PALABRA_RE = re.compile(r"\w")
+
+
+def prefijo(q: str, ignorar_mayusculas: bool = False) -> dict:
+    """
+    Regex anclado al inicio del campo (texto de q escapado)
+
+    Sin `ignorar_mayusculas` el índice del campo se recorre solo en el rango
+    del prefijo; con él, MongoDB recorre el índice completo (sin tocar los
+    documentos), que sigue siendo mucho más barato que un regex sin anclar.
+    """
+    regex = {"$regex": "^" + re.escape(q)}
+    if ignorar_mayusculas:
+        regex["$options"] = "i"
+    return regex
+
+
+def filtro_busqueda(q: str, prefijos: Dict[str, bool]) -> dict:
+    """
+    Filtro $or de $text más un prefijo anclado por campo
+
+    Args:
+        q: Texto buscado (sin espacios al borde)
+        prefijos: Campo -> si el prefijo ignora mayúsculas
+
+    Returns:
+        {"$or": [...]}; la rama $text se omite si q no tiene palabras
+    """
+    ramas = [{campo: prefijo(q, ignorar)} for campo, ignorar in prefijos.items()]
+    if PALABRA_RE.search(q):
+        ramas.insert(0, {"$text": {"$search": q}})
+    return {"$or": ramas}
@@ -5,6 +5,9 @@ Módulo de Seguridad
 Funciones para autenticación y manejo de contraseñas.
 """
 
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -12,6 +15,15 @@ import bcrypt
 from core.config import settings
 
 
+# Pool propio para bcrypt: más hilos que núcleos no hashean más rápido, y así
+# una importación masiva (que lanza cientos de hashes con gather) no satura el
+# executor por defecto del event loop que usan los demás asyncio.to_thread
+_BCRYPT_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="bcrypt"
+)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verificar si una contraseña coincide con su hash
@@ -44,6 +56,23 @@ def get_password_hash(password: str) -> str:
     return hashed.decode('utf-8')
 
 
+async def get_password_hash_async(password: str) -> str:
+    """
+    get_password_hash fuera del event loop
+    
+    bcrypt consume decenas/cientos de ms de CPU por hash; se ejecuta en el pool
+    de hilos dedicado (bcrypt libera el GIL) para no bloquear las demás peticiones.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_BCRYPT_EXECUTOR, get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password fuera del event loop (ver get_password_hash_async)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_BCRYPT_EXECUTOR, verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Crear un token JWT
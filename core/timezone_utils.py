@@ -45,8 +45,13 @@ def to_bolivia_time(utc_dt: Optional[datetime]) -> str:
     if not utc_dt:
         return ""
     
+    # isoformat con separador " " y precisión de segundos produce el mismo
+    # "YYYY-MM-DD HH:MM:SS" que strftime, sin parsear la cadena de formato
+    # en cada llamada (se invoca varias veces por fila en listados/reportes).
+    # No se usa astimezone(): Motor devuelve datetimes naive en UTC y
+    # astimezone los interpretaría como hora local del servidor.
     bolivia_dt = utc_dt + BOLIVIA_OFFSET
-    return bolivia_dt.strftime("%Y-%m-%d %H:%M:%S")
+    return bolivia_dt.replace(tzinfo=None).isoformat(" ", "seconds")
 
 
 def convert_dict_dates_to_bolivia(
@@ -3,11 +3,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from core.config import settings
 from core.database import init_db
+from core.responses import ORJSONResponse
 from api.api import api_router
 
 app = FastAPI(
     title=settings.APP_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    # orjson serializa datetime/float mucho más rápido que json estándar
+    default_response_class=ORJSONResponse
 )
 
 # Compresión Gzip para todas las respuestas mayores a 1000 bytes (1 KB)
@@ -32,4 +35,12 @@ async def start_db():
 async def root():
     return {"message": "Welcome to KyC Payment System API"}
 
+if settings.DEBUG:
+    from core.database import get_pool_status
+
+    @app.get("/debug/pool", include_in_schema=False)
+    async def debug_pool():
+        """Estado del pool de conexiones de MongoDB (solo en DEBUG)"""
+        return get_pool_status()
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
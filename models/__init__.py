@@ -18,15 +18,17 @@ Estructura:
 - user.py: Modelo de Usuario
 """
 
-from .base import MongoBaseModel, PyObjectId
+from .base import MongoBaseModel, PyObjectId, ObjectIdStr, UTCDateTime, to_object_id
 from .enums import (
     TipoCurso,
     Modalidad,
     EstadoInscripcion,
     TipoPago,
     EstadoPago,
+    EstadoPagoLit,
     TipoTitulo,
     TipoEstudiante,
+    TipoEstudianteLit,
     EstadoRequisito,  # Nuevo
     UserRole
 )
@@ -44,6 +46,9 @@ __all__ = [
     # Base
     "MongoBaseModel",
     "PyObjectId",
+    "ObjectIdStr",
+    "UTCDateTime",
+    "to_object_id",
     
     # Enums
     "TipoCurso",
@@ -51,8 +56,10 @@ __all__ = [
     "EstadoInscripcion",
     "TipoPago",
     "EstadoPago",
+    "EstadoPagoLit",
     "TipoTitulo",
     "TipoEstudiante",
+    "TipoEstudianteLit",
     "EstadoRequisito",  # Nuevo
     "UserRole",
     
@@ -6,9 +6,9 @@ Este módulo contiene las clases base y utilidades compartidas por todos los mod
 Ahora utiliza **Beanie ODM** para integración directa con MongoDB.
 """
 
-from datetime import datetime
-from typing import Optional
-from pydantic import Field
+from datetime import datetime, timezone
+from typing import Annotated, Optional
+from pydantic import AfterValidator, BeforeValidator, Field, StringConstraints
 from beanie import Document, PydanticObjectId
 from bson import ObjectId
 
@@ -16,6 +16,32 @@ from bson import ObjectId
 # pero ahora es un alias de PydanticObjectId de Beanie
 PyObjectId = PydanticObjectId
 
+def _object_id_to_str(value):
+    return str(value) if isinstance(value, ObjectId) else value
+
+
+# ObjectId como string plano para schemas de la API: validación nativa de str
+# (regex de 24 hex) sin tipos arbitrarios. Acepta ObjectId al leer de MongoDB.
+ObjectIdStr = Annotated[
+    str,
+    StringConstraints(min_length=24, max_length=24, pattern=r"^[0-9a-fA-F]{24}$"),
+    BeforeValidator(_object_id_to_str)
+]
+
+
+def _ensure_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# Timestamps guardados con datetime.utcnow() (naive): se marcan como UTC.
+# NO usar en campos ya convertidos a hora boliviana (to_bolivia_time).
+UTCDateTime = Annotated[datetime, AfterValidator(_ensure_utc)]
+
+
+def to_object_id(value) -> PydanticObjectId:
+    """Convierte un ObjectIdStr al tipo de ID de Beanie (frontera con la BD)"""
+    return value if isinstance(value, ObjectId) else PydanticObjectId(value)
+
 class MongoBaseModel(Document):
     """
     Modelo base para todos los documentos de MongoDB usando Beanie
@@ -20,7 +20,7 @@ Colección MongoDB: courses
 from datetime import datetime
 from typing import Optional, List
 import pymongo
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field
 from .base import MongoBaseModel, PyObjectId
 from .enums import TipoCurso, Modalidad
 from .requisito import RequisitoTemplate
@@ -213,12 +213,17 @@ class Course(MongoBaseModel):
             # Índice compuesto para optimizar el filtrado de cursos activos en inscripciones
             [("activo", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)],
             # Índice simple de ordenamiento temporal
-            [("created_at", pymongo.DESCENDING)]
+            [("created_at", pymongo.DESCENDING)],
+            # Índice de texto (invertido) para la búsqueda libre por nombre de programa
+            pymongo.IndexModel(
+                [("nombre_programa", pymongo.TEXT)],
+                name="courses_text_search",
+                default_language="none"
+            )
         ]
 
-    class Config:
-        """Configuración y ejemplo de uso"""
-        schema_extra = {
+    model_config = {
+        "json_schema_extra": {
             "example": {
                 "codigo": "DIPL-2024-001",
                 "nombre_programa": "Diplomado en Ciencia de Datos",
@@ -239,3 +244,4 @@ class Course(MongoBaseModel):
                 "activo": True
             }
         }
+    }
@@ -17,7 +17,8 @@ Colección MongoDB: discounts
 
 from datetime import datetime
 from typing import Optional, List
-from pydantic import Field, validator
+import pymongo
+from pydantic import Field, field_validator
 from .base import MongoBaseModel, PyObjectId
 
 
@@ -143,8 +144,9 @@ class Discount(MongoBaseModel):
     # VALIDADORES
     # ========================================================================
     
-    @validator('fecha_fin')
-    def validar_fechas(cls, v, values):
+    @field_validator('fecha_fin')
+    @classmethod
+    def validar_fechas(cls, v, info):
         """
         Valida que la fecha de fin sea posterior a la fecha de inicio
         
@@ -154,8 +156,8 @@ class Discount(MongoBaseModel):
         - Descuentos que "terminan antes de empezar"
         - Períodos de vigencia inválidos
         """
-        if v and 'fecha_inicio' in values and values['fecha_inicio']:
-            if v < values['fecha_inicio']:
+        if v and info.data.get('fecha_inicio'):
+            if v < info.data['fecha_inicio']:
                 raise ValueError(
                     "La fecha de fin debe ser posterior a la fecha de inicio"
                 )
@@ -226,10 +228,15 @@ class Discount(MongoBaseModel):
     
     class Settings:
         name = "discounts"
+        indexes = [
+            # Índice Multikey compuesto para los descuentos activos de un estudiante
+            [("lista_estudiantes", pymongo.ASCENDING), ("activo", pymongo.ASCENDING)],
+            # Índice temporal simple para ordenación por defecto
+            [("created_at", pymongo.DESCENDING)]
+        ]
 
-    class Config:
-        """Configuración y ejemplos de uso"""
-        schema_extra = {
+    model_config = {
+        "json_schema_extra": {
             "examples": [
                 {
                     "nombre": "Beca Excelencia Académica",
@@ -263,3 +270,4 @@ class Discount(MongoBaseModel):
                 }
             ]
         }
+    }
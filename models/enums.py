@@ -21,6 +21,7 @@ Ejemplo con Enum (BUENO):
 """
 
 from enum import Enum
+from typing import Literal
 
 
 class TipoCurso(str, Enum):
@@ -195,6 +196,10 @@ class EstadoPago(str, Enum):
     APROBADO = "aprobado"
 
 
+# Variante Literal para schemas de respuesta (validación más barata que Enum)
+EstadoPagoLit = Literal["pendiente", "rechazado", "aprobado"]
+
+
 class TipoTitulo(str, Enum):
     """
     Tipos de títulos/certificados que se pueden emitir
@@ -260,6 +265,10 @@ class TipoEstudiante(str, Enum):
     EXTERNO = "externo"
 
 
+# Variante Literal para schemas de la API (validación más barata que Enum)
+TipoEstudianteLit = Literal["interno", "externo"]
+
+
 class EstadoRequisito(str, Enum):
     """
     Estados de validación de un requisito/documento
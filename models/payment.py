@@ -14,6 +14,35 @@ from .base import MongoBaseModel, PyObjectId
 from .enums import EstadoPago
 
 
+# Antiduplicados de aprobar_pago: a lo sumo un pago APROBADO por concepto/cuota
+# en cada inscripción. El propio update de aprobación choca con este índice.
+# Igual que el siguiente, lo construye core.database (no va en Settings.indexes)
+INDICE_CUOTA_APROBADA = pymongo.IndexModel(
+    [
+        ("inscripcion_id", pymongo.ASCENDING),
+        ("concepto", pymongo.ASCENDING),
+        ("numero_cuota", pymongo.ASCENDING)
+    ],
+    name="concepto_cuota_aprobado_unique",
+    unique=True,
+    partialFilterExpression={"estado_pago": EstadoPago.APROBADO.value}
+)
+
+# Unicidad del comprobante entre pagos vigentes (pendientes/aprobados): un mismo
+# número de transacción solo puede reutilizarse si el pago anterior fue rechazado.
+# (partialFilterExpression con $in requiere MongoDB >= 6.0.) No va en
+# Settings.indexes: core.database lo construye solo si no hay duplicados que lo
+# impidan; estos se resuelven a mano con scripts/resolver_pagos_duplicados.py
+INDICE_TRANSACCION_VIGENTE = pymongo.IndexModel(
+    [("numero_transaccion", pymongo.ASCENDING)],
+    name="numero_transaccion_vigente_unique",
+    unique=True,
+    partialFilterExpression={
+        "estado_pago": {"$in": [EstadoPago.PENDIENTE.value, EstadoPago.APROBADO.value]}
+    }
+)
+
+
 class Payment(MongoBaseModel):
     """
     Modelo de Pago - Registra cada transacción individual
@@ -166,15 +195,29 @@ class Payment(MongoBaseModel):
     class Settings:
         name = "payments"
         indexes = [
-            # Índices de referencias cruzadas para queries ágiles de listados y conciliaciones
-            "inscripcion_id",
-            "estudiante_id",
-            "curso_id",
+            # Pagos de una inscripción por estado (siguiente pago, duplicados aprobados).
+            # Su prefijo inscripcion_id cubre también las consultas solo por inscripción.
+            [("inscripcion_id", pymongo.ASCENDING), ("estado_pago", pymongo.ASCENDING)],
+            # Índices de referencias cruzadas para listados (get_payments_by_student/course
+            # y el filtro por estudiante del panel), ya ordenados por fecha de subida
+            [("estudiante_id", pymongo.ASCENDING), ("fecha_subida", pymongo.DESCENDING)],
+            [("curso_id", pymongo.ASCENDING), ("fecha_subida", pymongo.DESCENDING)],
             # Índice para la búsqueda antifraude por número de depósito/transferencia
             "numero_transaccion",
             "concepto",
             # Índice compuesto de alto rendimiento para el panel de conciliación (Cobranzas)
             [("estado_pago", pymongo.ASCENDING), ("fecha_subida", pymongo.DESCENDING)],
             # Índice temporal simple para ordenación de caja histórica
-            [("fecha_subida", pymongo.DESCENDING)]
+            [("fecha_subida", pymongo.DESCENDING)],
+            # Índice de texto (invertido) para el buscador del panel de pagos
+            pymongo.IndexModel(
+                [
+                    ("numero_transaccion", pymongo.TEXT),
+                    ("remitente", pymongo.TEXT),
+                    ("banco", pymongo.TEXT),
+                    ("concepto", pymongo.TEXT)
+                ],
+                name="payments_text_search",
+                default_language="none"
+            )
         ]
@@ -23,6 +23,11 @@ from .base import MongoBaseModel, PyObjectId
 from .enums import TipoEstudiante
 
 
+# Campos (y pesos) del índice de texto de la búsqueda libre: los
+# identificadores exactos pesan más que una coincidencia en el nombre
+STUDENT_TEXT_WEIGHTS = {"nombre": 1, "email": 2, "carnet": 5, "registro": 5}
+
+
 class Student(MongoBaseModel):
     """
     Modelo de Estudiante
@@ -112,6 +117,11 @@ class Student(MongoBaseModel):
         description="Información completa del título profesional: {titulo, numero_titulo, año_expedicion, universidad, estado, url, motivo_rechazo}"
     )
     
+    @property
+    def es_interno(self) -> bool:
+        """True si el estudiante es INTERNO (define qué precios del curso aplican)"""
+        return self.es_estudiante_interno == TipoEstudiante.INTERNO
+    
     class Settings:
         name = "students"
         indexes = [
@@ -123,16 +133,27 @@ class Student(MongoBaseModel):
             # Índice para la consulta textual regular y búsquedas por coincidencia parcial de nombres
             "nombre",
             # Índice Multikey optimizado para búsquedas por filtrado de cursos de posgrado inscritos
-            "lista_cursos_ids",
+            # (con created_at: el listado por curso sale del índice ya ordenado)
+            [("lista_cursos_ids", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)],
             # Índice compuesto optimizado para el paginador administrativo
             [("activo", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)],
             # Índice temporal simple para ordenación por defecto
-            [("created_at", pymongo.DESCENDING)]
+            [("created_at", pymongo.DESCENDING)],
+            # Filtro del listado por estado del título (incluye "sin título": null),
+            # con el mismo orden de la página para evitar un SORT en memoria
+            [("titulo.estado", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)],
+            # Índice de texto (invertido) para la búsqueda libre del listado.
+            # "none": sin stemming ni stopwords, los nombres se indexan tal cual
+            pymongo.IndexModel(
+                [(campo, pymongo.TEXT) for campo in STUDENT_TEXT_WEIGHTS],
+                name="students_text_search",
+                weights=STUDENT_TEXT_WEIGHTS,
+                default_language="none"
+            )
         ]
 
-    class Config:
-        """Configuración y ejemplo de uso"""
-        schema_extra = {
+    model_config = {
+        "json_schema_extra": {
             "example": {
                 "registro": "220005958",
                 "password": "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYIq.Ru",
@@ -150,3 +171,4 @@ class Student(MongoBaseModel):
 
             }
         }
+    }
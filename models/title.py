@@ -32,8 +32,8 @@ class Title(BaseModel):
     fecha_verificacion: Optional[datetime] = Field(None, description="Fecha de verificación/rechazo")
     motivo_rechazo: Optional[str] = Field(None, description="Razón del rechazo (si aplica)")
     
-    class Config:
-        json_schema_extra = {
+    model_config = {
+        "json_schema_extra": {
             "example": {
                 "titulo": "Licenciatura en Ingeniería de Sistemas",
                 "numero_titulo": "123456",
@@ -45,3 +45,4 @@ class Title(BaseModel):
                 "fecha_verificacion": "2024-12-08T17:00:00"
             }
         }
+    }
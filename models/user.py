@@ -37,8 +37,8 @@ class User(MongoBaseModel):
             pymongo.IndexModel([("email", pymongo.ASCENDING)], unique=True)
         ]
 
-    class Config:
-        schema_extra = {
+    model_config = {
+        "json_schema_extra": {
             "example": {
                 "username": "admin",
                 "email": "admin@kyc.com",
@@ -47,4 +47,5 @@ class User(MongoBaseModel):
                 "activo": True
             }
         }
+    }
         
\ No newline at end of file
@@ -29,6 +29,7 @@ Algunos tienen schemas adicionales:
 from .student import (
     StudentCreate,
     StudentResponse,
+    StudentListResponse,
     StudentUpdateSelf,
     StudentUpdateAdmin,
     ChangePassword
@@ -39,7 +40,8 @@ from .course import (
     CourseCreate,
     CourseResponse,
     CourseUpdate,
-    CourseEnrolledStudent
+    CourseEnrolledStudent,
+    CourseEnrolledStudentListAdapter
 )
 
 # Enrollment schemas
@@ -47,7 +49,8 @@ from .enrollment import (
     EnrollmentCreate,
     EnrollmentResponse,
     EnrollmentUpdate,
-    EnrollmentWithDetails
+    EnrollmentWithDetails,
+    EnrollmentResponseAdapter
 )
 
 # Payment schemas
@@ -57,7 +60,10 @@ from .payment import (
     PaymentUpdate,
     PaymentWithDetails,
     PaymentApproval,
-    PaymentRejection
+    PaymentRejection,
+    ApproveAction,
+    RejectAction,
+    PaymentMutation
 )
 
 # Discount schemas
@@ -71,13 +77,15 @@ from .discount import (
 from .user import (
     UserCreate,
     UserResponse,
-    UserUpdate
+    UserUpdate,
+    UserResponseListAdapter
 )
 
 __all__ = [
     # Student
     "StudentCreate",
     "StudentResponse",
+    "StudentListResponse",
     "StudentUpdateSelf",
     "StudentUpdateAdmin",
     "ChangePassword",
@@ -86,11 +94,13 @@ __all__ = [
     "CourseResponse",
     "CourseUpdate",
     "CourseEnrolledStudent",
+    "CourseEnrolledStudentListAdapter",
     # Enrollment
     "EnrollmentCreate",
     "EnrollmentResponse",
     "EnrollmentUpdate",
     "EnrollmentWithDetails",
+    "EnrollmentResponseAdapter",
     # Payment
     "PaymentCreate",
     "PaymentResponse",
@@ -98,6 +108,9 @@ __all__ = [
     "PaymentWithDetails",
     "PaymentApproval",
     "PaymentRejection",
+    "ApproveAction",
+    "RejectAction",
+    "PaymentMutation",
     # Discount
     "DiscountCreate",
     "DiscountResponse",
@@ -106,4 +119,5 @@ __all__ = [
     "UserCreate",
     "UserResponse",
     "UserUpdate",
+    "UserResponseListAdapter",
 ]
@@ -1,16 +1,84 @@
-from typing import Generic, TypeVar, List
-from pydantic import BaseModel, Field
+import os
+from functools import lru_cache
+from typing import Annotated, Any, Generic, Optional, TypeVar, List
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    EmailStr,
+    Field,
+    StringConstraints,
+    TypeAdapter,
+    ValidationError,
+    WithJsonSchema,
+)
 
 T = TypeVar("T")
 
+# En producción (sin /docs) las descripciones y ejemplos de los schemas no se usan:
+# con SCHEMAS_STRIP_DOCS=1 no se guardan en los FieldInfo ni en el core-schema.
+STRIP_SCHEMA_DOCS = bool(os.getenv("SCHEMAS_STRIP_DOCS"))
+
+
+def DocField(*args: Any, **kwargs: Any) -> Any:
+    """Igual que pydantic.Field, pero descarta la documentación si STRIP_SCHEMA_DOCS"""
+    if STRIP_SCHEMA_DOCS:
+        kwargs.pop("description", None)
+        kwargs.pop("json_schema_extra", None)
+    return Field(*args, **kwargs)
+
+
+def doc_config(config: dict) -> dict:
+    """Quita json_schema_extra de un model_config si STRIP_SCHEMA_DOCS"""
+    if STRIP_SCHEMA_DOCS:
+        config.pop("json_schema_extra", None)
+    return config
+
+# Email validado con una regex compilada (sin la normalización DNS/IDNA de EmailStr)
+Email = Annotated[
+    str,
+    StringConstraints(strip_whitespace=True, max_length=254, pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+]
+
+# EmailStr con caché: email-validator se invoca una sola vez por dirección distinta
+_EMAIL_ADAPTER = TypeAdapter(EmailStr)
+
+
+@lru_cache(maxsize=4096)
+def _validate_email_cached(value: str) -> str:
+    """Valida y normaliza con EmailStr; solo los resultados válidos quedan en caché"""
+    try:
+        return _EMAIL_ADAPTER.validate_python(value)
+    except ValidationError as e:
+        raise ValueError(e.errors()[0]["msg"]) from None
+
+
+CachedEmailStr = Annotated[
+    str,
+    AfterValidator(_validate_email_cached),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
+
+# Número de transacción bancaria: alfanumérico con guiones, barras o espacios
+TransactionNumber = Annotated[
+    str,
+    StringConstraints(strip_whitespace=True, min_length=6, max_length=30, pattern=r"^[A-Za-z0-9][A-Za-z0-9\-/ ]*$")
+]
+
 class PaginationMeta(BaseModel):
     """Metadatos de paginación"""
     page: int = Field(..., description="Número de página actual")
     limit: int = Field(..., description="Elementos por página")
-    totalItems: int = Field(..., description="Total de elementos encontrados")
-    totalPages: int = Field(..., description="Total de páginas disponibles")
+    totalItems: Optional[int] = Field(
+        ..., description="Total de elementos encontrados (null en paginación por cursor)"
+    )
+    totalPages: Optional[int] = Field(
+        ..., description="Total de páginas disponibles (null en paginación por cursor)"
+    )
     hasNextPage: bool = Field(..., description="¿Hay página siguiente?")
     hasPrevPage: bool = Field(..., description="¿Hay página anterior?")
+    nextCursor: Optional[str] = Field(
+        None, description="Cursor para pedir la página siguiente (paginación por keyset)"
+    )
 
 class PaginatedResponse(BaseModel, Generic[T]):
     """
@@ -14,7 +14,7 @@ Schemas incluidos:
 
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, TypeAdapter
 from models.enums import TipoCurso, Modalidad, EstadoInscripcion, TipoEstudiante
 from models.base import PyObjectId
 from schemas.requisito import RequisitoTemplateCreate
@@ -243,4 +243,10 @@ class CourseEnrolledStudent(BaseModel):
         "arbitrary_types_allowed": True,
         "from_attributes": True
     }
-    
\ No newline at end of file
+
+
+# ============================================================================
+# ADAPTERS (construidos una sola vez al importar el módulo)
+# ============================================================================
+
+CourseEnrolledStudentListAdapter = TypeAdapter(List[CourseEnrolledStudent])
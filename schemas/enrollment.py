@@ -4,8 +4,9 @@ Schemas de Inscripción (Enrollment)
 """
 
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Annotated, Optional, List
+from typing_extensions import TypedDict
+from pydantic import BaseModel, Field, NonNegativeInt, PositiveInt, TypeAdapter, field_serializer
 from models.enums import EstadoInscripcion, TipoEstudiante
 from models.base import PyObjectId
 
@@ -23,6 +24,18 @@ class ModuloNotaUpdate(BaseModel):
     """Schema para actualizar la calificación de un submódulo"""
     nota: float = Field(..., ge=0, le=100, description="Calificación del módulo (0-100)")
 
+class SiguientePagoInfo(TypedDict):
+    """Siguiente pago sugerido (ver Enrollment.siguiente_pago)"""
+    concepto: str
+    numero_cuota: NonNegativeInt
+    monto_sugerido: float
+
+class CuotasPagadasInfo(TypedDict):
+    """Progreso de cuotas (ver Enrollment.cuotas_pagadas_info)"""
+    cuotas_pagadas: NonNegativeInt
+    cuotas_totales: NonNegativeInt
+    porcentaje: float
+
 class EnrollmentCreate(BaseModel):
     """Schema para crear una nueva inscripción"""
     estudiante_id: PyObjectId = Field(..., description="ID del estudiante a inscribir")
@@ -39,6 +52,15 @@ class EnrollmentCreate(BaseModel):
         }
     }
 
+# Máximo de inscripciones por lote (POST /enrollments/bulk): acota el $or de
+# duplicados (una rama por par estudiante/curso) y el insert_many
+MAX_INSCRIPCIONES_LOTE = 200
+
+EnrollmentBulkCreate = Annotated[
+    List[EnrollmentCreate],
+    Field(max_length=MAX_INSCRIPCIONES_LOTE, description="Inscripciones a crear (máximo 200)")
+]
+
 class EnrollmentResponse(BaseModel):
     """Schema para mostrar información de una inscripción"""
     id: PyObjectId = Field(..., alias="_id")
@@ -49,7 +71,7 @@ class EnrollmentResponse(BaseModel):
     es_estudiante_interno: TipoEstudiante
     costo_total: float
     costo_matricula: float
-    cantidad_cuotas: int
+    cantidad_cuotas: PositiveInt
     modulos: List[ModuloEstadoSchema] = Field(default_factory=list)
     
     # Descuentos
@@ -69,14 +91,19 @@ class EnrollmentResponse(BaseModel):
     nota_final: Optional[float] = None
     
     # Información Calculada
-    siguiente_pago: Optional[dict] = None
-    cuotas_pagadas_info: Optional[dict] = None
+    siguiente_pago: Optional[SiguientePagoInfo] = None
+    cuotas_pagadas_info: Optional[CuotasPagadasInfo] = None
     
     created_at: datetime
     updated_at: datetime
     
     matricula_pagada: Optional[bool] = False
 
+    @field_serializer("estado")
+    def _serialize_estado(self, v: EstadoInscripcion) -> str:
+        """Serializa el enum directamente a su valor (evita el serializer genérico de Enum)"""
+        return v.value
+
     model_config = {
         "populate_by_name": True,
         "arbitrary_types_allowed": True,
@@ -104,4 +131,10 @@ class EnrollmentWithDetails(EnrollmentResponse):
         "arbitrary_types_allowed": True,
         "from_attributes": True
     }
-    
\ No newline at end of file
+
+
+# ============================================================================
+# ADAPTERS (construidos una sola vez al importar el módulo)
+# ============================================================================
+
+EnrollmentResponseAdapter = TypeAdapter(EnrollmentResponse)
@@ -9,14 +9,29 @@ Schemas incluidos:
 1. PaymentCreate: Para crear nuevos pagos
 2. PaymentResponse: Para mostrar pagos
 3. PaymentUpdate: Para actualizar pagos (admin)
+   PaymentMutation: Aprobar/rechazar en un solo endpoint (unión discriminada)
 4. PaymentWithDetails: Para mostrar con datos de Student, Course y Enrollment
 """
 
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
-from models.enums import EstadoPago
-from models.base import PyObjectId
+from typing import Annotated, Literal, Optional, Union
+from pydantic import BaseModel, Field, NonNegativeInt, PositiveInt
+from models.enums import EstadoPagoLit
+from models.base import ObjectIdStr, UTCDateTime
+from schemas.common import DocField, TransactionNumber, doc_config
+
+__all__ = [
+    "PaymentCreate",
+    "PaymentResponse",
+    "PaymentUpdate",
+    "PaymentApproval",
+    "PaymentRejection",
+    "ApproveAction",
+    "RejectAction",
+    "PaymentMutation",
+    "PaymentWithDetails",
+]
 
 
 class PaymentCreate(BaseModel):
@@ -33,74 +48,71 @@ class PaymentCreate(BaseModel):
     - URL del comprobante
     """
     
-    inscripcion_id: PyObjectId = Field(
+    inscripcion_id: ObjectIdStr = DocField(
         ...,
         description="ID de la inscripción a la que pertenece este pago"
     )
 
-    numero_transaccion: str = Field(
+    numero_transaccion: TransactionNumber = DocField(
         ...,
-        min_length=6,
-        max_length=30,
         description="Número de transacción bancaria del comprobante"
     )
 
-    remitente: str = Field(
+    remitente: str = DocField(
         ...,
         description="Nombre del remitente del comprobante"
     )
 
-    banco: str = Field(
+    banco: str = DocField(
         ...,
         description="Nombre del banco del comprobante"
     )
     
-    monto_comprobante: float = Field(
+    monto_comprobante: float = DocField(
         ...,
         gt=0,
         description="Monto del comprobante (en bolivianos)"
     )
     
-    fecha_comprobante: str = Field(
+    fecha_comprobante: str = DocField(
         ...,
         description="Fecha del comprobante (YYYY-MM-DD)"
     )
     
-    cuenta_destino: str = Field(
+    cuenta_destino: str = DocField(
         ...,
         description="Número de cuenta destino del comprobante"
     )
 
-    concepto: Optional[str] = Field(
+    concepto: Optional[str] = DocField(
         None,
         description="Concepto del pago (Opcional, se calcula automáticamente)"
     )
     
-    numero_cuota: Optional[int] = Field(
+    numero_cuota: Optional[PositiveInt] = DocField(
         None,
-        ge=1,
         description="Número de cuota (Opcional, se calcula automáticamente)"
     )
     
-    cantidad_pago: Optional[float] = Field(
+    cantidad_pago: Optional[float] = DocField(
         None,
         gt=0,
         description="Monto del pago (Opcional, se calcula automáticamente)"
     )
     
-    comprobante_url: str = Field(
+    comprobante_url: str = DocField(
         ...,
         description="URL del comprobante/voucher (PDF en Cloudinary)"
     )
     
-    model_config = {
+    model_config = doc_config({
         "json_schema_extra": {
             "example": {
                 "inscripcion_id": "507f1f77bcf86cd799439013",
                 "numero_transaccion": "BNB2024A1234"
             }
         }
-    }
+    })
 
 
 class PaymentResponse(BaseModel):
@@ -110,50 +122,50 @@ class PaymentResponse(BaseModel):
     Uso: GET /payments/{id}, respuestas de POST/PUT/PATCH
     """
     
-    id: PyObjectId = Field(..., alias="_id")
+    id: ObjectIdStr = DocField(..., alias="_id")
     
     # Referencias
-    inscripcion_id: PyObjectId
-    estudiante_id: PyObjectId
-    curso_id: PyObjectId
+    inscripcion_id: ObjectIdStr
+    estudiante_id: ObjectIdStr
+    curso_id: ObjectIdStr
     
     # ========================================================================
     # DATOS LEGIBLES (como en el reporte Excel)
     # ========================================================================
     
     # Información del estudiante
-    nombre_estudiante: Optional[str] = Field(
+    nombre_estudiante: Optional[str] = DocField(
         None,
         description="Nombre completo del estudiante"
     )
     
     # Información del pago
-    fecha: str = Field(
+    fecha: str = DocField(
         ...,
         description="Fecha de subida formateada (YYYY-MM-DD HH:MM:SS)"
     )
     
-    moneda: str = Field(
+    moneda: str = DocField(
         default="Bs",
         description="Moneda del pago (siempre Bolivianos)"
     )
     
-    monto: float = Field(
+    monto: float = DocField(
         ...,
         description="Monto del pago en bolivianos"
     )
     
-    concepto: str = Field(
+    concepto: str = DocField(
         ...,
         description="Concepto del pago (Matrícula, Cuota 1, etc.)"
     )
     
-    total_cuotas: Optional[int] = Field(
+    total_cuotas: Optional[NonNegativeInt] = DocField(
         None,
         description="Total de cuotas del curso (ej: 12)"
     )
     
-    numero_transaccion: str = Field(
+    numero_transaccion: str = DocField(
         ...,
         description="Número de transacción bancaria"
     )
@@ -165,12 +177,12 @@ class PaymentResponse(BaseModel):
     fecha_comprobante: Optional[datetime] = None
     cuenta_destino: Optional[str] = None
     
-    estado: str = Field(
+    estado: str = DocField(
         ...,
         description="Estado del pago (pendiente/aprobado/rechazado)"
     )
     
-    comprobante_url: str = Field(
+    comprobante_url: str = DocField(
         ...,
         description="URL del comprobante/voucher (PDF en Cloudinary)"
     )
@@ -179,33 +191,33 @@ class PaymentResponse(BaseModel):
     # CAMPOS TÉCNICOS ADICIONALES
     # ========================================================================
     
-    numero_cuota: Optional[int] = Field(
+    numero_cuota: Optional[PositiveInt] = DocField(
         None,
         description="Número de cuota (si aplica)"
     )
     
-    cantidad_pago: float = Field(
+    cantidad_pago: float = DocField(
         ...,
         description="Monto del pago (mismo que 'monto', para compatibilidad)"
     )
     
     # Comprobante y estado
     
-    estado_pago: EstadoPago
+    estado_pago: EstadoPagoLit
     
     # Auditoría
-    fecha_subida: datetime
-    fecha_verificacion: Optional[datetime]
+    fecha_subida: UTCDateTime
+    fecha_verificacion: Optional[UTCDateTime]
     verificado_por: Optional[str]
     motivo_rechazo: Optional[str]
     
+    # created_at/updated_at llegan ya en hora boliviana (ver enrich_payment_with_details)
     created_at: datetime
     updated_at: datetime
     
-    model_config = {
+    model_config = doc_config({
         "populate_by_name": True,
-        "arbitrary_types_allowed": True,
-        "from_attributes": True,
+        "frozen": True,
         "json_schema_extra": {
             "example": {
                 "_id": "507f1f77bcf86cd799439014",
@@ -232,7 +244,7 @@ class PaymentResponse(BaseModel):
                 "updated_at": "2024-12-15T14:30:00"
             }
         }
-    }
+    })
 
 
 class PaymentUpdate(BaseModel):
@@ -246,7 +258,7 @@ class PaymentUpdate(BaseModel):
     - Rechazar pago con motivo
     """
     
-    estado_pago: Optional[EstadoPago] = Field(
+    estado_pago: Optional[EstadoPagoLit] = Field(
         None,
         description="Cambiar estado del pago"
     )
@@ -257,6 +269,8 @@ class PaymentUpdate(BaseModel):
     )
     
     model_config = {
+        "extra": "ignore",
+        "defer_build": True,
         "json_schema_extra": {
             "example": {
                 "estado_pago": "aprobado"
@@ -265,47 +279,66 @@ class PaymentUpdate(BaseModel):
     }
 
 
-class PaymentApproval(BaseModel):
+@dataclass(slots=True, frozen=True)
+class PaymentApproval:
     """
     Schema específico para aprobar un pago
     
     Uso: PUT /payments/{id}/aprobar
-    """
     
-    admin_username: str = Field(
-        ...,
-        description="Username del admin que aprueba"
-    )
+    Dataclass simple: un solo campo de texto, no necesita un BaseModel.
+    """
     
-    model_config = {
-        "json_schema_extra": {
-            "example": {
-                "admin_username": "admin.sistemas"
-            }
-        }
-    }
+    admin_username: Annotated[str, Field(
+        description="Username del admin que aprueba",
+        examples=["admin.sistemas"]
+    )]
 
 
-class PaymentRejection(BaseModel):
+@dataclass(slots=True, frozen=True)
+class PaymentRejection:
     """
     Schema específico para rechazar un pago
     
     Uso: PUT /payments/{id}/rechazar
     """
     
+    motivo: Annotated[str, Field(
+        min_length=1,
+        description="Razón del rechazo",
+        examples=["El comprobante está borroso, no se puede leer el número de transacción. Por favor suba una imagen más clara."]
+    )]
+
+
+# ============================================================================
+# MUTACIONES DE PAGO (unión discriminada por "action")
+# ============================================================================
+
+class ApproveAction(BaseModel):
+    """Aprobar el pago"""
+    
+    action: Literal["approve"]
+
+
+class RejectAction(BaseModel):
+    """Rechazar el pago con motivo"""
+    
+    action: Literal["reject"]
     motivo: str = Field(
         ...,
         min_length=1,
         description="Razón del rechazo"
     )
-    
-    model_config = {
-        "json_schema_extra": {
-            "example": {
-                "motivo": "El comprobante está borroso, no se puede leer el número de transacción. Por favor suba una imagen más clara."
-            }
-        }
-    }
+
+
+PaymentMutation = Annotated[
+    Union[ApproveAction, RejectAction],
+    Field(discriminator="action")
+]
+"""
+Body de PATCH /payments/{id}: el validador elige la rama por el valor de
+`action` (una sola búsqueda) en lugar de probar cada modelo en orden.
+"""
 
 
 class PaymentWithDetails(PaymentResponse):
@@ -330,8 +363,6 @@ class PaymentWithDetails(PaymentResponse):
     
     model_config = {
         "populate_by_name": True,
-        "arbitrary_types_allowed": True,
-        "from_attributes": True,
         "json_schema_extra": {
             "example": {
                 "_id": "507f1f77bcf86cd799439014",
@@ -8,15 +8,17 @@ Schemas incluidos:
 -----------------
 1. StudentCreate: Para crear nuevos estudiantes (solo campos esenciales)
 2. StudentResponse: Para mostrar estudiantes (sin password)
+   StudentListResponse: Fila liviana para el listado paginado
 3. StudentUpdateSelf: Para que estudiantes actualicen su propio perfil
 4. StudentUpdateAdmin: Para que admins actualicen cualquier campo
 """
 
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, Field, EmailStr, field_validator
-from models.enums import TipoEstudiante
-from models.base import PyObjectId
+from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from models.enums import TipoEstudianteLit
+from models.base import ObjectIdStr, UTCDateTime
+from schemas.common import DocField, Email, doc_config
 
 
 class ChangePassword(BaseModel):
@@ -62,23 +64,23 @@ class StudentCreate(BaseModel):
     """
     
     # Campos obligatorios
-    registro: str = Field(..., description="Número de registro único del estudiante (usado como username)")
-    carnet: str = Field(..., description="Carnet de identidad (será usado como contraseña inicial y almacenado si no se provee un password)")
+    registro: str = DocField(..., description="Número de registro único del estudiante (usado como username)")
+    carnet: str = DocField(..., description="Carnet de identidad (será usado como contraseña inicial y almacenado si no se provee un password)")
     
     # Campos opcionales nuevos (Para formulario rápido)
-    password: Optional[str] = Field(None, min_length=5, description="Contraseña inicial del estudiante (opcional, fallback a carnet)")
-    course_id: Optional[PyObjectId] = Field(None, description="ID del curso para inscripción inicial (opcional)")
+    password: Optional[str] = DocField(None, min_length=5, description="Contraseña inicial del estudiante (opcional, fallback a carnet)")
+    course_id: Optional[ObjectIdStr] = DocField(None, description="ID del curso para inscripción inicial (opcional)")
     
     # Campos opcionales estándar
-    nombre: Optional[str] = Field(None, min_length=1, max_length=200, description="Nombre completo del estudiante")
-    email: Optional[EmailStr] = Field(None, description="Correo electrónico")
-    extension: Optional[str] = Field(None, description="Extension del carnet de identidad")
-    celular: Optional[str] = Field(None, description="Número de celular para notificaciones")
-    domicilio: Optional[str] = Field(None, description="Dirección física del estudiante")
-    fecha_nacimiento: Optional[datetime] = Field(None, description="Fecha de nacimiento")
-    es_estudiante_interno: Optional[TipoEstudiante] = Field(None, description="Tipo de estudiante: INTERNO o EXTERNO")
-
-    model_config = {
+    nombre: Optional[str] = DocField(None, min_length=1, max_length=200, description="Nombre completo del estudiante")
+    email: Optional[Email] = DocField(None, description="Correo electrónico")
+    extension: Optional[str] = DocField(None, description="Extension del carnet de identidad")
+    celular: Optional[str] = DocField(None, description="Número de celular para notificaciones")
+    domicilio: Optional[str] = DocField(None, description="Dirección física del estudiante")
+    fecha_nacimiento: Optional[datetime] = DocField(None, description="Fecha de nacimiento")
+    es_estudiante_interno: Optional[TipoEstudianteLit] = DocField(None, description="Tipo de estudiante: INTERNO o EXTERNO")
+
+    model_config = doc_config({
         "json_schema_extra": {
             "example": {
                 "registro": "20240001",
@@ -94,7 +96,7 @@ class StudentCreate(BaseModel):
                 "es_estudiante_interno": "interno"
             }
         }
-    }
+    })
 
 
 
@@ -103,17 +105,17 @@ class StudentResponse(BaseModel):
     Schema para mostrar información de un estudiante (Sincronizado con MongoDB y Svelte)
     """
     
-    id: PyObjectId = Field(..., alias="_id")
+    id: ObjectIdStr = DocField(..., alias="_id")
     registro: str
     nombre: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[str] = None  # Solo salida: el dato ya fue validado al guardarse
     carnet: Optional[str] = None
     extension: Optional[str] = None
     celular: Optional[str] = None
     domicilio: Optional[str] = None
     fecha_nacimiento: Optional[datetime] = None
     foto_url: Optional[str] = None
-    es_estudiante_interno: Optional[TipoEstudiante] = None
+    es_estudiante_interno: Optional[TipoEstudianteLit] = None
     
     # DOCUMENTACIÓN (URLs de Cloudinary de los PDFs)
     cv_url: Optional[str] = None
@@ -125,14 +127,15 @@ class StudentResponse(BaseModel):
     
     # Estado y Metadata
     activo: bool
-    lista_cursos_ids: List[PyObjectId] = []
-    created_at: datetime
-    updated_at: datetime
+    lista_cursos_ids: tuple[ObjectIdStr, ...] = DocField(default_factory=tuple)
+    created_at: UTCDateTime
+    updated_at: UTCDateTime
     
-    model_config = {
+    model_config = doc_config({
         "populate_by_name": True,
-        "arbitrary_types_allowed": True,
-        "from_attributes": True,
+        "frozen": True,
+        # Schema de respuesta caliente: se compila al importar, no en el primer request
+        "defer_build": False,
         "json_schema_extra": {
             "example": {
                 "_id": "507f1f77bcf86cd799439011",
@@ -152,6 +155,35 @@ class StudentResponse(BaseModel):
                 "updated_at": "2024-03-20T10:00:00"
             }
         }
+    })
+
+
+
+class StudentListResponse(BaseModel):
+    """
+    Fila del listado paginado de estudiantes.
+
+    Sin domicilio, fecha de nacimiento ni URLs de documentos: esos datos
+    solo se muestran en el detalle (GET /students/{id} con StudentResponse).
+    """
+
+    id: ObjectIdStr = DocField(..., alias="_id")
+    registro: str
+    nombre: Optional[str] = None
+    email: Optional[str] = None
+    carnet: Optional[str] = None
+    extension: Optional[str] = None
+    celular: Optional[str] = None
+    foto_url: Optional[str] = None
+    es_estudiante_interno: Optional[TipoEstudianteLit] = None
+    titulo: Optional[dict] = None
+    activo: bool
+    lista_cursos_ids: tuple[ObjectIdStr, ...] = DocField(default_factory=tuple)
+    created_at: UTCDateTime
+
+    model_config = {
+        "populate_by_name": True,
+        "frozen": True,
     }
 
 
@@ -165,6 +197,8 @@ class StudentUpdateSelf(BaseModel):
     domicilio: Optional[str] = None
     
     model_config = {
+        "extra": "ignore",
+        "defer_build": True,
         "json_schema_extra": {
             "example": {
                 "celular": "71234567",
@@ -182,17 +216,19 @@ class StudentUpdateAdmin(BaseModel):
     registro: Optional[str] = None
     password: Optional[str] = Field(None, min_length=5)
     nombre: Optional[str] = Field(None, min_length=1, max_length=200)
-    email: Optional[EmailStr] = None
+    email: Optional[Email] = None
     carnet: Optional[str] = None
     extension: Optional[str] = None
     celular: Optional[str] = None
     domicilio: Optional[str] = None
     fecha_nacimiento: Optional[datetime] = None
-    es_estudiante_interno: Optional[TipoEstudiante] = None
+    es_estudiante_interno: Optional[TipoEstudianteLit] = None
     activo: Optional[bool] = None
-    lista_cursos_ids: Optional[List[PyObjectId]] = None
+    lista_cursos_ids: Optional[tuple[ObjectIdStr, ...]] = None
     
     model_config = {
+        "extra": "ignore",
+        "defer_build": True,
         "json_schema_extra": {
             "example": {
                 "registro": "20240002",
@@ -210,4 +246,4 @@ class StudentUpdateAdmin(BaseModel):
             }
         }
     }
-    
\ No newline at end of file
+    
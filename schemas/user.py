@@ -12,10 +12,11 @@ Schemas incluidos:
 """
 
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field, EmailStr
+from typing import List, Optional
+from pydantic import BaseModel, Field, TypeAdapter
 from models.enums import UserRole
 from models.base import PyObjectId
+from schemas.common import CachedEmailStr
 
 class UserCreate(BaseModel):
     """
@@ -24,7 +25,7 @@ class UserCreate(BaseModel):
     Uso: POST /users/
     """
     username: str = Field(..., min_length=3, description="Nombre de usuario único")
-    email: EmailStr = Field(..., description="Correo electrónico único")
+    email: CachedEmailStr = Field(..., description="Correo electrónico único")
     password: str = Field(..., min_length=5, description="Contraseña (será hasheada)")
     rol: UserRole = Field(default=UserRole.ADMIN, description="Rol de usuario")
     
@@ -47,7 +48,7 @@ class UserResponse(BaseModel):
     """
     id: PyObjectId = Field(..., alias="_id")
     username: str
-    email: EmailStr
+    email: str  # Solo salida: el dato ya fue validado al guardarse
     rol: UserRole
     activo: bool
     ultimo_acceso: Optional[datetime] = None
@@ -59,6 +60,9 @@ class UserResponse(BaseModel):
         "populate_by_name": True,
         "arbitrary_types_allowed": True,
         "from_attributes": True,
+        "frozen": True,
+        # Schema de respuesta caliente: se compila al importar, no en el primer request
+        "defer_build": False,
         "json_schema_extra": {
             "example": {
                 "_id": "507f1f77bcf86cd799439015",
@@ -80,7 +84,7 @@ class UserUpdate(BaseModel):
     Uso: PATCH /users/{id}
     """
     username: Optional[str] = Field(None, min_length=3)
-    email: Optional[EmailStr] = None
+    email: Optional[CachedEmailStr] = None
     password: Optional[str] = Field(None, min_length=5)
     rol: Optional[UserRole] = None
     activo: Optional[bool] = None
@@ -93,3 +97,10 @@ class UserUpdate(BaseModel):
             }
         }
     }
+
+
+# ============================================================================
+# ADAPTERS (construidos una sola vez al importar el módulo)
+# ============================================================================
+
+UserResponseListAdapter = TypeAdapter(List[UserResponse])
@@ -13,8 +13,7 @@ COLLECTIONS = [
 ]
 
 
-async def ensure_collection(db, name: str):
-    existing = await db.list_collection_names()
+async def ensure_collection(db, name: str, existing: list):
     if name not in existing:
         await db.create_collection(name)
         print(f"[CREATED] {name}")
@@ -70,11 +69,13 @@ async def main():
     mongo_url = os.environ["MONGODB_URL"]
     db_name = os.environ.get("DATABASE_NAME", "KyC")
 
-    client = AsyncIOMotorClient(mongo_url)
+    # Falla en segundos (no en los 30 s por defecto) si la URI está mal configurada
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
     db = client[db_name]
 
+    existing = await db.list_collection_names()
     for c in COLLECTIONS:
-        await ensure_collection(db, c)
+        await ensure_collection(db, c, existing)
 
     await create_indexes(db)
 
@@ -0,0 +1,225 @@
+"""
+Resolver Pagos Duplicados
+=========================
+
+Revisión manual de los pagos duplicados que impiden construir los índices
+únicos de payments (ver core.database.INDICES_UNICOS_PAGOS). El arranque de la
+API solo los detecta y omite el índice: descartar un pago aprobado cambia el
+saldo de una inscripción, y decidir cuál se conserva es una decisión de
+negocio que requiere revisión.
+
+Dos pasos:
+1. Simulación (por defecto): no escribe en la base, genera un reporte JSON con
+   cada grupo de duplicados, el pago que se propone conservar y el efecto sobre
+   las inscripciones. Los grupos con más de un pago APROBADO no traen propuesta
+   ("conservar": null): hay que elegir a mano cuál se conserva.
+2. Aplicación (--aplicar REPORTE): aplica el reporte revisado. Los pagos no
+   conservados pasan a RECHAZADO (verificado_por = --admin) y, si estaban
+   aprobados, su monto se retira de la inscripción (y la matrícula deja de
+   figurar pagada si no queda otro pago de Matrícula aprobado). Un pago que
+   cambió de estado desde el reporte no se toca. Al terminar se construyen los
+   índices que ya no tengan duplicados.
+
+Uso (desde la raíz del proyecto, con las variables de entorno de la API):
+----
+python scripts/resolver_pagos_duplicados.py --reporte duplicados.json
+python scripts/resolver_pagos_duplicados.py --aplicar duplicados.json --admin jperez
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import settings  # noqa: E402
+from core.database import (  # noqa: E402
+    INDICES_UNICOS_PAGOS,
+    buscar_pagos_duplicados,
+    crear_indices_unicos_pagos,
+)
+from models.enums import EstadoInscripcion, EstadoPago  # noqa: E402
+
+
+# Motivo de rechazo que queda en cada pago descartado, por índice
+MOTIVOS = {
+    "concepto_cuota_aprobado_unique": (
+        "Cuota ya aprobada en otro pago de la misma inscripción"
+    ),
+    "numero_transaccion_vigente_unique": (
+        "Comprobante duplicado: el número de transacción ya figura en otro pago vigente"
+    ),
+}
+
+CONCEPTO_MATRICULA = "Matrícula"
+
+
+def _json(valor):
+    """ObjectId/fechas a texto para el reporte"""
+    if isinstance(valor, ObjectId):
+        return str(valor)
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, dict):
+        return {k: _json(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_json(v) for v in valor]
+    return valor
+
+
+async def generar_reporte(db) -> dict:
+    """Grupos de duplicados de cada índice con la propuesta de resolución"""
+    grupos = []
+    for indice, clave, estados in INDICES_UNICOS_PAGOS:
+        nombre = indice.document["name"]
+        for item in await buscar_pagos_duplicados(db, clave, estados):
+            pagos = item["pagos"]
+            aprobados = [p for p in pagos if p["estado_pago"] == EstadoPago.APROBADO.value]
+            requiere_decision = len(aprobados) > 1
+            grupos.append({
+                "indice": nombre,
+                "clave": item["_id"],
+                "requiere_decision": requiere_decision,
+                # Sin propuesta si hay varios aprobados: cualquiera de ellos
+                # pudo ser dinero recibido de verdad
+                "conservar": None if requiere_decision else pagos[0]["_id"],
+                "pagos": pagos,
+            })
+    return _json({
+        "generado": datetime.utcnow(),
+        "base": settings.DATABASE_NAME,
+        "grupos": grupos,
+    })
+
+
+async def _descontar_pago(db, pago: dict) -> None:
+    """Retira de la inscripción el monto de un pago aprobado que pasó a RECHAZADO"""
+    campos = {
+        "total_pagado": {"$max": [0, {"$subtract": ["$total_pagado", pago["cantidad_pago"] or 0.0]}]},
+        "updated_at": datetime.utcnow()
+    }
+    if pago["concepto"] == CONCEPTO_MATRICULA:
+        otra_matricula = await db["payments"].find_one({
+            "inscripcion_id": ObjectId(pago["inscripcion_id"]),
+            "concepto": CONCEPTO_MATRICULA,
+            "estado_pago": EstadoPago.APROBADO.value,
+        }, {"_id": 1})
+        if not otra_matricula:
+            campos["matricula_pagada"] = False
+
+    await db["enrollments"].update_one(
+        {"_id": ObjectId(pago["inscripcion_id"])},
+        [
+            {"$set": campos},
+            {"$set": {
+                "saldo_pendiente": {"$max": [0, {"$subtract": ["$total_a_pagar", "$total_pagado"]}]}
+            }},
+            {"$set": {
+                "estado": {"$cond": [
+                    {"$and": [
+                        {"$eq": ["$estado", EstadoInscripcion.COMPLETADO.value]},
+                        {"$gt": ["$saldo_pendiente", 0.01]}
+                    ]},
+                    EstadoInscripcion.ACTIVO.value,
+                    "$estado"
+                ]}
+            }}
+        ]
+    )
+
+
+async def aplicar_reporte(db, reporte: dict, admin: str) -> list:
+    """Rechaza los pagos no conservados de cada grupo; devuelve lo realizado"""
+    resultado = []
+    for grupo in reporte["grupos"]:
+        conservar = grupo.get("conservar")
+        ids = [p["_id"] for p in grupo["pagos"]]
+        if conservar not in ids:
+            print(f"[SIN DECISIÓN] {grupo['indice']} {grupo['clave']}: no se indicó qué pago conservar")
+            resultado.append({"clave": grupo["clave"], "accion": "sin_decision"})
+            continue
+
+        for pago in grupo["pagos"]:
+            if pago["_id"] == conservar:
+                continue
+            ahora = datetime.utcnow()
+            # El estado del reporte va en el filtro: si el pago cambió desde
+            # entonces (otro admin lo rechazó o aprobó) no se modifica
+            cambio = await db["payments"].update_one(
+                {"_id": ObjectId(pago["_id"]), "estado_pago": pago["estado_pago"]},
+                {"$set": {
+                    "estado_pago": EstadoPago.RECHAZADO.value,
+                    "motivo_rechazo": f"{MOTIVOS[grupo['indice']]} (conservado: {conservar})",
+                    "verificado_por": admin,
+                    "fecha_verificacion": ahora,
+                    "updated_at": ahora
+                }}
+            )
+            if not cambio.modified_count:
+                print(f"[OMITIDO] Pago {pago['_id']}: ya no está {pago['estado_pago']}")
+                resultado.append({"pago": pago["_id"], "accion": "omitido"})
+                continue
+
+            descontado = pago["estado_pago"] == EstadoPago.APROBADO.value
+            if descontado:
+                await _descontar_pago(db, pago)
+            print(
+                f"[RECHAZADO] Pago {pago['_id']} ({pago['estado_pago']}, {pago['cantidad_pago']}) "
+                f"de la inscripción {pago['inscripcion_id']}"
+                + (": monto retirado del saldo" if descontado else "")
+            )
+            resultado.append({
+                "pago": pago["_id"],
+                "accion": "rechazado",
+                "monto_descontado": pago["cantidad_pago"] if descontado else 0.0,
+                "inscripcion_id": pago["inscripcion_id"],
+            })
+    return resultado
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reporte", help="Simulación: ruta del reporte JSON a generar")
+    parser.add_argument("--aplicar", help="Ruta del reporte JSON revisado a aplicar")
+    parser.add_argument("--admin", help="Usuario que aplica el reporte (queda en verificado_por)")
+    args = parser.parse_args()
+    if bool(args.reporte) == bool(args.aplicar):
+        parser.error("Indicar --reporte (simulación) o --aplicar (con --admin)")
+    if args.aplicar and not args.admin:
+        parser.error("--aplicar requiere --admin")
+
+    # Falla en segundos (no en los 30 s por defecto) si la URI está mal configurada
+    client = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=5000)
+    db = client[settings.DATABASE_NAME]
+
+    if args.reporte:
+        reporte = await generar_reporte(db)
+        Path(args.reporte).write_text(json.dumps(reporte, ensure_ascii=False, indent=2), encoding="utf-8")
+        sin_decision = sum(1 for g in reporte["grupos"] if g["conservar"] is None)
+        print(
+            f"[OK] {len(reporte['grupos'])} grupos de duplicados ({sin_decision} requieren elegir "
+            f"el pago a conservar). Reporte: {args.reporte} (no se modificó la base)"
+        )
+    else:
+        reporte = json.loads(Path(args.aplicar).read_text(encoding="utf-8"))
+        resultado = await aplicar_reporte(db, reporte, args.admin)
+        salida = Path(args.aplicar).with_suffix(".aplicado.json")
+        salida.write_text(json.dumps(_json({
+            "aplicado": datetime.utcnow(),
+            "admin": args.admin,
+            "resultado": resultado,
+        }), ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[OK] Reporte aplicado. Detalle: {salida}")
+        await crear_indices_unicos_pagos(db)
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,8 +10,18 @@ from models.course import Course
 from models.enrollment import Enrollment
 from models.student import Student
 from models.discount import Discount
-from schemas.course import CourseCreate, CourseUpdate, CourseEnrolledStudent
+from schemas.course import (
+    CourseCreate,
+    CourseUpdate,
+    CourseEnrolledStudent,
+    StudentContactInfo,
+    EnrollmentInfo,
+    FinancialInfo
+)
+from datetime import datetime
 from beanie import PydanticObjectId
+from pydantic import BaseModel, Field
+from models.enums import EstadoInscripcion, TipoEstudiante
 
 
 async def _validate_active_discount(discount_id: Optional[PydanticObjectId]) -> None:
@@ -31,7 +41,7 @@ async def get_course(id: PydanticObjectId) -> Optional[Course]:
     return await Course.get(id)
 
 from models.enums import TipoCurso, Modalidad
-from beanie.operators import Or
+from beanie.operators import In, Or
 
 async def get_courses(
     page: int = 1,
@@ -83,7 +93,7 @@ async def get_courses(
 
 async def create_course(course_in: CourseCreate) -> Course:
     """Crea un nuevo curso"""
-    payload = course_in.dict()
+    payload = course_in.model_dump()
 
     # Seguridad de negocio: impedir asociar descuentos inactivos
     await _validate_active_discount(payload.get("descuento_id"))
@@ -106,7 +116,7 @@ async def update_course(
     if isinstance(course_in, dict):
         update_data = course_in
     else:
-        update_data = course_in.dict(exclude_unset=True)
+        update_data = course_in.model_dump(exclude_unset=True)
 
     # Seguridad de negocio: impedir asociar descuentos inactivos
     if "descuento_id" in update_data:
@@ -119,19 +129,48 @@ async def update_course(
     return course
 
 async def delete_course(id: PydanticObjectId) -> Optional[Course]:
-    """Elimina un curso"""
-    course = await Course.get(id)
-    if course:
-        await course.delete()
-    return course
+    """
+    Elimina un curso en un solo viaje (find_one_and_delete).
+    Devuelve el curso eliminado, o None si no existía.
+    """
+    raw = await Course.get_motor_collection().find_one_and_delete({"_id": id})
+    return Course.model_validate(raw) if raw else None
+
+class _StudentContactProjection(BaseModel):
+    """Proyección de Student con los campos usados en el reporte de inscritos"""
+    id: PydanticObjectId = Field(alias="_id")
+    nombre: Optional[str] = None
+    carnet: Optional[str] = None
+    email: Optional[str] = None
+    celular: Optional[str] = None
+
+    model_config = {"populate_by_name": True}
+
+
+class _EnrollmentReportProjection(BaseModel):
+    """Proyección de Enrollment con los campos usados en el reporte de inscritos"""
+    id: PydanticObjectId = Field(alias="_id")
+    estudiante_id: PydanticObjectId
+    fecha_inscripcion: datetime
+    estado: EstadoInscripcion
+    es_estudiante_interno: TipoEstudiante
+    total_a_pagar: float
+    total_pagado: float
+    saldo_pendiente: float
+
+    model_config = {"populate_by_name": True}
+
 
 async def get_course_students(course_id: PydanticObjectId) -> List[CourseEnrolledStudent]:
     """
     Obtiene la lista detallada de estudiantes inscritos en un curso.
     Combina datos de Enrollment y Student.
     """
-    # 1. Obtener todas las inscripciones del curso
-    enrollments = await Enrollment.find(Enrollment.curso_id == course_id).to_list()
+    # 1. Obtener las inscripciones del curso, solo con los campos del reporte
+    #    (sin módulos ni requisitos embebidos)
+    enrollments = await Enrollment.find(
+        Enrollment.curso_id == course_id
+    ).project(_EnrollmentReportProjection).to_list()
     
     if not enrollments:
         return []
@@ -139,9 +178,8 @@ async def get_course_students(course_id: PydanticObjectId) -> List[CourseEnrolle
     # 2. Obtener IDs de estudiantes
     student_ids = [e.estudiante_id for e in enrollments]
     
-    # 3. Obtener estudiantes en una sola consulta (optimización)
-    from beanie.operators import In
-    students = await Student.find(In(Student.id, student_ids)).to_list()
+    # 3. Obtener estudiantes en una sola consulta, solo con los campos del reporte
+    students = await Student.find(In(Student.id, student_ids)).project(_StudentContactProjection).to_list()
     students_map = {s.id: s for s in students}
     
     # 4. Construir reporte
@@ -151,34 +189,34 @@ async def get_course_students(course_id: PydanticObjectId) -> List[CourseEnrolle
         if not student:
             continue  # Skip si no se encuentra el estudiante (caso raro de inconsistencia)
             
-        # Calcular porcentaje de avance
-        avance = 0.0
+        # Calcular porcentaje de avance en centésimas enteras (redondeo a 2 decimales,
+        # montos siempre >= 0): una sola división y sin llamar a round() por fila
         if enrollment.total_a_pagar > 0:
-            avance = (enrollment.total_pagado / enrollment.total_a_pagar) * 100
-        elif enrollment.total_a_pagar == 0:
+            avance = int(enrollment.total_pagado * 10000.0 / enrollment.total_a_pagar + 0.5) / 100.0
+        else:
             avance = 100.0
             
-        # Crear objeto de reporte
-        item = CourseEnrolledStudent(
+        # Crear objeto de reporte (datos ya validados en BD: sin re-validar)
+        item = CourseEnrolledStudent.model_construct(
             estudiante_id=student.id,
             nombre=student.nombre or "Sin nombre",
             carnet=student.carnet or None,
-            contacto={
-                "email": student.email or None,
-                "celular": student.celular or None
-            },
-            inscripcion={
-                "id": enrollment.id,
-                "fecha_inscripcion": enrollment.fecha_inscripcion,
-                "estado": enrollment.estado,
-                "tipo_estudiante": enrollment.es_estudiante_interno
-            },
-            financiero={
-                "total_a_pagar": enrollment.total_a_pagar,
-                "total_pagado": enrollment.total_pagado,
-                "saldo_pendiente": enrollment.saldo_pendiente,
-                "avance_pago": round(avance, 2)
-            }
+            contacto=StudentContactInfo.model_construct(
+                email=student.email or None,
+                celular=student.celular or None
+            ),
+            inscripcion=EnrollmentInfo.model_construct(
+                id=enrollment.id,
+                fecha_inscripcion=enrollment.fecha_inscripcion,
+                estado=enrollment.estado,
+                tipo_estudiante=enrollment.es_estudiante_interno
+            ),
+            financiero=FinancialInfo.model_construct(
+                total_a_pagar=enrollment.total_a_pagar,
+                total_pagado=enrollment.total_pagado,
+                saldo_pendiente=enrollment.saldo_pendiente,
+                avance_pago=avance
+            )
         )
         report.append(item)
         
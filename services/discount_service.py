@@ -5,18 +5,25 @@ Servicio de Descuentos
 Lógica de negocio para operaciones CRUD de descuentos.
 """
 
+from datetime import datetime
 from typing import List, Optional
-from beanie import PydanticObjectId
+from beanie import PydanticObjectId, UpdateResponse
 from models.discount import Discount
-from schemas.discount import DiscountCreate, DiscountUpdate
+from schemas.discount import DiscountCreate, DiscountResponse, DiscountUpdate
 
 
-async def get_discounts(page: int = 1, per_page: int = 10) -> tuple[List[Discount], int]:
-    """Obtener lista de descuentos con paginación"""
+async def get_discounts(page: int = 1, per_page: int = 10) -> tuple[List[DiscountResponse], int]:
+    """
+    Obtener lista de descuentos con paginación
+
+    Se proyecta directamente a DiscountResponse: la lista no viaja con
+    lista_estudiantes (que crece con cada beca asignada) ni se construyen
+    Documents de Beanie completos.
+    """
     query = Discount.find_all()
     total_count = await query.count()
     skip = (page - 1) * per_page
-    discounts = await query.sort("-created_at").skip(skip).limit(per_page).to_list()
+    discounts = await query.sort("-created_at").skip(skip).limit(per_page).project(DiscountResponse).to_list()
     return discounts, total_count
 
 
@@ -37,21 +44,21 @@ async def update_discount(
     discount_in: DiscountUpdate
 ) -> Discount:
     """Actualizar descuento existente"""
-    update_data = discount_in.model_dump(exclude_unset=True)
-    
-    for field, value in update_data.items():
-        setattr(discount, field, value)
+    # Campos planos: se copian directo desde el schema, sin volcarlo a un dict
+    for field in discount_in.model_fields_set:
+        setattr(discount, field, getattr(discount_in, field))
     
     await discount.save()
     return discount
 
 
-async def delete_discount(id: PydanticObjectId) -> Discount:
-    """Eliminar descuento"""
-    discount = await Discount.get(id)
-    if discount:
-        await discount.delete()
-    return discount
+async def delete_discount(id: PydanticObjectId) -> Optional[Discount]:
+    """
+    Eliminar descuento en un solo viaje (find_one_and_delete).
+    Devuelve el descuento eliminado, o None si no existía.
+    """
+    raw = await Discount.get_motor_collection().find_one_and_delete({"_id": id})
+    return Discount.model_validate(raw) if raw else None
 
 
 async def get_discounts_by_student(student_id: PydanticObjectId) -> List[Discount]:
@@ -65,22 +72,26 @@ async def get_discounts_by_student(student_id: PydanticObjectId) -> List[Discoun
 async def add_student_to_discount(
     discount_id: PydanticObjectId,
     student_id: PydanticObjectId
-) -> Discount:
-    """Agregar un estudiante a un descuento"""
-    discount = await Discount.get(discount_id)
-    if discount and student_id not in discount.lista_estudiantes:
-        discount.lista_estudiantes.append(student_id)
-        await discount.save()
-    return discount
+) -> Optional[Discount]:
+    """Agregar un estudiante a un descuento (atómico e idempotente con $addToSet)"""
+    return await Discount.find_one(Discount.id == discount_id).update(
+        {
+            "$addToSet": {"lista_estudiantes": student_id},
+            "$set": {"updated_at": datetime.utcnow()}
+        },
+        response_type=UpdateResponse.NEW_DOCUMENT
+    )
 
 
 async def remove_student_from_discount(
     discount_id: PydanticObjectId,
     student_id: PydanticObjectId
-) -> Discount:
-    """Remover un estudiante de un descuento"""
-    discount = await Discount.get(discount_id)
-    if discount and student_id in discount.lista_estudiantes:
-        discount.lista_estudiantes.remove(student_id)
-        await discount.save()
-    return discount
+) -> Optional[Discount]:
+    """Remover un estudiante de un descuento (atómico con $pull)"""
+    return await Discount.find_one(Discount.id == discount_id).update(
+        {
+            "$pull": {"lista_estudiantes": student_id},
+            "$set": {"updated_at": datetime.utcnow()}
+        },
+        response_type=UpdateResponse.NEW_DOCUMENT
+    )
@@ -11,99 +11,115 @@ Permisos:
 - VER inscripciones: ADMIN (todas), STUDENT (solo las suyas)
 """
 
-from typing import List, Optional
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
 from models.enrollment import Enrollment, ModuloEstado
 from models.student import Student
 from models.course import Course
-from models.enums import TipoEstudiante, EstadoInscripcion
+from models.enums import EstadoInscripcion
 from schemas.enrollment import EnrollmentCreate
 from beanie import PydanticObjectId
+from beanie.operators import In
+from pymongo import UpdateOne
+from pydantic import BaseModel, Field
 from models.discount import Discount
+from services import discount_service
+from core.cache import TTLCache
+from core.search import filtro_busqueda
+from core.timezone_utils import to_bolivia_time
 
-async def create_enrollment(enrollment_in: EnrollmentCreate, admin_username: str) -> Enrollment:
+def _aplicar_descuentos(costo: float, descuento_curso: float, descuento_personal: float) -> float:
     """
-    Crear una nueva inscripción (solo admins)
+    Aplica en cascada el descuento del curso y luego el personal (porcentajes).
     
-    Proceso:
-    1. Obtener datos del estudiante y curso
-    2. Calcular precios según tipo de estudiante
-    3. Aplicar descuentos (del curso + seleccionado) sobre el costo de colegiatura (módulos)
-    4. Sumar el costo de la matrícula al total de la deuda definitiva
-    5. Clonar los módulos del curso adaptando sus precios y estados
-    6. Crear inscripción con snapshot de precios y módulos clonados
+    Equivale a costo * (1 - dc/100) * (1 - dp/100): un solo factor multiplicativo.
     """
+    factor = (1.0 - descuento_curso * 0.01) * (1.0 - (descuento_personal or 0.0) * 0.01)
+    return costo * factor
+
+
+async def _get_discount(discount_id: Optional[PydanticObjectId]) -> Optional[Discount]:
+    """
+    Obtiene un descuento por ID; None si no hay ID
+
+    Se lee siempre de la base (sin caché): el precio de la inscripción debe
+    reflejar el estado vigente del descuento aunque otro worker acabe de
+    desactivarlo o editarlo.
+    """
+    if not discount_id:
+        return None
+    return await discount_service.get_discount(discount_id)
+
+
+def _build_enrollment(
+    enrollment_in: EnrollmentCreate,
+    student: Student,
+    course: Course,
+    discount_obj: Optional[Discount],
+    discount_sel: Optional[Discount]
+) -> Enrollment:
+    """
+    Construye (sin insertar) la inscripción con su snapshot de precios y módulos
     
-    # 1. Obtener estudiante y curso
-    student = await Student.get(enrollment_in.estudiante_id)
-    if not student:
-        raise ValueError(f"Estudiante {enrollment_in.estudiante_id} no encontrado")
-    
-    course = await Course.get(enrollment_in.curso_id)
-    if not course:
-        raise ValueError(f"Curso {enrollment_in.curso_id} no encontrado")
-    
-    # 2. Validar que no esté ya inscrito
-    existing = await Enrollment.find_one(
-        Enrollment.estudiante_id == enrollment_in.estudiante_id,
-        Enrollment.curso_id == enrollment_in.curso_id,
-        Enrollment.estado != EstadoInscripcion.CANCELADO
-    )
-    if existing:
-        raise ValueError(
-            f"El estudiante ya está inscrito en este curso (Inscripción ID: {existing.id})"
-        )
+    `discount_obj` es el descuento del curso y `discount_sel` el seleccionado
+    para el estudiante (ambos ya consultados por quien llama).
+    """
     
     # 3. Determinar tipo de estudiante (usar el del Student)
-    es_interno = student.es_estudiante_interno == TipoEstudiante.INTERNO
+    es_interno = student.es_interno
     
-    # 4. Obtener precios del curso
+    # 4. Obtener precios y datos del curso (una sola lectura de cada atributo)
     costo_total = course.get_costo_total(es_interno) # Representa la colegiatura total (módulos)
     costo_matricula = course.get_matricula(es_interno) # Matrícula administrativa
+    cantidad_cuotas = course.cantidad_cuotas
+    curso_descuento_id = course.descuento_id
+    curso_descuento_directo = course.descuento_curso
+    modulos_curso = course.modulos
     
     # 5. Aplicar descuento del curso (Prioridad: ID > Valor directo) sobre colegiatura
     descuento_curso = 0.0
     descuento_curso_id = None
     
-    if course.descuento_id:
-        discount_obj = await Discount.get(course.descuento_id)
+    if curso_descuento_id:
         if discount_obj and discount_obj.activo:
             descuento_curso = discount_obj.porcentaje
             descuento_curso_id = discount_obj.id
-    elif course.descuento_curso:
-        descuento_curso = course.descuento_curso
-        
-    total_con_descuento_curso = costo_total - (costo_total * descuento_curso / 100)
+    elif curso_descuento_directo:
+        descuento_curso = curso_descuento_directo
     
     # 6. Aplicar descuento del estudiante (Prioridad: ID > Valor directo) sobre colegiatura
     descuento_personal = 0.0
     descuento_estudiante_id = None
     
     if enrollment_in.descuento_id:
-        discount_sel = await Discount.get(enrollment_in.descuento_id)
         if discount_sel and discount_sel.activo:
             descuento_personal = discount_sel.porcentaje
             descuento_estudiante_id = discount_sel.id
     elif enrollment_in.descuento_personalizado:
         descuento_personal = enrollment_in.descuento_personalizado
         
-    colegiatura_final = total_con_descuento_curso - (total_con_descuento_curso * descuento_personal / 100)
+    colegiatura_final = _aplicar_descuentos(costo_total, descuento_curso, descuento_personal)
     
     # MATEMÁTICA FINANCIERA CORREGIDA:
     # La deuda total inicial es el costo de colegiatura con descuentos + la matrícula administrativa
-    total_final = colegiatura_final + costo_matricula
+    # (redondeada una sola vez a centavos)
+    total_final = round(colegiatura_final + costo_matricula, 2)
     
     # 7. Copiar requisitos del curso y convertirlos a Requisito con estado PENDIENTE
     requisitos_enrollment = [template.to_requisito() for template in course.requisitos]
     
     # 8. Clonación y distribución de módulos A PRUEBA DE BALAS
     modulos_enrollment = []
-    if course.modulos:
-        suma_costo_modulos = sum(mod.costo for mod in course.modulos)
+    if modulos_curso:
+        suma_costo_modulos = sum(mod.costo for mod in modulos_curso)
+        n_modulos = len(modulos_curso)
+        ultimo = n_modulos - 1
         total_asignado = 0.0
         
-        for i, mod in enumerate(course.modulos):
-            if i == len(course.modulos) - 1:
+        for i, mod in enumerate(modulos_curso):
+            if i == ultimo:
                 # El último módulo absorbe el resto exacto. Se protege con max(0.0)
                 costo_final_mod = max(0.0, round(colegiatura_final - total_asignado, 2))
             else:
@@ -112,12 +128,12 @@ async def create_enrollment(enrollment_in: EnrollmentCreate, admin_username: str
                     costo_final_mod = round((mod.costo / suma_costo_modulos) * colegiatura_final, 2)
                 else:
                     # Fallback: si el admin puso 0 Bs a todos los módulos, divide en partes iguales
-                    costo_final_mod = round(colegiatura_final / len(course.modulos), 2)
+                    costo_final_mod = round(colegiatura_final / n_modulos, 2)
                 
                 total_asignado += costo_final_mod
             
             modulos_enrollment.append(
-                ModuloEstado(
+                ModuloEstado.model_construct(
                     nombre=mod.nombre,
                     costo=costo_final_mod,
                     estado="Pendiente",
@@ -127,14 +143,16 @@ async def create_enrollment(enrollment_in: EnrollmentCreate, admin_username: str
                 )
             )
     
-    # 9. Crear inscripción con snapshot de precios y módulos corregido
-    enrollment = Enrollment(
+    # 9. Crear inscripción con snapshot de precios y módulos corregido.
+    #    Todos los valores provienen de documentos ya validados o se calcularon
+    #    arriba, así que se construye sin un segundo pase de validación.
+    enrollment = Enrollment.model_construct(
         estudiante_id=enrollment_in.estudiante_id,
         curso_id=enrollment_in.curso_id,
         es_estudiante_interno=student.es_estudiante_interno,
         costo_total=costo_total,
         costo_matricula=costo_matricula,
-        cantidad_cuotas=course.cantidad_cuotas,
+        cantidad_cuotas=cantidad_cuotas,
         modulos=modulos_enrollment,
         
         # Descuento Curso
@@ -145,34 +163,189 @@ async def create_enrollment(enrollment_in: EnrollmentCreate, admin_username: str
         descuento_estudiante_id=descuento_estudiante_id,
         descuento_personalizado=descuento_personal,
         
-        total_a_pagar=round(total_final, 2),
-        saldo_pendiente=round(total_final, 2), # Inicia debiendo colegiatura + matrícula
+        total_a_pagar=total_final,
+        saldo_pendiente=total_final, # Inicia debiendo colegiatura + matrícula
         estado=EstadoInscripcion.PENDIENTE_PAGO,
         matricula_pagada=False, # Estado inicial de matrícula
         
         # Requisitos (copiados del curso)
         requisitos=requisitos_enrollment
     )
+    return enrollment
+
+
+async def create_enrollment(enrollment_in: EnrollmentCreate, admin_username: str) -> Enrollment:
+    """
+    Crear una nueva inscripción (solo admins)
+    
+    Proceso:
+    1. Obtener datos del estudiante y curso
+    2. Calcular precios según tipo de estudiante
+    3. Aplicar descuentos (del curso + seleccionado) sobre el costo de colegiatura (módulos)
+    4. Sumar el costo de la matrícula al total de la deuda definitiva
+    5. Clonar los módulos del curso adaptando sus precios y estados
+    6. Crear inscripción con snapshot de precios y módulos clonados
+    """
+    
+    # 1-2. Obtener estudiante, curso e inscripción previa en paralelo
+    #      (tres consultas independientes: sus latencias se solapan)
+    student, course, existing = await asyncio.gather(
+        Student.get(enrollment_in.estudiante_id),
+        Course.get(enrollment_in.curso_id),
+        Enrollment.find_one(
+            Enrollment.estudiante_id == enrollment_in.estudiante_id,
+            Enrollment.curso_id == enrollment_in.curso_id,
+            Enrollment.estado != EstadoInscripcion.CANCELADO
+        )
+    )
+    if not student:
+        raise ValueError(f"Estudiante {enrollment_in.estudiante_id} no encontrado")
     
-    await enrollment.insert()
+    if not course:
+        raise ValueError(f"Curso {enrollment_in.curso_id} no encontrado")
+    
+    # Validar que no esté ya inscrito
+    if existing:
+        raise ValueError(
+            f"El estudiante ya está inscrito en este curso (Inscripción ID: {existing.id})"
+        )
+    
+    # Ambos descuentos (curso y seleccionado) se consultan en paralelo
+    discount_obj, discount_sel = await asyncio.gather(
+        _get_discount(course.descuento_id),
+        _get_discount(enrollment_in.descuento_id)
+    )
+    
+    # 3-9. Precios, descuentos, requisitos y módulos
+    enrollment = _build_enrollment(enrollment_in, student, course, discount_obj, discount_sel)
     
-    # 10. Agregar estudiante a la lista de inscritos del curso
-    if enrollment_in.estudiante_id not in course.inscritos:
-        course.inscritos.append(enrollment_in.estudiante_id)
-        await course.save()
+    # 10. Insertar la inscripción primero: si falla (índice único u otro error)
+    # no se escribe ninguna referencia a una inscripción que no existe
+    await enrollment.insert()
     
-    # 11. Agregar curso a la lista de cursos del estudiante
-    if enrollment_in.curso_id not in student.lista_cursos_ids:
-        student.lista_cursos_ids.append(enrollment_in.curso_id)
-        await student.save()
+    # 11. Registrar al estudiante en el curso y el curso en el estudiante, en
+    # paralelo. $addToSet atómico: solo viaja el delta (sin reescribir el
+    # documento completo), es idempotente y no pierde actualizaciones con
+    # inscripciones concurrentes.
+    ahora = datetime.utcnow()
+    await asyncio.gather(
+        Course.find_one(Course.id == course.id).update({
+            "$addToSet": {"inscritos": enrollment_in.estudiante_id},
+            "$set": {"updated_at": ahora}
+        }),
+        Student.find_one(Student.id == student.id).update({
+            "$addToSet": {"lista_cursos_ids": enrollment_in.curso_id},
+            "$set": {"updated_at": ahora}
+        })
+    )
     
     return enrollment
 
 
-async def enrich_enrollment_dates(enrollment: Enrollment) -> dict:
-    """Enriquecer enrollment con fechas convertidas a hora boliviana"""
-    from core.timezone_utils import to_bolivia_time
+async def create_enrollments_bulk(
+    enrollments_in: List[EnrollmentCreate],
+    admin_username: str
+) -> List[Enrollment]:
+    """
+    Crear varias inscripciones en un solo lote (solo admins)
+    
+    Mismas reglas que create_enrollment, pero con un número fijo de viajes a
+    MongoDB sin importar el tamaño del lote:
+    1. Estudiantes, cursos, duplicados y descuentos se cargan con $in/$or
+    2. Se valida TODO el lote antes de escribir (si algo falla, no se inserta nada)
+    3. insert_many para las inscripciones
+    4. bulk_write con $addToSet para las referencias en cursos y estudiantes
+    """
+    if not enrollments_in:
+        return []
+    
+    pares = [(e.estudiante_id, e.curso_id) for e in enrollments_in]
+    if len(set(pares)) != len(pares):
+        raise ValueError("El lote contiene inscripciones repetidas (mismo estudiante y curso)")
+    
+    student_ids = list({e.estudiante_id for e in enrollments_in})
+    course_ids = list({e.curso_id for e in enrollments_in})
+    
+    # 1. Cargar estudiantes, cursos e inscripciones previas en paralelo
+    students, courses, existentes = await asyncio.gather(
+        Student.find(In(Student.id, student_ids)).to_list(),
+        Course.find(In(Course.id, course_ids)).to_list(),
+        Enrollment.find({
+            "$or": [{"estudiante_id": e, "curso_id": c} for e, c in pares],
+            "estado": {"$ne": EstadoInscripcion.CANCELADO}
+        }).to_list()
+    )
+    students_by_id = {s.id: s for s in students}
+    courses_by_id = {c.id: c for c in courses}
+    
+    # 2. Validar el lote completo
+    for e in enrollments_in:
+        if e.estudiante_id not in students_by_id:
+            raise ValueError(f"Estudiante {e.estudiante_id} no encontrado")
+        if e.curso_id not in courses_by_id:
+            raise ValueError(f"Curso {e.curso_id} no encontrado")
+    if existentes:
+        dup = existentes[0]
+        raise ValueError(
+            f"El estudiante {dup.estudiante_id} ya está inscrito en el curso "
+            f"{dup.curso_id} (Inscripción ID: {dup.id})"
+        )
     
+    # Descuentos: una sola consulta para todos los IDs distintos del lote
+    discount_ids = {c.descuento_id for c in courses if c.descuento_id}
+    discount_ids |= {e.descuento_id for e in enrollments_in if e.descuento_id}
+    discounts_by_id = {}
+    if discount_ids:
+        discounts = await Discount.find(In(Discount.id, list(discount_ids))).to_list()
+        discounts_by_id = {d.id: d for d in discounts}
+    
+    enrollments = []
+    for e in enrollments_in:
+        course = courses_by_id[e.curso_id]
+        enrollment = _build_enrollment(
+            e,
+            students_by_id[e.estudiante_id],
+            course,
+            discounts_by_id.get(course.descuento_id),
+            discounts_by_id.get(e.descuento_id)
+        )
+        # insert_many no asigna los _id a los documentos: se generan aquí
+        enrollment.id = PydanticObjectId()
+        enrollments.append(enrollment)
+    
+    # 3. Insertar todas las inscripciones en un solo viaje
+    await Enrollment.insert_many(enrollments)
+    
+    # 4. Registrar referencias agrupadas por curso y por estudiante
+    inscritos_por_curso = defaultdict(list)
+    cursos_por_estudiante = defaultdict(list)
+    for e in enrollments_in:
+        inscritos_por_curso[e.curso_id].append(e.estudiante_id)
+        cursos_por_estudiante[e.estudiante_id].append(e.curso_id)
+    
+    ahora = datetime.utcnow()
+    await asyncio.gather(
+        Course.get_motor_collection().bulk_write([
+            UpdateOne(
+                {"_id": curso_id},
+                {"$addToSet": {"inscritos": {"$each": ids}}, "$set": {"updated_at": ahora}}
+            )
+            for curso_id, ids in inscritos_por_curso.items()
+        ], ordered=False),
+        Student.get_motor_collection().bulk_write([
+            UpdateOne(
+                {"_id": estudiante_id},
+                {"$addToSet": {"lista_cursos_ids": {"$each": ids}}, "$set": {"updated_at": ahora}}
+            )
+            for estudiante_id, ids in cursos_por_estudiante.items()
+        ], ordered=False)
+    )
+    
+    return enrollments
+
+
+def enrich_enrollment_dates(enrollment: Enrollment) -> dict:
+    """Enriquecer enrollment con fechas convertidas a hora boliviana"""
     enrollment_dict = enrollment.model_dump()
     enrollment_dict["fecha_inscripcion"] = to_bolivia_time(enrollment.fecha_inscripcion)
     enrollment_dict["created_at"] = to_bolivia_time(enrollment.created_at)
@@ -181,9 +354,35 @@ async def enrich_enrollment_dates(enrollment: Enrollment) -> dict:
     return enrollment_dict
 
 
+# ========================================================================
+# CACHÉ DE LECTURA DE INSCRIPCIONES
+# ========================================================================
+# Caché TTL corta en memoria del proceso: absorbe las lecturas repetidas de la
+# misma inscripción dentro de un flujo (aprobar -> consultar -> re-renderizar).
+# Solo para lecturas de visualización: no ve las escrituras de otros procesos
+# (otra réplica, scripts/), así que lo que calcula montos (create_payment,
+# get_next_pending_payment) lee Enrollment.get directamente.
+# Toda escritura sobre una inscripción (incluidos los borrados) debe llamar a
+# invalidate_enrollment_cache o, en borrados en lote, a clear_enrollment_cache.
+_enrollment_cache: TTLCache[Enrollment] = TTLCache(ttl=5.0, maxsize=1024)
+
+
+def invalidate_enrollment_cache(id: PydanticObjectId) -> None:
+    """Descartar la inscripción de la caché de lectura (tras escribirla)"""
+    _enrollment_cache.invalidate(id)
+
+
+def clear_enrollment_cache() -> None:
+    """Vaciar la caché de inscripciones (borrados en lote, sin IDs a mano)"""
+    _enrollment_cache.clear()
+
+
 async def get_enrollment(id: PydanticObjectId) -> Optional[Enrollment]:
-    """Obtener una inscripción por ID"""
-    return await Enrollment.get(id)
+    """
+    Obtener una inscripción por ID para mostrarla (vía caché TTL; cada llamada
+    recibe su propia copia). No usar para calcular montos (ver arriba).
+    """
+    return await _enrollment_cache.get_or_load(id, lambda: Enrollment.get(id))
 
 
 async def get_enrollments_by_student(student_id: PydanticObjectId) -> List[Enrollment]:
@@ -193,15 +392,64 @@ async def get_enrollments_by_student(student_id: PydanticObjectId) -> List[Enrol
     ).to_list()
 
 
-async def get_enrollments_by_course(course_id: PydanticObjectId) -> List[Enrollment]:
-    """Obtener todas las inscripciones de un curso"""
-    return await Enrollment.find(
-        Enrollment.curso_id == course_id
-    ).to_list()
+async def iter_enrollments_by_course(course_id: PydanticObjectId) -> AsyncIterator[Enrollment]:
+    """
+    Recorrer las inscripciones de un curso con el cursor de MongoDB
+    
+    No materializa la lista: un curso con miles de inscritos se procesa
+    de a un documento.
+    """
+    async for enrollment in Enrollment.find(Enrollment.curso_id == course_id):
+        yield enrollment
 
 
 from beanie.operators import In, Or
 
+class _IdProjection(BaseModel):
+    """Proyección mínima: solo el _id (búsquedas que únicamente necesitan IDs)"""
+    id: PydanticObjectId = Field(alias="_id")
+
+    model_config = {"populate_by_name": True}
+
+
+# Uniones del listado administrativo: solo los campos que muestra la tabla
+_DETAIL_LOOKUPS = [
+    {"$lookup": {
+        "from": "students",
+        "localField": "estudiante_id",
+        "foreignField": "_id",
+        "pipeline": [{"$project": {"nombre": 1, "email": 1}}],
+        "as": "_estudiante"
+    }},
+    {"$lookup": {
+        "from": "courses",
+        "localField": "curso_id",
+        "foreignField": "_id",
+        "pipeline": [{"$project": {"nombre_programa": 1, "codigo": 1}}],
+        "as": "_curso"
+    }}
+]
+
+
+def _enrich_with_details(raw: dict) -> dict:
+    """Convierte un documento de la agregación en un dict para EnrollmentWithDetails"""
+    estudiante = (raw.pop("_estudiante", None) or [{}])[0]
+    curso = (raw.pop("_curso", None) or [{}])[0]
+    enrollment = Enrollment.model_validate(raw)
+    
+    data = enrich_enrollment_dates(enrollment)
+    data["estudiante_nombre"] = estudiante.get("nombre")
+    data["estudiante_email"] = estudiante.get("email")
+    data["curso_nombre"] = curso.get("nombre_programa")
+    data["curso_codigo"] = curso.get("codigo")
+    data["monto_cuota"] = round(enrollment.calcular_monto_cuota(), 2)
+    data["porcentaje_pagado"] = (
+        round(enrollment.total_pagado / enrollment.total_a_pagar * 100, 2)
+        if enrollment.total_a_pagar > 0 else 100.0
+    )
+    return data
+
+
 async def get_all_enrollments(
     page: int = 1,
     per_page: int = 10,
@@ -209,8 +457,13 @@ async def get_all_enrollments(
     estado: Optional[EstadoInscripcion] = None,
     curso_id: Optional[PydanticObjectId] = None,
     estudiante_id: Optional[PydanticObjectId] = None
-) -> tuple[List[Enrollment], int]:
-    """Obtener todas las inscripciones con paginación y filtros"""
+) -> tuple[List[dict], int]:
+    """
+    Obtener todas las inscripciones con paginación y filtros.
+    
+    Cada inscripción se devuelve ya enriquecida (fechas en hora boliviana y
+    datos del estudiante y del curso), lista para EnrollmentWithDetails.
+    """
     query = Enrollment.find()
     
     if estado:
@@ -221,18 +474,18 @@ async def get_all_enrollments(
         query = query.find(Enrollment.estudiante_id == estudiante_id)
         
     if q:
-        regex_pattern = {"$regex": q, "$options": "i"}
-        students = await Student.find(
-            Or(
-                Student.nombre == regex_pattern,
-                Student.carnet == regex_pattern
-            )
-        ).to_list()
+        # $text (palabras completas) más un prefijo anclado por campo indexado,
+        # en lugar de un regex sin anclar que recorre la colección completa
+        # (ver core.search). Las dos búsquedas son independientes: van en paralelo
+        students, courses = await asyncio.gather(
+            Student.find(
+                filtro_busqueda(q, prefijos={"nombre": True, "carnet": False})
+            ).project(_IdProjection).to_list(),
+            Course.find(
+                filtro_busqueda(q, prefijos={"nombre_programa": True, "codigo": True})
+            ).project(_IdProjection).to_list()
+        )
         student_ids = [s.id for s in students]
-        
-        courses = await Course.find(
-            Course.nombre_programa == regex_pattern
-        ).to_list()
         course_ids = [c.id for c in courses]
         
         query = query.find(
@@ -242,13 +495,66 @@ async def get_all_enrollments(
             )
         )
     
-    total_count = await query.count()
     skip = (page - 1) * per_page
     
-    enrollments = await query.sort("-fecha_inscripcion").skip(skip).limit(per_page).to_list()
+    filtro = query.get_filter_query()
+    pagina = [
+        {"$sort": {"fecha_inscripcion": -1}},
+        {"$skip": skip},
+        {"$limit": per_page},
+        *_DETAIL_LOOKUPS
+    ]
+    
+    if filtro:
+        # Conteo y página en un solo viaje ($facet). Solo la página se une con
+        # estudiantes y cursos (evita un Student.get/Course.get por fila), y el
+        # conteo no paga el costo de las uniones.
+        result = await Enrollment.aggregate([
+            {"$match": filtro},
+            {"$facet": {"data": pagina, "total": [{"$count": "count"}]}}
+        ]).to_list()
+        facet = result[0] if result else {"data": [], "total": []}
+        total_count = facet["total"][0]["count"] if facet["total"] else 0
+        raw_page = facet["data"]
+    else:
+        # Sin filtros el total sale de los metadatos de la colección (O(1))
+        raw_page, total_count = await asyncio.gather(
+            Enrollment.aggregate(pagina).to_list(),
+            Enrollment.get_motor_collection().estimated_document_count()
+        )
+    
+    enrollments = [_enrich_with_details(raw) for raw in raw_page]
     return enrollments, total_count
 
 
+async def delete_enrollment(id: PydanticObjectId) -> Optional[Enrollment]:
+    """
+    Eliminar una inscripción y quitar sus referencias cruzadas.
+    
+    La inscripción se borra en un solo viaje (find_one_and_delete) y luego
+    se retiran el curso del estudiante y el estudiante del curso con $pull,
+    ambos en paralelo. Devuelve la inscripción eliminada, o None si no existía.
+    """
+    raw = await Enrollment.get_motor_collection().find_one_and_delete({"_id": id})
+    if not raw:
+        return None
+    enrollment = Enrollment.model_validate(raw)
+    invalidate_enrollment_cache(id)
+    
+    ahora = datetime.utcnow()
+    await asyncio.gather(
+        Student.find_one(Student.id == enrollment.estudiante_id).update({
+            "$pull": {"lista_cursos_ids": enrollment.curso_id},
+            "$set": {"updated_at": ahora}
+        }),
+        Course.find_one(Course.id == enrollment.curso_id).update({
+            "$pull": {"inscritos": enrollment.estudiante_id},
+            "$set": {"updated_at": ahora}
+        })
+    )
+    return enrollment
+
+
 async def update_enrollment_descuento(
     enrollment_id: PydanticObjectId,
     descuento_personalizado: float,
@@ -263,28 +569,25 @@ async def update_enrollment_descuento(
         raise ValueError(f"Inscripción {enrollment_id} no encontrada")
     
     # Recalcular total de colegiatura con nuevo descuento
-    total_con_descuento_curso = enrollment.costo_total - (
-        enrollment.costo_total * enrollment.descuento_curso_aplicado / 100
-    )
-    
-    colegiatura_final = total_con_descuento_curso - (
-        total_con_descuento_curso * descuento_personalizado / 100
+    colegiatura_final = _aplicar_descuentos(
+        enrollment.costo_total, enrollment.descuento_curso_aplicado, descuento_personalizado
     )
     
     # MATEMÁTICA FINANCIERA CORREGIDA:
     # El total definitivo a pagar incluye la colegiatura descontada más la matrícula administrativa
-    total_final = colegiatura_final + enrollment.costo_matricula
+    total_final = round(colegiatura_final + enrollment.costo_matricula, 2)
     
     # Calcular nuevo saldo pendiente basado en los pagos que ya ha realizado
     nuevo_saldo = total_final - enrollment.total_pagado
     
     # Actualizar
     enrollment.descuento_personalizado = descuento_personalizado
-    enrollment.total_a_pagar = round(total_final, 2)
+    enrollment.total_a_pagar = total_final
     enrollment.saldo_pendiente = round(max(0.0, nuevo_saldo), 2)
     enrollment.updated_at = datetime.utcnow()
     
     await enrollment.save()
+    invalidate_enrollment_cache(enrollment_id)
     return enrollment
 
 
@@ -302,30 +605,60 @@ async def cambiar_estado_enrollment(
     enrollment.updated_at = datetime.utcnow()
     
     await enrollment.save()
+    invalidate_enrollment_cache(enrollment_id)
     return enrollment
 
 
 async def actualizar_saldo_enrollment(
     enrollment_id: PydanticObjectId,
-    monto_pago_aprobado: float
+    monto_pago_aprobado: float,
+    matricula_pagada: bool = False
 ):
-    """Actualizar el saldo de una inscripción cuando se aprueba un pago"""
-    enrollment = await Enrollment.get(enrollment_id)
-    if not enrollment:
-        raise ValueError(f"Inscripción {enrollment_id} no encontrada")
-    
-    # Actualizar totales
-    enrollment.actualizar_saldo(monto_pago_aprobado)
-    
-    # Cambiar estado si pagó matrícula
-    if enrollment.estado == EstadoInscripcion.PENDIENTE_PAGO:
-        enrollment.estado = EstadoInscripcion.ACTIVO
-    
-    # Cambiar a COMPLETADO si pagó todo
-    if enrollment.esta_completamente_pagado():
-        enrollment.estado = EstadoInscripcion.COMPLETADO
+    """
+    Actualizar el saldo de una inscripción cuando se aprueba un pago
     
-    await enrollment.save()
+    Se aplica en un solo update atómico (pipeline de agregación en el servidor):
+    sin lectura previa y sin perder pagos si se aprueban dos a la vez.
+    Replica Enrollment.actualizar_saldo y las transiciones de estado:
+    PENDIENTE_PAGO -> ACTIVO, y COMPLETADO si el saldo queda en cero.
+    Con `matricula_pagada=True` marca además la matrícula en el mismo update.
+    """
+    campos = {
+        "total_pagado": {"$add": ["$total_pagado", monto_pago_aprobado]},
+        "updated_at": datetime.utcnow()
+    }
+    if matricula_pagada:
+        campos["matricula_pagada"] = True
+    
+    result = await Enrollment.get_motor_collection().update_one(
+        {"_id": enrollment_id},
+        [
+            {"$set": campos},
+            {"$set": {
+                "saldo_pendiente": {"$max": [0, {"$subtract": ["$total_a_pagar", "$total_pagado"]}]}
+            }},
+            {"$set": {
+                "estado": {"$switch": {
+                    "branches": [
+                        # Cambiar a COMPLETADO si pagó todo
+                        {
+                            "case": {"$lte": ["$saldo_pendiente", 0.01]},
+                            "then": EstadoInscripcion.COMPLETADO.value
+                        },
+                        # Cambiar estado si pagó matrícula
+                        {
+                            "case": {"$eq": ["$estado", EstadoInscripcion.PENDIENTE_PAGO.value]},
+                            "then": EstadoInscripcion.ACTIVO.value
+                        }
+                    ],
+                    "default": "$estado"
+                }}
+            }}
+        ]
+    )
+    invalidate_enrollment_cache(enrollment_id)
+    if result.matched_count == 0:
+        raise ValueError(f"Inscripción {enrollment_id} no encontrada")
 
 
 # ========================================================================
@@ -364,5 +697,6 @@ async def actualizar_nota_modulo(
         
     enrollment.updated_at = datetime.utcnow()
     await enrollment.save()
+    invalidate_enrollment_cache(enrollment_id)
     
     return enrollment
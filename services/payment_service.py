@@ -11,54 +11,149 @@ Permisos:
 - VER pagos: ADMIN (todos), STUDENT (solo los suyos)
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import asyncio
+import logging
+import re
 from datetime import datetime
 from models.payment import Payment
+from models.course import Course
 from models.enrollment import Enrollment
 from models.student import Student
-from models.course import Course
 from models.enums import EstadoPago
+from models.base import to_object_id
+from core.cache import TTLCache
+from core.pagination import Pagina, filtro_anteriores, filtro_siguientes, resolver_cursor
+from core.search import filtro_busqueda, prefijo
+from core.timezone_utils import to_bolivia_time
 from schemas.payment import PaymentCreate
 from beanie import PydanticObjectId
 from beanie.operators import In, Or
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from pydantic import BaseModel, Field
 from services import enrollment_service
 
+logger = logging.getLogger(__name__)
+
+# Campos con prefijo anclado en la búsqueda libre de pagos (-> si ignora
+# mayúsculas), del pago y de su estudiante o curso; todos tienen índice simple
+# además del índice de texto de su colección (ver core.search)
+_PREFIJOS_BUSQUEDA_PAGO = {"numero_transaccion": True, "concepto": True}
+_PREFIJOS_BUSQUEDA_ESTUDIANTE = {"nombre": True, "registro": False, "carnet": False}
+_PREFIJOS_BUSQUEDA_CURSO = {"nombre_programa": True, "codigo": True}
+
+
+class _IdProjection(BaseModel):
+    """Proyección mínima: solo el _id (búsquedas que únicamente necesitan IDs)"""
+    id: PydanticObjectId = Field(alias="_id")
+
+    model_config = {"populate_by_name": True}
+
+
+class _StudentNombreProjection(BaseModel):
+    """Proyección de Student: solo lo que muestran los listados de pagos"""
+    id: PydanticObjectId = Field(alias="_id")
+    nombre: Optional[str] = None
+
+    model_config = {"populate_by_name": True}
+
+
+class _PaymentConceptoProjection(BaseModel):
+    """Proyección de Payment: concepto y cuota que cubre"""
+    concepto: str
+    numero_cuota: Optional[int] = None
+
+
+class _EnrollmentCuotasProjection(BaseModel):
+    """Proyección de Enrollment: solo la cantidad de cuotas"""
+    id: PydanticObjectId = Field(alias="_id")
+    cantidad_cuotas: int = 0
+
+    model_config = {"populate_by_name": True}
+
+
+class _PaymentListaProjection(BaseModel):
+    """Proyección de Payment: los campos de PaymentResponse (listados)"""
+    id: PydanticObjectId = Field(alias="_id")
+    inscripcion_id: PydanticObjectId
+    estudiante_id: PydanticObjectId
+    curso_id: PydanticObjectId
+    concepto: str
+    numero_cuota: Optional[int] = None
+    numero_transaccion: str
+    cantidad_pago: float
+    comprobante_url: str
+    estado_pago: EstadoPago
+    remitente: Optional[str] = None
+    banco: Optional[str] = None
+    monto_comprobante: Optional[float] = None
+    fecha_comprobante: Optional[datetime] = None
+    cuenta_destino: Optional[str] = None
+    fecha_subida: datetime
+    fecha_verificacion: Optional[datetime] = None
+    verificado_por: Optional[str] = None
+    motivo_rechazo: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"populate_by_name": True}
+
+
+async def filtro_busqueda_pagos(q: str) -> dict:
+    """
+    Filtro $or de la búsqueda libre (q) del listado de pagos
+    
+    Un pago coincide por sus propios campos o por los de su estudiante (nombre,
+    email, carnet, registro) o su curso (nombre_programa, codigo). Cada parte usa
+    $text más prefijos anclados (ver core.search) en lugar de regex sin anclar,
+    y de estudiantes y cursos solo se traen los _id, en paralelo.
+    """
+    filtro_estudiante = filtro_busqueda(q, prefijos=_PREFIJOS_BUSQUEDA_ESTUDIANTE)
+    filtro_estudiante["$or"].append({"email": prefijo(q.lower())})
+    students, courses = await asyncio.gather(
+        Student.find(filtro_estudiante).project(_IdProjection).to_list(),
+        Course.find(
+            filtro_busqueda(q, prefijos=_PREFIJOS_BUSQUEDA_CURSO)
+        ).project(_IdProjection).to_list()
+    )
+    return {"$or": [
+        *filtro_busqueda(q, prefijos=_PREFIJOS_BUSQUEDA_PAGO)["$or"],
+        {"estudiante_id": {"$in": [s.id for s in students]}},
+        {"curso_id": {"$in": [c.id for c in courses]}}
+    ]}
+
 
 async def enrich_payment_with_details(payment: Payment) -> dict:
     """
     Enriquecer un pago individual (usado para vistas de un solo ítem)
-    """
-    payment_dict = payment.model_dump(by_alias=True)
-    
-    student = await Student.get(payment.estudiante_id)
-    nombre_estudiante = student.nombre if student and student.nombre else "Sin nombre"
     
-    from core.timezone_utils import to_bolivia_time
-    fecha = to_bolivia_time(payment.fecha_subida)
-    created_at_bolivia = to_bolivia_time(payment.created_at)
-    updated_at_bolivia = to_bolivia_time(payment.updated_at)
-    
-    total_cuotas = 0
-    try:
-        enrollment = await enrollment_service.get_enrollment(payment.inscripcion_id)
-        if enrollment:
-            total_cuotas = enrollment.cantidad_cuotas
-    except:
-        total_cuotas = 0
+    Delega en la ruta por lote: estudiante e inscripción se consultan en
+    paralelo y proyectados, igual que en los listados.
+    """
+    enriched = await enrich_payments_with_details_bulk([payment])
+    return enriched[0]
+
+
+async def fetch_payment_lookup_maps(
+    payments: List[Payment]
+) -> Tuple[Dict[PydanticObjectId, _StudentNombreProjection], Dict[PydanticObjectId, _EnrollmentCuotasProjection]]:
+    """
+    Carga en lote los estudiantes y las inscripciones referidos por `payments`
     
-    payment_dict.update({
-        "nombre_estudiante": nombre_estudiante,
-        "fecha": fecha,
-        "moneda": "Bs",
-        "monto": payment.cantidad_pago,
-        "estado": payment.estado_pago.value if payment.estado_pago else "",
-        "total_cuotas": total_cuotas,
-        "created_at": created_at_bolivia,
-        "updated_at": updated_at_bolivia
-    })
+    Dos consultas $in en paralelo (proyectadas: del estudiante solo el nombre,
+    de la inscripción solo las cuotas), devueltas como mapas por ID.
+    """
+    student_ids = list({p.estudiante_id for p in payments if p.estudiante_id})
+    enrollment_ids = list({p.inscripcion_id for p in payments if p.inscripcion_id})
     
-    return payment_dict
+    students, enrollments = await asyncio.gather(
+        Student.find(In(Student.id, student_ids)).project(_StudentNombreProjection).to_list(),
+        Enrollment.find(
+            In(Enrollment.id, enrollment_ids)
+        ).project(_EnrollmentCuotasProjection).to_list()
+    )
+    return {s.id: s for s in students}, {e.id: e for e in enrollments}
 
 
 async def enrich_payments_with_details_bulk(payments: List[Payment]) -> List[dict]:
@@ -70,21 +165,8 @@ async def enrich_payments_with_details_bulk(payments: List[Payment]) -> List[dic
     if not payments:
         return []
 
-    # 1. Agrupar IDs únicos a buscar
-    student_ids = list({p.estudiante_id for p in payments if p.estudiante_id})
-    enrollment_ids = list({p.inscripcion_id for p in payments if p.inscripcion_id})
-
-    # 2. Consultas concurrentes en paralelo
-    students_task = Student.find(In(Student.id, student_ids)).to_list()
-    enrollments_task = Enrollment.find(In(Enrollment.id, enrollment_ids)).to_list()
-    
-    students, enrollments = await asyncio.gather(students_task, enrollments_task)
-
-    # 3. Mapeos O(1) en memoria para resolución ultrarrápida
-    students_map = {s.id: s for s in students}
-    enrollments_map = {e.id: e for e in enrollments}
-
-    from core.timezone_utils import to_bolivia_time
+    # Mapeos O(1) en memoria para resolución ultrarrápida
+    students_map, enrollments_map = await fetch_payment_lookup_maps(payments)
 
     enriched_list = []
     for payment in payments:
@@ -111,26 +193,22 @@ async def enrich_payments_with_details_bulk(payments: List[Payment]) -> List[dic
     return enriched_list
 
 
-async def get_next_pending_payment(enrollment_id: PydanticObjectId) -> dict:
-    """
-    Calcula el siguiente pago pendiente.
-    """
-    enrollment = await enrollment_service.get_enrollment(enrollment_id)
-    if not enrollment:
-        raise ValueError("Inscripción no encontrada")
-
+async def _fetch_conceptos_cubiertos(enrollment_id: PydanticObjectId) -> set:
+    """(concepto, numero_cuota) de los pagos vigentes (pendientes o aprobados) de una inscripción"""
+    # Solo esos dos campos: no se hidratan documentos completos
     pagos_activos = await Payment.find(
         Payment.inscripcion_id == enrollment_id,
         Or(
             Payment.estado_pago == EstadoPago.PENDIENTE,
             Payment.estado_pago == EstadoPago.APROBADO
         )
-    ).to_list()
-    
-    conceptos_cubiertos = {
-        (p.concepto, p.numero_cuota) for p in pagos_activos
-    }
+    ).project(_PaymentConceptoProjection).to_list()
     
+    return {(p.concepto, p.numero_cuota) for p in pagos_activos}
+
+
+def _calcular_siguiente_pago(enrollment: Enrollment, conceptos_cubiertos: set) -> Optional[dict]:
+    """Primer concepto (matrícula y luego cuotas en orden) que aún no está cubierto"""
     if enrollment.costo_matricula > 0:
         if ("Matrícula", None) not in conceptos_cubiertos:
             return {
@@ -153,6 +231,31 @@ async def get_next_pending_payment(enrollment_id: PydanticObjectId) -> dict:
     return None
 
 
+async def get_next_pending_payment(
+    enrollment_id: PydanticObjectId,
+    enrollment: Optional[Enrollment] = None
+) -> dict:
+    """
+    Calcula el siguiente pago pendiente.
+    
+    Si el llamador ya tiene la inscripción cargada puede pasarla en
+    `enrollment` para no volver a consultarla; si no, la inscripción y los
+    pagos vigentes se consultan en paralelo. La inscripción se lee de la base
+    y no de la caché: el monto sugerido sale de sus totales y descuentos.
+    """
+    if enrollment is None:
+        enrollment, conceptos_cubiertos = await asyncio.gather(
+            Enrollment.get(enrollment_id),
+            _fetch_conceptos_cubiertos(enrollment_id)
+        )
+    else:
+        conceptos_cubiertos = await _fetch_conceptos_cubiertos(enrollment_id)
+    if not enrollment:
+        raise ValueError("Inscripción no encontrada")
+
+    return _calcular_siguiente_pago(enrollment, conceptos_cubiertos)
+
+
 async def create_payment(
     payment_in: PaymentCreate,
     student_id: PydanticObjectId
@@ -160,7 +263,15 @@ async def create_payment(
     """
     Crear un nuevo pago.
     """
-    enrollment = await Enrollment.get(payment_in.inscripcion_id)
+    inscripcion_id = to_object_id(payment_in.inscripcion_id)
+    
+    # Inscripción y pagos vigentes en paralelo; la propiedad se valida en memoria.
+    # Concepto y monto salen de la inscripción: se lee de la base, sin la caché
+    # de enrollment_service (una escritura de otro proceso la dejaría vieja)
+    enrollment, conceptos_cubiertos = await asyncio.gather(
+        Enrollment.get(inscripcion_id),
+        _fetch_conceptos_cubiertos(inscripcion_id)
+    )
     if not enrollment:
         raise ValueError(f"Inscripción {payment_in.inscripcion_id} no encontrada")
     
@@ -168,26 +279,13 @@ async def create_payment(
         raise ValueError(
             "No puedes crear un pago para una inscripción que no te pertenece"
         )
-
-    # Validación anti-fraude
-    existing_transaction = await Payment.find_one(
-        Payment.numero_transaccion == payment_in.numero_transaccion,
-        Payment.estado_pago != EstadoPago.RECHAZADO
-    )
     
-    if existing_transaction:
-        raise ValueError(
-            f"El número de transacción bancaria '{payment_in.numero_transaccion}' ya "
-            f"ha sido registrado en el sistema y se encuentra '{existing_transaction.estado_pago}'. "
-            "No se permiten comprobantes duplicados."
-        )
-    
-    next_payment = await get_next_pending_payment(payment_in.inscripcion_id)
+    next_payment = _calcular_siguiente_pago(enrollment, conceptos_cubiertos)
     if not next_payment:
          raise ValueError("Esta inscripción ya tiene todos los pagos en proceso o aprobados.")
 
     payment = Payment(
-        inscripcion_id=payment_in.inscripcion_id,
+        inscripcion_id=inscripcion_id,
         estudiante_id=enrollment.estudiante_id,
         curso_id=enrollment.curso_id,
         concepto=next_payment["concepto"],
@@ -203,13 +301,48 @@ async def create_payment(
         estado_pago=EstadoPago.PENDIENTE
     )
     
-    await payment.insert()
+    # Validación anti-fraude: el índice único parcial sobre numero_transaccion
+    # (pagos pendientes/aprobados) rechaza el comprobante duplicado en el mismo
+    # insert, sin consulta previa y sin ventana de carrera entre dos envíos.
+    try:
+        await payment.insert()
+    except DuplicateKeyError:
+        existing_transaction = await Payment.find_one(
+            Payment.numero_transaccion == payment_in.numero_transaccion,
+            Payment.estado_pago != EstadoPago.RECHAZADO
+        )
+        estado = existing_transaction.estado_pago if existing_transaction else EstadoPago.PENDIENTE
+        raise ValueError(
+            f"El número de transacción bancaria '{payment_in.numero_transaccion}' ya "
+            f"ha sido registrado en el sistema y se encuentra '{estado}'. "
+            "No se permiten comprobantes duplicados."
+        )
     return payment
 
 
+# ========================================================================
+# CACHÉ DE LECTURA DE PAGOS (cache-aside)
+# ========================================================================
+# TTL corta en memoria del proceso, como la de inscripciones: las rutas de
+# aprobar/rechazar leen el pago para validar permisos y el detalle se consulta
+# repetidamente. Toda escritura sobre un pago debe llamar a
+# invalidate_payment_cache.
+_payment_cache: TTLCache[Payment] = TTLCache(ttl=5.0, maxsize=1024)
+
+
+def invalidate_payment_cache(id: PydanticObjectId) -> None:
+    """Descartar el pago de la caché de lectura (tras escribirlo)"""
+    _payment_cache.invalidate(id)
+
+
+def clear_payment_cache() -> None:
+    """Vaciar la caché de pagos (borrados en lote, sin IDs a mano)"""
+    _payment_cache.clear()
+
+
 async def get_payment(id: PydanticObjectId) -> Optional[Payment]:
-    """Obtener un pago por ID"""
-    return await Payment.get(id)
+    """Obtener un pago por ID (vía caché TTL; cada llamada recibe su propia copia)"""
+    return await _payment_cache.get_or_load(id, lambda: Payment.get(id))
 
 
 async def get_payments_by_student(student_id: PydanticObjectId) -> List[Payment]:
@@ -233,74 +366,180 @@ async def get_payments_by_course(course_id: PydanticObjectId) -> List[Payment]:
     ).sort("-fecha_subida").to_list()
 
 
+# Concepto Matrícula (con o sin tilde, sin distinguir mayúsculas); compilado,
+# se envía como regex BSON, que $not acepta directamente
+_CONCEPTO_MATRICULA_RE = re.compile(r"^matr[ií]cula$", re.IGNORECASE)
+
+
+def filtro_concepto_por_rol(rol: Optional[str]) -> dict:
+    """Restricción de concepto según el rol: CPD solo Matrícula, Cobranza el resto"""
+    if rol == "cpd":
+        return {"concepto": _CONCEPTO_MATRICULA_RE}
+    if rol == "cobranza":
+        return {"concepto": {"$not": _CONCEPTO_MATRICULA_RE}}
+    return {}
+
+
 async def get_all_payments(
     page: int = 1,
     per_page: int = 10,
     q: Optional[str] = None,
-    estado: Optional[str] = None,
+    estado: Optional[EstadoPago] = None,
     curso_id: Optional[PydanticObjectId] = None,
-    estudiante_id: Optional[PydanticObjectId] = None
-) -> tuple[List[Payment], int]:
+    estudiante_id: Optional[PydanticObjectId] = None,
+    rol: Optional[str] = None,
+    after_id: Optional[PydanticObjectId] = None
+) -> Pagina[Payment]:
     """
-    Obtener todos los pagos con paginación y filtros complejos (Bug 8 Fix).
+    Listado de pagos con filtros (GET /payments)
+    
+    Único lugar donde se arma el filtro del listado. `rol` es el del usuario
+    staff que consulta (ver filtro_concepto_por_rol). Con `after_id` pagina por
+    cursor (ver paginate_payments).
     """
-    # Usamos diccionarios de consulta planos para soportar consultas más robustas en Beanie
-    query_dict = {}
+    filtro: dict = {}
     
-    # Filtro de Estado exacto
-    if estado and estado != "Todos los estados":
-        query_dict["estado_pago"] = estado
-
-    # Filtro de Estudiante exacto
+    # Buscador general: pago, estudiante y curso por índices
+    if q and q.strip():
+        filtro.update(await filtro_busqueda_pagos(q.strip()))
+    if estado:
+        filtro["estado_pago"] = estado
     if estudiante_id:
-        query_dict["estudiante_id"] = estudiante_id
-
-    # Filtro de Programa Académico (Curso)
-    # Buscamos todas las inscripciones (enrollments) que pertenezcan a ese curso
+        filtro["estudiante_id"] = estudiante_id
+    # Cada pago guarda su curso_id: se filtra directo (índice curso_id) sin
+    # cargar antes las inscripciones del curso
     if curso_id:
-        enrollments = await Enrollment.find(Enrollment.curso_id == curso_id).to_list()
-        enrollment_ids = [e.id for e in enrollments]
-        query_dict["inscripcion_id"] = {"$in": enrollment_ids}
-        
-    # Filtro Dinámico (Buscador general)
-    if q:
-        regex_pattern = {"$regex": q, "$options": "i"}
-        
-        # Sub-consulta: Encontrar estudiantes que coincidan en nombre, registro o carnet
-        matching_students = await Student.find(
-            Or(
-                Student.nombre == regex_pattern,
-                Student.registro == regex_pattern,
-                Student.carnet == regex_pattern,
-                Student.email == regex_pattern
-            )
-        ).to_list()
-        
-        matching_student_ids = [s.id for s in matching_students]
-
-        # Combinar búsquedas de texto: Que coincida en los campos del pago O que sea uno de esos estudiantes
-        query_dict["$or"] = [
-            {"numero_transaccion": regex_pattern},
-            {"concepto": regex_pattern},
-            {"remitente": regex_pattern},
-            {"banco": regex_pattern},
-            {"estudiante_id": {"$in": matching_student_ids}}
-        ]
+        filtro["curso_id"] = curso_id
+    filtro.update(filtro_concepto_por_rol(rol))
+    
+    return await paginate_payments(filtro, page, per_page, after_id=after_id)
+
+
+async def paginate_payments(
+    filtro: dict,
+    page: int,
+    per_page: int,
+    after_id: Optional[PydanticObjectId] = None
+) -> Pagina[Payment]:
+    """
+    Página de pagos (más recientes primero)
+    
+    Por número de página, un $facet comparte la etapa $match entre la página y
+    el conteo, en lugar de evaluar el filtro dos veces con count() + skip/limit.
+    Sin filtro, el total es el conteo estimado de la colección.
+    
+    Con `after_id` (el último pago de la página anterior) se pagina por keyset
+    sobre (fecha_subida, _id) y `page` se ignora: la página sale de un rango del
+    índice, sin $skip ni conteo (ver core.pagination).
+    """
+    orden = {"fecha_subida": -1, "_id": -1}
+    if after_id:
+        fecha = await resolver_cursor(Payment.get_motor_collection(), after_id, "fecha_subida")
+        # find(...).aggregate codifica el filtro (enums, ObjectId) y lo antepone como $match
+        raw_data, has_prev = await asyncio.gather(
+            Payment.find(filtro, filtro_siguientes("fecha_subida", fecha, after_id)).aggregate([
+                {"$sort": orden},
+                {"$limit": per_page + 1}
+            ]).to_list(),
+            Payment.find(filtro, filtro_anteriores("fecha_subida", fecha, after_id)).exists()
+        )
+        return Pagina.por_cursor([Payment.model_validate(raw) for raw in raw_data], per_page, has_prev=has_prev)
+    
+    pagina = [{"$sort": orden}, {"$skip": (page - 1) * per_page}, {"$limit": per_page}]
+    if not filtro:
+        # Sin filtros el total es el tamaño de la colección: se lee de los
+        # metadatos (estimated_document_count) en vez de contar documento a documento
+        total_count, raw_data = await asyncio.gather(
+            Payment.get_motor_collection().estimated_document_count(),
+            Payment.get_motor_collection().aggregate(pagina).to_list(length=None)
+        )
+    else:
+        result = await Payment.find(filtro).aggregate([
+            {"$facet": {"data": pagina, "total": [{"$count": "count"}]}}
+        ]).to_list()
+        facet = result[0] if result else {"data": [], "total": []}
+        total_count = facet["total"][0]["count"] if facet["total"] else 0
+        raw_data = facet["data"]
+    payments = [Payment.model_validate(raw) for raw in raw_data]
+    return Pagina.por_numero(payments, total_count, page, per_page)
+
+
+async def get_payments_pendientes(
+    rol: Optional[str] = None,
+    page: int = 1,
+    per_page: Optional[int] = None
+) -> List[_PaymentListaProjection]:
+    """
+    Pagos pendientes de revisión que `rol` puede ver, más recientes primero
+    
+    Filtro por rol (ver filtro_concepto_por_rol), orden y página se resuelven en
+    el servidor (índice estado_pago + fecha_subida), proyectados a los campos
+    del listado. Sin `per_page` se devuelven todos.
+    """
+    consulta = Payment.find(
+        {"estado_pago": EstadoPago.PENDIENTE.value, **filtro_concepto_por_rol(rol)}
+    ).sort(-Payment.fecha_subida)
+    if per_page:
+        consulta = consulta.skip((page - 1) * per_page).limit(per_page)
+    return await consulta.project(_PaymentListaProjection).to_list()
+
+
+async def _reclamar_pago_pendiente(
+    payment_id: PydanticObjectId,
+    campos: dict,
+    verbo: str
+) -> Payment:
+    """
+    Pasa un pago de PENDIENTE al nuevo estado en un solo find_one_and_update
     
-    total_count = await Payment.find(query_dict).count()
-    skip = (page - 1) * per_page
-    payments = await Payment.find(query_dict).sort("-fecha_subida").skip(skip).limit(per_page).to_list()
+    El estado PENDIENTE va en el filtro (compare-and-set): si dos admins
+    aprueban/rechazan a la vez, solo uno gana y el otro recibe el ValueError,
+    sin ejecutar dos veces los efectos sobre la inscripción.
+    """
+    raw = await Payment.get_motor_collection().find_one_and_update(
+        {"_id": payment_id, "estado_pago": EstadoPago.PENDIENTE.value},
+        {"$set": campos},
+        return_document=ReturnDocument.AFTER
+    )
+    if raw:
+        invalidate_payment_cache(payment_id)
+        return Payment.model_validate(raw)
     
-    return payments, total_count
+    # Solo en el camino de error: distinguir inexistente de estado incorrecto
+    actual = await Payment.get_motor_collection().find_one({"_id": payment_id}, {"estado_pago": 1})
+    if not actual:
+        raise ValueError(f"Pago {payment_id} no encontrado")
+    raise ValueError(
+        f"No se puede {verbo} un pago que está en estado {actual.get('estado_pago')}"
+    )
 
 
-async def get_payments_pendientes() -> List[Payment]:
+async def _revertir_aprobacion(payment_id: PydanticObjectId, fecha_verificacion: datetime) -> None:
     """
-    Obtener todos los pagos pendientes de revisión
+    Devuelve a PENDIENTE un pago reclamado cuya aprobación no pudo completarse
+    
+    Idempotente: el filtro incluye la fecha_verificacion del propio reclamo, así
+    que repetir la reversión, o ejecutarla cuando el pago ya fue re-aprobado por
+    otra petición, no tiene efecto.
     """
-    return await Payment.find(
-        Payment.estado_pago == EstadoPago.PENDIENTE
-    ).to_list()
+    result = await Payment.get_motor_collection().update_one(
+        {
+            "_id": payment_id,
+            "estado_pago": EstadoPago.APROBADO.value,
+            "fecha_verificacion": fecha_verificacion
+        },
+        {"$set": {
+            "estado_pago": EstadoPago.PENDIENTE.value,
+            "fecha_verificacion": None,
+            "verificado_por": None,
+            "updated_at": datetime.utcnow()
+        }}
+    )
+    invalidate_payment_cache(payment_id)
+    if result.modified_count:
+        logger.warning("Pago %s devuelto a PENDIENTE: no se pudo acreditar su saldo", payment_id)
+    else:
+        logger.warning("Pago %s: la aprobación a revertir ya no estaba vigente", payment_id)
 
 
 async def aprobar_pago(
@@ -309,46 +548,62 @@ async def aprobar_pago(
 ) -> Payment:
     """
     Aprobar un pago
-    """
-    payment = await Payment.get(payment_id)
-    if not payment:
-        raise ValueError(f"Pago {payment_id} no encontrado")
     
-    if payment.estado_pago != EstadoPago.PENDIENTE:
-        raise ValueError(
-            f"No se puede aprobar un pago que está en estado {payment.estado_pago}"
+    El pago se reclama de forma atómica (PENDIENTE -> APROBADO). El índice único
+    parcial (inscripcion_id, concepto, numero_cuota) sobre los pagos aprobados
+    hace que ese mismo update falle si ya hay un pago aprobado para el concepto:
+    chequeo de duplicados y cambio de estado en un solo viaje, sin carrera.
+    Si luego la actualización del saldo falla, se revierte a PENDIENTE.
+    """
+    ahora = datetime.utcnow()
+    try:
+        payment = await _reclamar_pago_pendiente(
+            payment_id,
+            {
+                "estado_pago": EstadoPago.APROBADO.value,
+                "fecha_verificacion": ahora,
+                "verificado_por": admin_username,
+                "motivo_rechazo": None,
+                "updated_at": ahora
+            },
+            "aprobar"
         )
-    
-    existing_approved = await Payment.find_one(
-        Payment.id != payment_id,
-        Payment.inscripcion_id == payment.inscripcion_id,
-        Payment.concepto == payment.concepto,
-        Payment.numero_cuota == payment.numero_cuota,
-        Payment.estado_pago == EstadoPago.APROBADO
-    )
-    
-    if existing_approved:
-        cuota_texto = f" (Cuota {payment.numero_cuota})" if payment.numero_cuota else ""
+    except DuplicateKeyError:
+        # Solo en el camino de error: identificar el pago aprobado existente
+        pendiente = await Payment.get(payment_id)
+        existing_approved = await Payment.find_one(
+            Payment.id != payment_id,
+            Payment.inscripcion_id == pendiente.inscripcion_id,
+            Payment.concepto == pendiente.concepto,
+            Payment.numero_cuota == pendiente.numero_cuota,
+            Payment.estado_pago == EstadoPago.APROBADO
+        ) if pendiente else None
+        concepto = pendiente.concepto if pendiente else ""
+        cuota_texto = f" (Cuota {pendiente.numero_cuota})" if pendiente and pendiente.numero_cuota else ""
+        existente = f" Pago aprobado existente: {existing_approved.id}." if existing_approved else ""
         raise ValueError(
-            f"No se puede aprobar: ya existe un pago aprobado para {payment.concepto}{cuota_texto}. "
-            f"Pago aprobado existente: {existing_approved.id}."
+            f"No se puede aprobar: ya existe un pago aprobado para {concepto}{cuota_texto}.{existente}"
         )
     
-    enrollment = await Enrollment.get(payment.inscripcion_id)
-    if not enrollment:
-        raise ValueError(f"Inscripción {payment.inscripcion_id} no encontrada")
-    
-    if payment.concepto == "Matrícula":
-        enrollment.matricula_pagada = True
-        await enrollment.save()
-    
-    payment.aprobar_pago(admin_username)
-    await payment.save()
-    
-    await enrollment_service.actualizar_saldo_enrollment(
-        enrollment_id=payment.inscripcion_id,
-        monto_pago_aprobado=payment.cantidad_pago
-    )
+    try:
+        # Saldo, estado y matrícula en un solo update atómico sobre la inscripción
+        # (sin leerla antes); lanza ValueError si la inscripción no existe.
+        await enrollment_service.actualizar_saldo_enrollment(
+            enrollment_id=payment.inscripcion_id,
+            monto_pago_aprobado=payment.cantidad_pago,
+            matricula_pagada=(payment.concepto == "Matrícula")
+        )
+    except Exception:
+        try:
+            await _revertir_aprobacion(payment_id, payment.fecha_verificacion)
+        except Exception:
+            # El pago queda APROBADO sin saldo acreditado: se registra para
+            # corregirlo a mano (rechazarlo y re-aprobarlo o acreditar el saldo)
+            logger.exception(
+                "Pago %s quedó APROBADO sin acreditar %s en la inscripción %s",
+                payment_id, payment.cantidad_pago, payment.inscripcion_id
+            )
+        raise
     
     return payment
 
@@ -359,35 +614,48 @@ async def rechazar_pago(
     motivo: str
 ) -> Payment:
     """
-    Rechazar un pago
+    Rechazar un pago (compare-and-set atómico sobre el estado PENDIENTE)
     """
-    payment = await Payment.get(payment_id)
-    if not payment:
-        raise ValueError(f"Pago {payment_id} no encontrado")
-    
-    if payment.estado_pago != EstadoPago.PENDIENTE:
-        raise ValueError(
-            f"No se puede rechazar un pago que está en estado {payment.estado_pago}"
-        )
-    
-    payment.rechazar_pago(admin_username, motivo)
-    await payment.save()
+    ahora = datetime.utcnow()
+    payment = await _reclamar_pago_pendiente(
+        payment_id,
+        {
+            "estado_pago": EstadoPago.RECHAZADO.value,
+            "fecha_verificacion": ahora,
+            "verificado_por": admin_username,
+            "motivo_rechazo": motivo,
+            "updated_at": ahora
+        },
+        "rechazar"
+    )
     return payment
 
 
 async def get_resumen_pagos_enrollment(enrollment_id: PydanticObjectId) -> dict:
     """
     Obtener resumen de pagos de una inscripción
+    
+    El conteo y la suma por estado se hacen en MongoDB ($group): viajan a lo
+    sumo una fila por estado en lugar de todos los pagos.
     """
-    payments = await get_payments_by_enrollment(enrollment_id)
+    filas = await Payment.aggregate([
+        {"$match": {"inscripcion_id": enrollment_id}},
+        {"$group": {
+            "_id": "$estado_pago",
+            "n": {"$sum": 1},
+            "monto": {"$sum": "$cantidad_pago"}
+        }}
+    ]).to_list()
+    por_estado = {fila["_id"]: fila for fila in filas}
+    
+    def _n(estado: EstadoPago) -> int:
+        return por_estado.get(estado.value, {}).get("n", 0)
     
     resumen = {
-        "total_pagos": len(payments),
-        "pendientes": len([p for p in payments if p.estado_pago == EstadoPago.PENDIENTE]),
-        "aprobados": len([p for p in payments if p.estado_pago == EstadoPago.APROBADO]),
-        "rechazados": len([p for p in payments if p.estado_pago == EstadoPago.RECHAZADO]),
-        "monto_total_aprobado": sum(
-            p.cantidad_pago for p in payments if p.estado_pago == EstadoPago.APROBADO
-        ),
+        "total_pagos": sum(fila["n"] for fila in filas),
+        "pendientes": _n(EstadoPago.PENDIENTE),
+        "aprobados": _n(EstadoPago.APROBADO),
+        "rechazados": _n(EstadoPago.RECHAZADO),
+        "monto_total_aprobado": por_estado.get(EstadoPago.APROBADO.value, {}).get("monto", 0),
     }
     return resumen
@@ -5,14 +5,43 @@ Servicio de Estudiantes
 Lógica de negocio para estudiantes (Funciones).
 """
 
+import asyncio
+import re
 import openpyxl
 from io import BytesIO
+from datetime import datetime
 from typing import List, Optional, Union
 from models.student import Student
-from models.enums import EstadoTitulo, TipoEstudiante
-from schemas.student import StudentCreate, StudentUpdateSelf, StudentUpdateAdmin
+from models.enums import EstadoPago, EstadoTitulo, TipoEstudiante
+from models.base import to_object_id
+from schemas.student import StudentCreate, StudentListResponse, StudentUpdateSelf, StudentUpdateAdmin
 from beanie import PydanticObjectId
-from beanie.operators import Or, RegEx
+from pydantic import BaseModel
+from beanie.operators import In, Or
+from core.pagination import Pagina, filtro_anteriores, filtro_siguientes, resolver_cursor
+from core.search import PALABRA_RE, filtro_busqueda, prefijo
+from core.security import get_password_hash_async
+from models.course import Course
+from models.enrollment import Enrollment
+from models.payment import Payment
+from schemas.enrollment import EnrollmentCreate
+from services import enrollment_service, payment_service
+
+
+class _StudentClavesProjection(BaseModel):
+    """Claves únicas de un estudiante (detección de duplicados en la importación)"""
+    registro: Optional[str] = None
+    carnet: Optional[str] = None
+    email: Optional[str] = None
+
+
+# Forma de carnet/registro ("220005958", "1234567-1A", "TEST-001"): se busca
+# solo por prefijo sobre los índices únicos, sin pasar por el índice de texto
+_IDENTIFICADOR_RE = re.compile(r"^(?:\d+(?:-[0-9A-Za-z]+)?|[A-Za-z]+-\d+)$")
+
+# Campos con prefijo anclado en la búsqueda libre (-> si ignora mayúsculas).
+# El email se guarda en minúsculas y se compara con q en minúsculas
+_PREFIJOS_BUSQUEDA = {"nombre": True, "carnet": False, "registro": False}
 
 
 async def get_students(
@@ -21,47 +50,85 @@ async def get_students(
     q: Optional[str] = None,
     activo: Optional[bool] = None,
     estado_titulo: Optional[EstadoTitulo] = None,
-    curso_id: Optional[PydanticObjectId] = None
-) -> tuple[List[Student], int]:
+    curso_id: Optional[PydanticObjectId] = None,
+    after_id: Optional[PydanticObjectId] = None
+) -> Pagina[StudentListResponse]:
     """
     Obtener lista de estudiantes con filtros avanzados y paginación
+    
+    Con `after_id` (el último estudiante de la página anterior) se pagina por
+    keyset sobre (created_at, _id) y `page` se ignora: sin $skip, el costo de
+    una página profunda es el mismo que el de la primera (ver core.pagination).
     """
-    query = Student.find()
+    # El filtro se arma como un único dict (sin encadenar un .find() por
+    # condición) y se codifica una sola vez en cada consulta
+    filtro: dict = {}
+    orden_relevancia = False
     
-    if q:
-        regex_pattern = {"$regex": q, "$options": "i"}
-        query = query.find(
-            Or(
-                Student.nombre == regex_pattern,
-                Student.email == regex_pattern,
-                Student.carnet == regex_pattern,
-                Student.registro == regex_pattern
-            )
-        )
+    if q and _IDENTIFICADOR_RE.match(q):
+        # Carnet/registro completo o su comienzo ("22000" encuentra "220005958")
+        filtro["$or"] = [{"carnet": prefijo(q)}, {"registro": prefijo(q)}]
+    elif q:
+        # $text sobre el índice de texto (palabras completas en nombre/email/
+        # carnet/registro) más un prefijo anclado por campo, en lugar de cuatro
+        # regex sin anclar que recorren la colección completa (ver core.search).
+        # Una coincidencia en medio de una palabra ("nzál" en "González") no se
+        # encuentra: ninguna de las dos ramas la resuelve con índices
+        filtro.update(filtro_busqueda(q, prefijos=_PREFIJOS_BUSQUEDA))
+        filtro["$or"].append({"email": prefijo(q.lower())})
+        orden_relevancia = bool(PALABRA_RE.search(q))
+        if len(q.split()) > 1:
+            # $text une los términos con OR ("Juan Pérez" trae a todos los Juan):
+            # la frase exacta se verifica con regex, pero solo sobre los
+            # candidatos que ya devolvieron los índices
+            filtro["nombre"] = {"$regex": re.escape(q), "$options": "i"}
     
     if activo is not None:
-        query = query.find(Student.activo == activo)
+        filtro["activo"] = activo
     
     if estado_titulo:
         if estado_titulo == EstadoTitulo.SIN_TITULO:
-            query = query.find(
-                Or(
-                    Student.titulo.estado == EstadoTitulo.SIN_TITULO,
-                    Student.titulo == None
-                )
-            )
+            # Sin título = estado "sin_titulo" o sin subdocumento: si `titulo` es
+            # null/no existe, "titulo.estado" vale null para MongoDB. Una sola
+            # igualdad ($in) sobre el índice de titulo.estado reemplaza al $or
+            filtro["titulo.estado"] = {"$in": [EstadoTitulo.SIN_TITULO.value, None]}
         else:
-            query = query.find(Student.titulo.estado == estado_titulo)
+            filtro["titulo.estado"] = estado_titulo.value
     
     if curso_id:
-        query = query.find(Student.lista_cursos_ids == curso_id)
+        filtro["lista_cursos_ids"] = curso_id
     
-    total_count = await query.count()
-    skip = (page - 1) * per_page
+    # Solo los campos de la fila del listado (ver StudentListResponse)
+    def _pagina(*condiciones, limite: int, skip: int = 0):
+        # Cada consulta con su propio FindMany: .find()/.skip() modifican la consulta en sitio
+        pagina = Student.find(filtro, *condiciones)
+        if orden_relevancia and not after_id:
+            # Con búsqueda de texto, primero los más relevantes según los pesos
+            # del índice (carnet/registro > email > nombre); MongoDB ordena y
+            # corta por puntaje en el servidor. El cursor (after_id) se basa en
+            # created_at, así que ese modo conserva el orden cronológico
+            pagina = pagina.sort(("score", {"$meta": "textScore"}))
+        return pagina.sort("-created_at", "-_id").skip(skip).limit(limite).project(StudentListResponse).to_list()
     
-    students = await query.sort("-created_at").skip(skip).limit(per_page).to_list()
+    if after_id:
+        fecha = await resolver_cursor(Student.get_motor_collection(), after_id, "created_at")
+        filas, has_prev = await asyncio.gather(
+            _pagina(filtro_siguientes("created_at", fecha, after_id), limite=per_page + 1),
+            Student.find(filtro, filtro_anteriores("created_at", fecha, after_id)).exists()
+        )
+        return Pagina.por_cursor(filas, per_page, has_prev=has_prev)
     
-    return students, total_count
+    # El conteo y la página son independientes y se consultan en paralelo
+    total_count, students = await asyncio.gather(
+        Student.find(filtro).count(),
+        _pagina(limite=per_page, skip=(page - 1) * per_page)
+    )
+    pagina = Pagina.por_numero(students, total_count, page, per_page)
+    if orden_relevancia:
+        # La página va ordenada por relevancia y el cursor pagina por created_at:
+        # seguirlo desde aquí saltaría o repetiría filas, así que no se ofrece
+        pagina.next_cursor = None
+    return pagina
 
 
 async def get_student(id: PydanticObjectId) -> Optional[Student]:
@@ -76,11 +143,6 @@ async def create_student(student_in: StudentCreate) -> Student:
     Si se provee password, se usa; sino, se hashea el carnet (fallback).
     Si se provee course_id, se inscribe automáticamente (y se validan los datos primero).
     """
-    from core.security import get_password_hash
-    from models.course import Course
-    from schemas.enrollment import EnrollmentCreate
-    from services import enrollment_service
-    
     # 1. Validaciones robustas de Unicidad (Registro, Carnet, Correo) en base de datos
     check_conditions = []
     if student_in.registro:
@@ -113,7 +175,7 @@ async def create_student(student_in: StudentCreate) -> Student:
     # 2. Validar existencia del curso ANTES de crear al estudiante (Ahorro de BD)
     course_obj = None
     if course_id:
-        course_obj = await Course.get(course_id)
+        course_obj = await Course.get(to_object_id(course_id))
         if not course_obj:
             raise ValueError("Curso no encontrado")
         if not course_obj.activo:
@@ -121,12 +183,17 @@ async def create_student(student_in: StudentCreate) -> Student:
 
     # 3. Lógica Inteligente de Contraseña
     if password_input:
-        student_data["password"] = get_password_hash(password_input)
+        student_data["password"] = await get_password_hash_async(password_input)
     else:
-        student_data["password"] = get_password_hash(student_data["carnet"])
+        student_data["password"] = await get_password_hash_async(student_data["carnet"])
         
     # 4. Persistir Estudiante
-    student = Student(**student_data)
+    # StudentCreate ya validó los datos: model_construct evita revalidarlos
+    # (los valores por defecto se aplican igual). El tipo de estudiante llega
+    # como texto del schema y se guarda como el enum del modelo
+    if student_data.get("es_estudiante_interno") is not None:
+        student_data["es_estudiante_interno"] = TipoEstudiante(student_data["es_estudiante_interno"])
+    student = Student.model_construct(**student_data)
     await student.insert()
     
     # 5. Puente de Inscripción Integrado
@@ -154,8 +221,6 @@ async def update_student(
     student_in: Union[StudentUpdateSelf, StudentUpdateAdmin]
 ) -> Student:
     """Actualizar estudiante existente"""
-    from core.security import get_password_hash
-    
     update_data = student_in.model_dump(exclude_unset=True)
     
     # 1. Validaciones robustas de Unicidad en Modificación (Excluyendo al propio estudiante)
@@ -185,24 +250,72 @@ async def update_student(
                 raise ValueError(f"El Correo Electrónico '{new_email}' ya está registrado en otra cuenta.")
 
     if "password" in update_data and update_data["password"]:
-        update_data["password"] = get_password_hash(update_data["password"])
+        update_data["password"] = await get_password_hash_async(update_data["password"])
         
     if "email" in update_data and update_data["email"]:
         update_data["email"] = update_data["email"].strip().lower()
     
-    for field, value in update_data.items():
-        setattr(student, field, value)
+    if update_data.get("lista_cursos_ids") is not None:
+        update_data["lista_cursos_ids"] = [to_object_id(c) for c in update_data["lista_cursos_ids"]]
     
-    await student.save()
+    if update_data.get("es_estudiante_interno") is not None:
+        update_data["es_estudiante_interno"] = TipoEstudiante(update_data["es_estudiante_interno"])
+    
+    # $set solo con los campos enviados: no reescribe el documento completo ni pisa
+    # cambios concurrentes en otros campos. Beanie sincroniza `student` con el
+    # documento actualizado que devuelve el mismo update.
+    update_data["updated_at"] = datetime.utcnow()
+    await student.update({"$set": update_data})
     return student
 
 
-async def delete_student(id: PydanticObjectId) -> Student:
-    """Eliminar estudiante"""
-    student = await Student.get(id)
-    if student:
-        await student.delete()
-    return student
+async def _eliminar_dependencias(student_ids: List[PydanticObjectId]) -> None:
+    """
+    Cascada al eliminar estudiantes (una operación *Many por colección, en paralelo):
+    - Pagos: solo se purgan los PENDIENTES (los aprobados/rechazados quedan para auditoría)
+    - Inscripciones de los estudiantes
+    - Referencias en cursos: se retiran los estudiantes de `inscritos`
+    
+    Se ejecuta ANTES de borrar a los estudiantes: si falla a medias, el
+    estudiante sigue existiendo y el borrado puede reintentarse, en lugar de
+    dejar pagos e inscripciones huérfanos.
+    """
+    await asyncio.gather(
+        Payment.find(
+            In(Payment.estudiante_id, student_ids),
+            Payment.estado_pago == EstadoPago.PENDIENTE
+        ).delete(),
+        Enrollment.find(In(Enrollment.estudiante_id, student_ids)).delete(),
+        Course.get_motor_collection().update_many(
+            {"inscritos": {"$in": student_ids}},
+            {
+                "$pull": {"inscritos": {"$in": student_ids}},
+                "$set": {"updated_at": datetime.utcnow()}
+            }
+        )
+    )
+    payment_service.clear_payment_cache()
+    enrollment_service.clear_enrollment_cache()
+
+
+async def delete_student(id: PydanticObjectId) -> Optional[Student]:
+    """
+    Eliminar estudiante y sus dependencias (ver _eliminar_dependencias)
+    
+    Devuelve el estudiante eliminado, o None si no existía.
+    """
+    if not await Student.find_one(Student.id == id).exists():
+        return None
+    await _eliminar_dependencias([id])
+    raw = await Student.get_motor_collection().find_one_and_delete({"_id": id})
+    return Student.model_validate(raw) if raw else None
+
+
+async def delete_students(ids: List[PydanticObjectId]) -> int:
+    """Eliminar varios estudiantes y sus dependencias; devuelve cuántos se eliminaron"""
+    await _eliminar_dependencias(ids)
+    result = await Student.find(In(Student.id, ids)).delete()
+    return result.deleted_count if result else 0
 
 
 # ============================================================================
@@ -217,8 +330,6 @@ async def import_students_from_excel(file_content: bytes, force_tipo: TipoEstudi
     Forzará el tipo de estudiante basado en `force_tipo` (INTERNO/EXTERNO) enviado desde el frontend,
     ignorando cualquier columna que diga "tipo" en el Excel, previniendo errores de digitación de los administrativos.
     """
-    from core.security import get_password_hash
-    
     try:
         # Cargar libro en memoria de forma optimizada
         wb = openpyxl.load_workbook(BytesIO(file_content), data_only=True)
@@ -356,7 +467,8 @@ async def import_students_from_excel(file_content: bytes, force_tipo: TipoEstudi
         if all_emails_excel:
             db_query["$or"].append({"email": {"$in": all_emails_excel}})
             
-        existing_students_db = await Student.find(db_query).to_list()
+        # Solo las tres claves únicas: no se hidratan los estudiantes completos
+        existing_students_db = await Student.find(db_query).project(_StudentClavesProjection).to_list()
         
         for s in existing_students_db:
             if s.registro:
@@ -367,7 +479,7 @@ async def import_students_from_excel(file_content: bytes, force_tipo: TipoEstudi
                 existing_emails.add(s.email.lower())
         
     # 4. PREPARAR OBJETOS DE INSERTIÓN Y HASHEAR CONTRASEÑAS (PROCESADOR CPU CONTINUO)
-    students_to_insert = []
+    validos = []
     for c in candidates:
         has_error = False
         if c["registro"] in existing_registros:
@@ -382,9 +494,13 @@ async def import_students_from_excel(file_content: bytes, force_tipo: TipoEstudi
             
         if has_error:
             continue
-            
-        hashed_password = get_password_hash(c["carnet"])
-        
+        validos.append(c)
+    
+    # Los hashes bcrypt se calculan en paralelo en el pool de hilos (fuera del event loop)
+    hashes = await asyncio.gather(*(get_password_hash_async(c["carnet"]) for c in validos))
+    
+    students_to_insert = []
+    for c, hashed_password in zip(validos, hashes):
         students_to_insert.append(
             Student(
                 registro=c["registro"],
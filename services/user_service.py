@@ -5,31 +5,54 @@ Servicio de Usuarios
 Lógica de negocio para operaciones CRUD de usuarios del sistema.
 """
 
+import asyncio
+from datetime import datetime
 from typing import List, Optional
 from beanie import PydanticObjectId
 from models.user import User
-from schemas.user import UserCreate, UserUpdate
+from schemas.user import UserCreate, UserResponse, UserUpdate
 from models.enums import UserRole
 from beanie.operators import Or
-
-async def get_users(page: int = 1, per_page: int = 10) -> tuple[List[User], int]:
+from core.pagination import Pagina, filtro_anteriores, filtro_siguientes, resolver_cursor
+from core.security import get_password_hash_async
+
+async def get_users(
+    page: int = 1,
+    per_page: int = 10,
+    after_id: Optional[PydanticObjectId] = None
+) -> Pagina[UserResponse]:
     """
     Obtener lista de usuarios administradores con paginación.
     Trae a toda la jerarquía administrativa, excluyendo estrictamente a Docentes.
+    
+    Con `after_id` (el último usuario de la página anterior) se pagina por
+    keyset sobre (created_at, _id) y `page` se ignora (ver core.pagination).
     """
-    query = User.find(
-        Or(
-            User.rol == UserRole.ADMIN,
-            User.rol == UserRole.SUPERADMIN,
-            User.rol == UserRole.MAE,
-            User.rol == UserRole.CPD,
-            User.rol == UserRole.COBRANZA
+    filtro = Or(
+        User.rol == UserRole.ADMIN,
+        User.rol == UserRole.SUPERADMIN,
+        User.rol == UserRole.MAE,
+        User.rol == UserRole.CPD,
+        User.rol == UserRole.COBRANZA
+    )
+    
+    def _pagina(*condiciones, limite: int, skip: int = 0):
+        # Solo los campos de UserResponse: el hash de la contraseña no sale de MongoDB
+        return User.find(filtro, *condiciones).sort("-created_at", "-_id").skip(skip).limit(limite).project(UserResponse).to_list()
+    
+    if after_id:
+        fecha = await resolver_cursor(User.get_motor_collection(), after_id, "created_at")
+        filas, has_prev = await asyncio.gather(
+            _pagina(filtro_siguientes("created_at", fecha, after_id), limite=per_page + 1),
+            User.find(filtro, filtro_anteriores("created_at", fecha, after_id)).exists()
         )
+        return Pagina.por_cursor(filas, per_page, has_prev=has_prev)
+    
+    total_count, users = await asyncio.gather(
+        User.find(filtro).count(),
+        _pagina(limite=per_page, skip=(page - 1) * per_page)
     )
-    total_count = await query.count()
-    skip = (page - 1) * per_page
-    users = await query.sort("-created_at").skip(skip).limit(per_page).to_list()
-    return users, total_count
+    return Pagina.por_numero(users, total_count, page, per_page)
 
 
 async def get_active_users() -> List[User]:
@@ -57,6 +80,15 @@ async def get_user_by_email(email: str) -> Optional[User]:
     return await User.find_one(User.email == email)
 
 
+async def get_user_by_identity(username: str, email: str) -> Optional[User]:
+    """
+    Buscar un usuario que ya use ese username o ese email (un solo viaje)
+    
+    Ambos campos tienen índice único, así que cada rama del $or es un IXSCAN.
+    """
+    return await User.find_one(Or(User.username == username, User.email == email))
+
+
 async def get_user_by_email_excluding_id(email: str, user_id: PydanticObjectId) -> Optional[User]:
     """Buscar usuario por email excluyendo un ID específico (para updates)."""
     existing = await User.find_one(User.email == email)
@@ -75,12 +107,12 @@ async def get_user_by_username_excluding_id(username: str, user_id: PydanticObje
 
 async def create_user(user_in: UserCreate) -> User:
     """Crear nuevo usuario (hasheo automático)"""
-    from core.security import get_password_hash
-    
     user_data = user_in.model_dump()
-    user_data["password"] = get_password_hash(user_data["password"])
+    user_data["password"] = await get_password_hash_async(user_data["password"])
     
-    user = User(**user_data)
+    # UserCreate ya validó username/email/rol: sin revalidación (los valores
+    # por defecto se aplican igual con model_construct)
+    user = User.model_construct(**user_data)
     await user.insert()
     return user
 
@@ -93,19 +125,19 @@ async def update_user(
     update_data = user_in.model_dump(exclude_unset=True)
     
     if "password" in update_data:
-        from core.security import get_password_hash
-        update_data["password"] = get_password_hash(update_data["password"])
-    
-    for field, value in update_data.items():
-        setattr(user, field, value)
+        update_data["password"] = await get_password_hash_async(update_data["password"])
     
-    await user.save()
+    # $set solo con los campos enviados (Beanie sincroniza `user` con el resultado)
+    update_data["updated_at"] = datetime.utcnow()
+    await user.update({"$set": update_data})
     return user
 
 
-async def delete_user(id: PydanticObjectId) -> User:
-    """Eliminar usuario"""
-    user = await User.get(id)
-    if user:
-        await user.delete()
-    return user
+async def delete_user(id: PydanticObjectId) -> Optional[User]:
+    """
+    Eliminar usuario (un solo viaje: find_one_and_delete)
+    
+    Devuelve el usuario eliminado, o None si no existía.
+    """
+    raw = await User.get_motor_collection().find_one_and_delete({"_id": id})
+    return User.model_validate(raw) if raw else None
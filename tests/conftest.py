@@ -0,0 +1,70 @@
+"""
+Fixtures compartidas de los tests
+=================================
+
+- anyio_backend: los tests async corren con @pytest.mark.anyio sobre asyncio
+- mongo_mock: base de datos en memoria (mongomock-motor) para la lógica de
+  los servicios
+- mongo_real: base de datos temporal en un MongoDB real (MONGODB_TEST_URL),
+  para las consultas que un simulador no reproduce ($text, textScore)
+"""
+
+import os
+from uuid import uuid4
+
+import pytest
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from core.database import crear_indices_unicos_pagos
+
+from models.course import Course
+from models.discount import Discount
+from models.enrollment import Enrollment
+from models.payment import Payment
+from models.student import Student
+from models.user import User
+from services import enrollment_service, payment_service
+
+MODELOS = [User, Student, Course, Enrollment, Payment, Discount]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def _limpiar_caches():
+    """Las cachés son por proceso: cada test empieza sin entradas"""
+    payment_service.clear_payment_cache()
+    enrollment_service.clear_enrollment_cache()
+
+
+@pytest.fixture
+async def mongo_mock():
+    """Base en memoria con los índices de los modelos
+
+    Sin los índices únicos parciales de payments: mongomock ignora el filtro
+    parcial y los aplicaría a todos los pagos.
+    """
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient()[f"kyc_test_{uuid4().hex[:12]}"]
+    await init_beanie(database=db, document_models=MODELOS)
+    yield db
+
+
+@pytest.fixture
+async def mongo_real():
+    """Base temporal con los índices de los modelos (incluidos los únicos de
+    payments); se elimina al terminar"""
+    url = os.getenv("MONGODB_TEST_URL")
+    if not url:
+        pytest.skip("MONGODB_TEST_URL no definido: se requiere un MongoDB real")
+    client = AsyncIOMotorClient(url)
+    db = client[f"kyc_test_{uuid4().hex[:12]}"]
+    await init_beanie(database=db, document_models=MODELOS)
+    await crear_indices_unicos_pagos(db)
+    yield db
+    await client.drop_database(db.name)
+    client.close()
@@ -0,0 +1,268 @@
+"""
+Tests de Inscripciones y Pagos
+==============================
+
+Tests de comportamiento de los servicios sobre una base en memoria
+(mongomock-motor; los índices parciales, en un MongoDB real) para verificar:
+- Inscripción en lote: repetidos, estudiante o curso inexistente, referencias
+- Aprobación de pagos: compare-and-set, duplicados por cuota y reversión
+- Listado de pagos: restricción por rol, búsqueda con caracteres de regex y pendientes
+"""
+
+import pytest
+from beanie import PydanticObjectId
+from pydantic import TypeAdapter, ValidationError
+
+from models.course import Course
+from models.enrollment import Enrollment
+from models.enums import EstadoInscripcion, EstadoPago, Modalidad, TipoCurso, TipoEstudiante
+from models.payment import Payment
+from models.student import Student
+from schemas.enrollment import MAX_INSCRIPCIONES_LOTE, EnrollmentBulkCreate, EnrollmentCreate
+from schemas.payment import PaymentResponse
+from services import enrollment_service, payment_service
+
+pytestmark = pytest.mark.anyio
+
+
+async def _crear_estudiante(registro: str) -> Student:
+    student = Student(
+        nombre=f"Estudiante {registro}",
+        registro=registro,
+        carnet=f"CI{registro}",
+        password="x",
+        es_estudiante_interno=TipoEstudiante.INTERNO,
+    )
+    await student.insert()
+    return student
+
+
+async def _crear_curso(codigo: str) -> Course:
+    course = Course(
+        codigo=codigo,
+        nombre_programa=f"Diplomado {codigo}",
+        tipo_curso=TipoCurso.DIPLOMADO,
+        modalidad=Modalidad.VIRTUAL,
+        costo_total_interno=3000.0,
+        matricula_interno=500.0,
+        costo_total_externo=5000.0,
+        matricula_externo=800.0,
+        cantidad_cuotas=3,
+    )
+    await course.insert()
+    return course
+
+
+async def _crear_pago(enrollment: Enrollment, numero: str, cantidad: float = 500.0) -> Payment:
+    payment = Payment(
+        inscripcion_id=enrollment.id,
+        estudiante_id=enrollment.estudiante_id,
+        curso_id=enrollment.curso_id,
+        concepto="Cuota",
+        numero_cuota=1,
+        numero_transaccion=numero,
+        cantidad_pago=cantidad,
+        comprobante_url="https://example.com/c.png",
+        estado_pago=EstadoPago.PENDIENTE,
+    )
+    await payment.insert()
+    return payment
+
+
+class TestEnrollmentsBulk:
+    async def test_crea_lote_y_referencias(self, mongo_mock):
+        a, b = await _crear_estudiante("1001"), await _crear_estudiante("1002")
+        course = await _crear_curso("DIP-1")
+
+        enrollments = await enrollment_service.create_enrollments_bulk(
+            [EnrollmentCreate(estudiante_id=a.id, curso_id=course.id),
+             EnrollmentCreate(estudiante_id=b.id, curso_id=course.id)],
+            admin_username="admin",
+        )
+
+        assert len(enrollments) == 2
+        assert await Enrollment.find_all().count() == 2
+        assert all(e.costo_total == 3000.0 for e in enrollments)
+        course = await Course.get(course.id)
+        assert set(course.inscritos) == {a.id, b.id}
+        assert (await Student.get(a.id)).lista_cursos_ids == [course.id]
+
+    async def test_lote_vacio(self, mongo_mock):
+        assert await enrollment_service.create_enrollments_bulk([], admin_username="admin") == []
+
+    async def test_repetidos_en_el_lote(self, mongo_mock):
+        a = await _crear_estudiante("1001")
+        course = await _crear_curso("DIP-1")
+        item = EnrollmentCreate(estudiante_id=a.id, curso_id=course.id)
+
+        with pytest.raises(ValueError, match="repetidas"):
+            await enrollment_service.create_enrollments_bulk([item, item], admin_username="admin")
+        assert await Enrollment.find_all().count() == 0
+
+    async def test_ya_inscrito(self, mongo_mock):
+        a, b = await _crear_estudiante("1001"), await _crear_estudiante("1002")
+        course = await _crear_curso("DIP-1")
+        await enrollment_service.create_enrollments_bulk(
+            [EnrollmentCreate(estudiante_id=a.id, curso_id=course.id)], admin_username="admin"
+        )
+
+        with pytest.raises(ValueError, match="ya está inscrito"):
+            await enrollment_service.create_enrollments_bulk(
+                [EnrollmentCreate(estudiante_id=b.id, curso_id=course.id),
+                 EnrollmentCreate(estudiante_id=a.id, curso_id=course.id)],
+                admin_username="admin",
+            )
+        # Se valida todo el lote antes de escribir: b tampoco se inscribe
+        assert await Enrollment.find_all().count() == 1
+
+    async def test_estudiante_inexistente(self, mongo_mock):
+        a = await _crear_estudiante("1001")
+        course = await _crear_curso("DIP-1")
+
+        with pytest.raises(ValueError, match="Estudiante .* no encontrado"):
+            await enrollment_service.create_enrollments_bulk(
+                [EnrollmentCreate(estudiante_id=a.id, curso_id=course.id),
+                 EnrollmentCreate(estudiante_id=PydanticObjectId(), curso_id=course.id)],
+                admin_username="admin",
+            )
+        assert await Enrollment.find_all().count() == 0
+
+    async def test_curso_inexistente(self, mongo_mock):
+        a = await _crear_estudiante("1001")
+
+        with pytest.raises(ValueError, match="Curso .* no encontrado"):
+            await enrollment_service.create_enrollments_bulk(
+                [EnrollmentCreate(estudiante_id=a.id, curso_id=PydanticObjectId())],
+                admin_username="admin",
+            )
+        assert await Enrollment.find_all().count() == 0
+
+
+    def test_tamano_maximo_del_lote(self):
+        adapter = TypeAdapter(EnrollmentBulkCreate)
+        item = {"estudiante_id": str(PydanticObjectId()), "curso_id": str(PydanticObjectId())}
+
+        assert len(adapter.validate_python([item] * MAX_INSCRIPCIONES_LOTE)) == MAX_INSCRIPCIONES_LOTE
+        with pytest.raises(ValidationError):
+            adapter.validate_python([item] * (MAX_INSCRIPCIONES_LOTE + 1))
+
+class TestAprobarPago:
+    async def _inscripcion(self) -> Enrollment:
+        student = await _crear_estudiante("1001")
+        course = await _crear_curso("DIP-1")
+        enrollments = await enrollment_service.create_enrollments_bulk(
+            [EnrollmentCreate(estudiante_id=student.id, curso_id=course.id)], admin_username="admin"
+        )
+        return enrollments[0]
+
+    async def test_aprueba_y_acredita_saldo(self, mongo_mock):
+        enrollment = await self._inscripcion()
+        payment = await _crear_pago(enrollment, "TRX-1")
+
+        aprobado = await payment_service.aprobar_pago(payment.id, "admin")
+
+        assert aprobado.estado_pago == EstadoPago.APROBADO
+        assert aprobado.verificado_por == "admin"
+        actualizada = await Enrollment.get(enrollment.id)
+        assert actualizada.total_pagado == 500.0
+        assert actualizada.saldo_pendiente == enrollment.total_a_pagar - 500.0
+
+    async def test_segunda_aprobacion_falla(self, mongo_mock):
+        enrollment = await self._inscripcion()
+        payment = await _crear_pago(enrollment, "TRX-1")
+        await payment_service.aprobar_pago(payment.id, "admin")
+
+        with pytest.raises(ValueError, match="estado aprobado"):
+            await payment_service.aprobar_pago(payment.id, "otro")
+        # El saldo se acreditó una sola vez
+        assert (await Enrollment.get(enrollment.id)).total_pagado == 500.0
+
+    async def test_cuota_ya_aprobada(self, mongo_real):
+        # El índice único es parcial (solo APROBADO): mongomock ignora el filtro
+        # parcial, así que este caso requiere un MongoDB real
+        enrollment = await self._inscripcion()
+        primero = await _crear_pago(enrollment, "TRX-1")
+        segundo = await _crear_pago(enrollment, "TRX-2")
+        await payment_service.aprobar_pago(primero.id, "admin")
+
+        with pytest.raises(ValueError, match="ya existe un pago aprobado"):
+            await payment_service.aprobar_pago(segundo.id, "admin")
+        assert (await Payment.get(segundo.id)).estado_pago == EstadoPago.PENDIENTE
+
+    async def test_pago_inexistente(self, mongo_mock):
+        with pytest.raises(ValueError, match="no encontrado"):
+            await payment_service.aprobar_pago(PydanticObjectId(), "admin")
+
+    async def test_revierte_si_falta_la_inscripcion(self, mongo_mock):
+        enrollment = await self._inscripcion()
+        payment = await _crear_pago(enrollment, "TRX-1")
+        await enrollment.delete()
+
+        with pytest.raises(ValueError):
+            await payment_service.aprobar_pago(payment.id, "admin")
+
+        revertido = await Payment.get(payment.id)
+        assert revertido.estado_pago == EstadoPago.PENDIENTE
+        assert revertido.fecha_verificacion is None
+        assert revertido.verificado_por is None
+        # La caché de pagos no conserva el estado APROBADO revertido
+        assert (await payment_service.get_payment(payment.id)).estado_pago == EstadoPago.PENDIENTE
+
+
+    async def test_siguiente_pago_ignora_la_cache(self, mongo_mock):
+        enrollment = await self._inscripcion()
+        # La caché de visualización queda con la inscripción actual...
+        await enrollment_service.get_enrollment(enrollment.id)
+        # ...y otro proceso cambia la matrícula sin invalidarla
+        await Enrollment.get_motor_collection().update_one(
+            {"_id": enrollment.id}, {"$set": {"costo_matricula": 650.0}}
+        )
+
+        siguiente = await payment_service.get_next_pending_payment(enrollment.id)
+        assert siguiente["concepto"] == "Matrícula"
+        assert siguiente["monto_sugerido"] == 650.0
+
+class TestListadoPagos:
+    async def _pagos(self):
+        enrollment = await TestAprobarPago()._inscripcion()
+        cuota = await _crear_pago(enrollment, "(TRX-1")
+        matricula = await _crear_pago(enrollment, "TRX-2")
+        matricula.concepto = "Matrícula"
+        matricula.numero_cuota = None
+        await matricula.save()
+        return cuota, matricula
+
+    async def test_filtro_por_rol(self, mongo_mock):
+        cuota, matricula = await self._pagos()
+
+        cpd = await payment_service.get_all_payments(rol="cpd")
+        cobranza = await payment_service.get_all_payments(rol="cobranza")
+        admin = await payment_service.get_all_payments(rol="admin")
+
+        assert [p.id for p in cpd.items] == [matricula.id]
+        assert [p.id for p in cobranza.items] == [cuota.id]
+        assert admin.total == 2
+
+    async def test_busqueda_con_caracteres_de_regex(self, mongo_mock):
+        cuota, _ = await self._pagos()
+
+        # Sin palabras no hay $text: solo prefijos anclados con q escapado
+        pagina = await payment_service.get_all_payments(q="(")
+        assert [p.id for p in pagina.items] == [cuota.id]
+
+    async def test_pendientes_por_rol_y_pagina(self, mongo_mock):
+        cuota, matricula = await self._pagos()
+        await payment_service.aprobar_pago(cuota.id, "admin")
+        otra = await _crear_pago(await Enrollment.get(cuota.inscripcion_id), "TRX-3")
+
+        todos = await payment_service.get_payments_pendientes("admin")
+        assert [p.id for p in todos] == [otra.id, matricula.id]
+        assert [p.id for p in await payment_service.get_payments_pendientes("admin", page=2, per_page=1)] == [matricula.id]
+        assert [p.id for p in await payment_service.get_payments_pendientes("cpd")] == [matricula.id]
+        assert [p.id for p in await payment_service.get_payments_pendientes("cobranza")] == [otra.id]
+
+        enriquecidos = await payment_service.enrich_payments_with_details_bulk(todos)
+        assert enriquecidos[0]["_id"] == otra.id
+        assert enriquecidos[0]["total_cuotas"] == 3
+        # La proyección trae todo lo que necesita la respuesta del listado
+        assert PaymentResponse.model_validate(enriquecidos[0]).numero_transaccion == "TRX-3"
@@ -0,0 +1,122 @@
+"""
+Tests de Paginación por Cursor
+==============================
+
+Límites del modo keyset (after_id) en estudiantes y pagos, sobre una base en
+memoria (mongomock-motor):
+- Página por número: nextCursor solo si hay página siguiente
+- Última página exacta: sin hasNextPage ni nextCursor
+- Cursor inexistente: ValueError
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from beanie import PydanticObjectId
+
+from core.pagination import Pagina
+from models.enums import EstadoPago
+from models.payment import Payment
+from models.student import Student
+from services import payment_service, student_service
+
+pytestmark = pytest.mark.anyio
+
+BASE = datetime(2025, 1, 1)
+
+
+async def _listar_estudiantes(**kwargs):
+    return await student_service.get_students(**kwargs)
+
+
+async def _listar_pagos(**kwargs):
+    return await payment_service.paginate_payments({}, **kwargs)
+
+
+async def _crear_datos(cantidad: int):
+    for i in range(cantidad):
+        await Student(
+            nombre=f"Estudiante {i}",
+            registro=f"R{i}",
+            carnet=f"CI{i}",
+            password="x",
+            created_at=BASE + timedelta(days=i),
+        ).insert()
+        await Payment(
+            inscripcion_id=PydanticObjectId(),
+            estudiante_id=PydanticObjectId(),
+            curso_id=PydanticObjectId(),
+            concepto="Cuota",
+            numero_cuota=1,
+            numero_transaccion=f"TRX-{i}",
+            cantidad_pago=100.0,
+            comprobante_url="https://example.com/c.png",
+            estado_pago=EstadoPago.PENDIENTE,
+            fecha_subida=BASE + timedelta(days=i),
+        ).insert()
+
+
+LISTADOS = [
+    pytest.param(_listar_estudiantes, id="estudiantes"),
+    pytest.param(_listar_pagos, id="pagos"),
+]
+
+
+@pytest.mark.parametrize("listar", LISTADOS)
+class TestKeyset:
+    async def test_recorrido_con_ultima_pagina_exacta(self, mongo_mock, listar):
+        await _crear_datos(4)
+
+        primera = await listar(page=1, per_page=2)
+        assert primera.total == 4
+        assert primera.has_next is True
+        assert primera.next_cursor == str(primera.items[-1].id)
+
+        segunda = await listar(page=1, per_page=2, after_id=PydanticObjectId(primera.next_cursor))
+        # 4 elementos en páginas de 2: la segunda es la última exacta
+        assert len(segunda.items) == 2
+        assert segunda.total is None
+        assert segunda.has_next is False
+        assert segunda.has_prev is True
+        assert segunda.next_cursor is None
+        vistos = [i.id for i in primera.items + segunda.items]
+        assert len(set(vistos)) == 4
+
+    async def test_ultima_pagina_por_numero(self, mongo_mock, listar):
+        await _crear_datos(4)
+
+        pagina = await listar(page=2, per_page=2)
+        assert pagina.has_next is False
+        assert pagina.next_cursor is None
+        assert pagina.meta(2, 2)["totalPages"] == 2
+
+    async def test_cursor_en_el_ultimo_elemento(self, mongo_mock, listar):
+        await _crear_datos(3)
+        todas = await listar(page=1, per_page=3)
+
+        ultimo = PydanticObjectId(str(todas.items[-1].id))
+        vacia = await listar(page=1, per_page=3, after_id=ultimo)
+        assert vacia.items == []
+        assert vacia.has_next is False
+        assert vacia.has_prev is True
+
+    async def test_cursor_inexistente(self, mongo_mock, listar):
+        await _crear_datos(2)
+
+        with pytest.raises(ValueError, match="Cursor de paginación inválido"):
+            await listar(page=1, per_page=2, after_id=PydanticObjectId())
+
+
+class TestPagina:
+    def test_meta_por_cursor_sin_total(self):
+        meta = Pagina.por_cursor(["a", "b"], per_page=2, has_prev=True).meta(1, 2)
+        assert meta["totalItems"] is None
+        assert meta["totalPages"] is None
+        assert meta["hasNextPage"] is False
+        assert meta["nextCursor"] is None
+
+    def test_meta_sin_resultados(self):
+        meta = Pagina.por_numero([], total=0, page=1, per_page=10).meta(1, 10)
+        assert meta["totalPages"] == 0
+        assert meta["hasNextPage"] is False
+        assert meta["hasPrevPage"] is False
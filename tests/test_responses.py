@@ -0,0 +1,48 @@
+"""
+Tests de las Respuestas en Streaming
+====================================
+
+Tests mínimos para verificar:
+- Arreglo JSON emitido elemento por elemento (formato por defecto)
+- NDJSON: un JSON válido por línea (formato opcional)
+"""
+
+import json
+from typing import List
+
+import pytest
+from pydantic import BaseModel, TypeAdapter
+
+from core.responses import stream_json_array, stream_ndjson
+
+pytestmark = pytest.mark.anyio
+
+
+class _Item(BaseModel):
+    nombre: str
+
+
+ADAPTER = TypeAdapter(_Item)
+
+
+async def _items(nombres: List[str]):
+    for nombre in nombres:
+        yield {"nombre": nombre}
+
+
+async def _leer(flujo) -> bytes:
+    return b"".join([parte async for parte in flujo])
+
+
+class TestStreams:
+    async def test_arreglo_json(self):
+        cuerpo = await _leer(stream_json_array(_items(["a", "b"]), ADAPTER))
+        assert json.loads(cuerpo) == [{"nombre": "a"}, {"nombre": "b"}]
+
+    async def test_arreglo_vacio(self):
+        assert json.loads(await _leer(stream_json_array(_items([]), ADAPTER))) == []
+
+    async def test_ndjson(self):
+        cuerpo = await _leer(stream_ndjson(_items(["a", "b"]), ADAPTER))
+        lineas = cuerpo.decode().splitlines()
+        assert [json.loads(linea) for linea in lineas] == [{"nombre": "a"}, {"nombre": "b"}]
@@ -0,0 +1,104 @@
+"""
+Tests de la Búsqueda Libre (q)
+==============================
+
+Ejecutan contra un MongoDB real (MONGODB_TEST_URL) las consultas que arma
+core.search, para verificar:
+- $text dentro de un $or con prefijos indexados (estudiantes y pagos)
+- Orden por relevancia (textScore) en el listado de estudiantes
+- Sin nextCursor en las páginas ordenadas por relevancia
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from beanie import PydanticObjectId
+
+from models.enums import EstadoPago
+from models.payment import Payment
+from models.student import Student
+from services import payment_service, student_service
+
+pytestmark = pytest.mark.anyio
+
+
+async def _crear_estudiantes():
+    base = datetime(2025, 1, 1)
+    datos = [
+        ("Ana María López", "220001", "1000001"),
+        ("Mariana Pérez", "220002", "1000002"),
+        ("Pedro Lopera", "220003", "1000003"),
+        ("Luis López Vargas", "220004", "1000004"),
+    ]
+    for i, (nombre, registro, carnet) in enumerate(datos):
+        await Student(
+            nombre=nombre,
+            registro=registro,
+            carnet=carnet,
+            password="x",
+            created_at=base + timedelta(days=i),
+        ).insert()
+
+
+class TestStudentSearch:
+    async def test_palabra_completa_por_texto(self, mongo_real):
+        await _crear_estudiantes()
+        pagina = await student_service.get_students(q="López")
+        nombres = {s.nombre for s in pagina.items}
+        assert nombres == {"Ana María López", "Luis López Vargas"}
+        assert pagina.next_cursor is None
+
+    async def test_relevancia_sin_cursor(self, mongo_real):
+        await _crear_estudiantes()
+        pagina = await student_service.get_students(q="López", per_page=1)
+        assert pagina.total == 2
+        assert pagina.has_next is True
+        # El orden es por textScore: un cursor por created_at no aplica
+        assert pagina.next_cursor is None
+
+    async def test_prefijo_de_nombre(self, mongo_real):
+        await _crear_estudiantes()
+        pagina = await student_service.get_students(q="Pedr")
+        assert [s.nombre for s in pagina.items] == ["Pedro Lopera"]
+
+    async def test_frase_exacta(self, mongo_real):
+        await _crear_estudiantes()
+        pagina = await student_service.get_students(q="Ana María")
+        assert [s.nombre for s in pagina.items] == ["Ana María López"]
+
+    async def test_identificador_conserva_cursor(self, mongo_real):
+        await _crear_estudiantes()
+        pagina = await student_service.get_students(q="22000", per_page=2)
+        assert pagina.total == 4
+        # Sin $text el orden es cronológico y el cursor sí se ofrece
+        assert pagina.next_cursor == str(pagina.items[-1].id)
+
+
+class TestPaymentSearch:
+    async def test_texto_y_prefijo_en_pagos(self, mongo_real):
+        estudiante = Student(nombre="Ana María López", registro="220001", carnet="1000001", password="x")
+        await estudiante.insert()
+        for numero, concepto in [("TRX-1001", "Matricula"), ("TRX-2002", "Cuota"), ("ABC-3003", "Cuota")]:
+            await Payment(
+                inscripcion_id=PydanticObjectId(),
+                estudiante_id=estudiante.id if numero == "ABC-3003" else PydanticObjectId(),
+                curso_id=PydanticObjectId(),
+                concepto=concepto,
+                numero_cuota=1 if concepto == "Cuota" else None,
+                numero_transaccion=numero,
+                cantidad_pago=100.0,
+                comprobante_url="https://example.com/c.png",
+                estado_pago=EstadoPago.PENDIENTE,
+            ).insert()
+
+        pagina = await payment_service.get_all_payments(q="TRX")
+        assert {p.numero_transaccion for p in pagina.items} == {"TRX-1001", "TRX-2002"}
+
+        pagina = await payment_service.get_all_payments(q="Matricula")
+        assert [p.numero_transaccion for p in pagina.items] == ["TRX-1001"]
+
+        # Coincidencia por el estudiante del pago
+        pagina = await payment_service.get_all_payments(q="López")
+        assert [p.numero_transaccion for p in pagina.items] == ["ABC-3003"]
+
+        assert await Payment.find_all().count() == 3